@@ -0,0 +1,190 @@
+"""Bounded, per-sink worker pools for alert side effects.
+
+Each sink (snapshot writes, desktop notifications) owns a bounded queue and
+a fixed number of worker threads, so a burst of alerts never spawns more
+threads than configured. Event rows are not a sink; ``EventWriter`` batches
+them into the database.
+
+When a sink's queue is full, its overflow policy decides what happens:
+
+- ``drop_newest``: reject the new job (the frame loop never waits).
+- ``drop_oldest``: evict the oldest queued job to make room.
+- ``block``: wait up to ``block_timeout`` seconds for space, then drop.
+
+Every drop and handler failure (an exception, or a handler returning
+``False``) is counted and logged, and ``stats()`` reports queue depth,
+latency and drop counters per sink.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+from collections import deque
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from Core_AI.utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+
+OVERFLOW_POLICIES = ("drop_newest", "drop_oldest", "block")
+
+_LATENCY_WINDOW = 512  # Recent jobs kept per sink for latency percentiles
+_STOP = object()
+
+
+@dataclass(frozen=True)
+class SinkConfig:
+    workers: int = 1
+    queue_size: int = 256
+    overflow: str = "drop_newest"
+    block_timeout: float = 0.05
+
+
+class _Sink:
+    def __init__(self, name: str, handler: Callable[..., Any], cfg: SinkConfig) -> None:
+        if cfg.overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy for sink {name}: {cfg.overflow}")
+        self.name = name
+        self.handler = handler
+        self.cfg = cfg
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, cfg.queue_size))
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.latencies: Deque[float] = deque(maxlen=_LATENCY_WINDOW)  # Enqueue -> handler done, seconds
+        self.threads: List[threading.Thread] = []
+
+    def count_drop(self) -> None:
+        with self.lock:
+            self.dropped += 1
+            dropped = self.dropped
+        # Log the first drop and then every 100th so a storm does not flood the log.
+        if dropped == 1 or dropped % 100 == 0:
+            logger.warning("Alert sink %s is full (policy=%s); %d jobs dropped so far.", self.name, self.cfg.overflow, dropped)
+
+
+class AlertDispatcher:
+    """Fixed-size worker pools, one bounded queue per named sink."""
+
+    def __init__(self) -> None:
+        self._sinks: Dict[str, _Sink] = {}
+        self._closed = False
+
+    def add_sink(self, name: str, handler: Callable[..., Any], cfg: SinkConfig = SinkConfig()) -> None:
+        """Register ``handler`` under ``name`` and start its workers."""
+        sink = _Sink(name, handler, cfg)
+        for i in range(max(1, cfg.workers)):
+            thread = threading.Thread(target=self._worker, args=(sink,), daemon=True, name=f"Alert-{name}-{i}")
+            sink.threads.append(thread)
+            thread.start()
+        self._sinks[name] = sink
+
+    def submit(self, name: str, *args: Any, **kwargs: Any) -> bool:
+        """Queue ``handler(*args, **kwargs)`` on sink ``name``; returns False if the job was dropped."""
+        sink = self._sinks.get(name)
+        if sink is None or self._closed:
+            return False
+        job: Tuple[float, Tuple[Any, ...], Dict[str, Any]] = (monotonic(), args, kwargs)
+        with sink.lock:
+            sink.submitted += 1
+
+        if sink.cfg.overflow == "block":
+            try:
+                sink.queue.put(job, timeout=sink.cfg.block_timeout)
+                return True
+            except queue.Full:
+                sink.count_drop()
+                return False
+
+        try:
+            sink.queue.put_nowait(job)
+            return True
+        except queue.Full:
+            pass
+        if sink.cfg.overflow == "drop_oldest":
+            try:
+                sink.queue.get_nowait()
+                sink.queue.task_done()
+                sink.count_drop()
+            except queue.Empty:
+                pass
+            try:
+                sink.queue.put_nowait(job)
+                return True
+            except queue.Full:
+                pass
+        sink.count_drop()
+        return False
+
+    def _worker(self, sink: _Sink) -> None:
+        while True:
+            job = sink.queue.get()
+            try:
+                if job is _STOP:
+                    return
+                enqueued, args, kwargs = job
+                try:
+                    ok = sink.handler(*args, **kwargs) is not False
+                    if not ok:
+                        logger.error("Alert sink %s: handler reported failure.", sink.name)
+                except Exception as exc:  # noqa: BLE001
+                    ok = False
+                    logger.error("Alert sink %s failed: %s", sink.name, exc)
+                with sink.lock:
+                    if ok:
+                        sink.completed += 1
+                    else:
+                        sink.failed += 1
+                    sink.latencies.append(monotonic() - enqueued)
+            finally:
+                sink.queue.task_done()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop accepting jobs, let workers drain their queues, then stop them."""
+        if self._closed:
+            return
+        self._closed = True
+        deadline = monotonic() + timeout
+        for sink in self._sinks.values():
+            for _ in sink.threads:
+                try:
+                    sink.queue.put(_STOP, timeout=max(0.0, deadline - monotonic()))
+                except queue.Full:
+                    break
+        for sink in self._sinks.values():
+            for thread in sink.threads:
+                thread.join(max(0.0, deadline - monotonic()))
+            if any(t.is_alive() for t in sink.threads):
+                logger.warning("Alert sink %s did not drain within %.1fs (%d queued).", sink.name, timeout, sink.queue.qsize())
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        out: Dict[str, Dict[str, Any]] = {}
+        for name, sink in self._sinks.items():
+            with sink.lock:
+                lat = sorted(sink.latencies)
+                out[name] = {
+                    "workers": len(sink.threads),
+                    "queue_depth": sink.queue.qsize(),
+                    "queue_capacity": sink.queue.maxsize,
+                    "overflow": sink.cfg.overflow,
+                    "submitted": sink.submitted,
+                    "completed": sink.completed,
+                    "failed": sink.failed,
+                    "dropped": sink.dropped,
+                    "latency_ms_p50": _percentile(lat, 0.50),
+                    "latency_ms_p95": _percentile(lat, 0.95),
+                    "latency_ms_max": 1000.0 * lat[-1] if lat else None,
+                }
+        return out
+
+
+def _percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    return 1000.0 * sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
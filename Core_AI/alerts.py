@@ -5,12 +5,18 @@ import threading
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
-import cv2
+import numpy as np
 
+from Core_AI.alert_dispatcher import AlertDispatcher, SinkConfig
 from Core_AI.config import AlertConfig
-from Core_AI.db import init_db, insert_event
+from Core_AI.event_ring import get_event_ring
+from Core_AI.event_sketches import SketchWriter, get_sketch_writer
+from Core_AI.event_spool import EventRow
+from Core_AI.event_writer import EventWriter, WriterConfig, get_event_writer
+from Core_AI.utils.bounded import BoundedDict
+from Core_AI.utils.encoded_frame import EncodedFrame
 from Core_AI.utils.logging_utils import get_logger
 
 
@@ -23,16 +29,50 @@ class AlertEvent:
     track_id: int
     zone_id: str
     zone_label: str
+    name: Optional[str] = None  # Identity name of the track, when known
 
 
 @dataclass
 class AlertManager:
     config: AlertConfig
-    _last_alerts: Dict[Tuple[int, str], datetime] = field(default_factory=dict)
+    _last_alerts: BoundedDict[Tuple[int, str], datetime] = field(init=False)
     _log_file: Path = field(init=False)
     _lock: threading.Lock = field(default_factory=threading.Lock)
+    _dispatcher: AlertDispatcher = field(init=False)
+    _events: Optional[EventWriter] = field(init=False, default=None)
+    _sketches: Optional[SketchWriter] = field(init=False, default=None)
 
     def __post_init__(self) -> None:
+        # Keys only matter for the cooldown window, so expire them with it.
+        self._last_alerts = BoundedDict(
+            self.config.max_tracked_alert_keys,
+            ttl_seconds=self.config.duplicate_suppression_seconds,
+            refresh_on_read=False,
+        )
+        sink = dict(queue_size=self.config.queue_size, overflow=self.config.overflow_policy)
+        self._dispatcher = AlertDispatcher()
+        self._dispatcher.add_sink("snapshot", _save_snapshot, SinkConfig(workers=self.config.snapshot_workers, **sink))
+        self._dispatcher.add_sink("notify", _show_toast, SinkConfig(workers=1, **sink))
+        if self.config.database_url:
+            # Shared by every camera in the process, so rows from all of them land in one batch.
+            self._events = get_event_writer(
+                self.config.database_url,
+                WriterConfig(
+                    batch_size=self.config.event_batch_size,
+                    flush_ms=self.config.event_flush_ms,
+                    method=self.config.event_write_method,
+                    max_buffer=self.config.event_buffer_max,
+                    spool_path=self.config.event_spool_path,
+                    spool_max_rows=self.config.event_spool_max_rows,
+                    spool_synchronous=self.config.event_spool_synchronous,
+                ),
+            )
+            if self.config.events_ring_size > 0:
+                # Committed rows feed the API's in-memory ring of recent events.
+                get_event_ring(self.config.events_ring_size, self.config.events_ring_scope).attach(self._events.subscribe)
+            self._sketches = get_sketch_writer(
+                self.config.database_url, self.config.sketch_precision, self.config.sketch_flush_seconds
+            )
         self.config.log_dir.mkdir(parents=True, exist_ok=True)
         self.config.snapshots_dir.mkdir(parents=True, exist_ok=True)
         self._log_file = self.config.log_dir / "alerts.csv"
@@ -43,12 +83,18 @@ class AlertManager:
                 writer = csv.writer(f)
                 writer.writerow(["Timestamp", "Track_ID", "Zone_ID", "Zone_Label", "Snapshot_Path"])
 
-    def handle_alerts(self, events: Iterable[AlertEvent], frame) -> None:
+    def handle_alerts(self, events: Iterable[AlertEvent], frame: Union[EncodedFrame, np.ndarray]) -> None:
+        """Log, snapshot and store ``events``; every snapshot of ``frame`` shares one JPEG encode."""
         rows_to_write: List[list] = []
-        
+        encoded = frame if isinstance(frame, EncodedFrame) else EncodedFrame(frame)
+        owned = False
+
         for event in events:
             key = (event.track_id, event.zone_id)
             now = event.timestamp
+            if self._sketches is not None:
+                # Before the cooldown check, so a person lingering across an hour boundary counts in both.
+                self._sketches.observe(self.config.camera_id, now, event.track_id, event.name)
             with self._lock:
                 last = self._last_alerts.get(key)
                 if last and now - last < timedelta(seconds=self.config.duplicate_suppression_seconds):
@@ -68,14 +114,11 @@ class AlertManager:
                 snapshot_path,
             )
 
-            # Save visual snapshot in background thread to avoid blocking
-            _frame_copy = frame.copy()
-            _sp = str(snapshot_path)
-            threading.Thread(
-                target=_save_snapshot,
-                args=(_frame_copy, _sp),
-                daemon=True,
-            ).start()
+            # Side effects run on the dispatcher's bounded worker pools, never inline.
+            if not owned:
+                encoded.own()  # One copy per frame, shared by all of its snapshots
+                owned = True
+            self._dispatcher.submit("snapshot", encoded, str(snapshot_path))
 
             rows_to_write.append([
                 now.isoformat(),
@@ -85,38 +128,9 @@ class AlertManager:
                 str(snapshot_path),
             ])
 
-            # DB insert in background thread
-            threading.Thread(
-                target=insert_event,
-                kwargs=dict(
-                    db_url=self.config.database_url,
-                    camera_id=self.config.camera_id,
-                    object_id=event.track_id,
-                    zone=event.zone_label,
-                    ts=now,
-                    snapshot_path=str(snapshot_path),
-                ),
-                daemon=True,
-            ).start()
-
-            # Windows Desktop Notification (IMP-14)
-            def _show_toast():
-                try:
-                    from win10toast import ToastNotifier
-                    toaster = ToastNotifier()
-                    toaster.show_toast(
-                        "SENTINAL Intrusion Alert",
-                        f"Movement detected in {event.zone_label} (ID: {event.track_id})",
-                        icon_path=None,
-                        duration=5,
-                        threaded=True
-                    )
-                except ImportError:
-                    pass
-                except Exception as exc:
-                    logger.debug("Desktop notification failed: %s", exc)
-
-            threading.Thread(target=_show_toast, daemon=True).start()
+            if self._events is not None:
+                self._events.add(EventRow(self.config.camera_id, event.track_id, event.zone_label, now, str(snapshot_path)))
+            self._dispatcher.submit("notify", event.zone_label, event.track_id)
 
         # Batch write all rows to CSV in a single open()
         if rows_to_write:
@@ -128,8 +142,39 @@ class AlertManager:
                 logger.error("Failed to write to alert log CSV: %s", exc)
 
 
-def _save_snapshot(frame, path: str) -> None:
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush queued snapshots and notifications, and push buffered events to the DB."""
+        self._dispatcher.close(timeout)
+        if self._events is not None:
+            self._events.flush(timeout)
+        if self._sketches is not None:
+            self._sketches.flush()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            last_alerts = self._last_alerts.stats()
+        return {
+            "last_alerts": last_alerts,
+            "dispatcher": self._dispatcher.stats(),
+            "event_writer": self._events.stats() if self._events is not None else None,
+            "sketches": self._sketches.stats() if self._sketches is not None else None,
+        }
+
+
+def _save_snapshot(frame: EncodedFrame, path: str) -> None:
+    Path(path).write_bytes(frame.jpeg())
+
+
+def _show_toast(zone_label: str, track_id: int) -> None:
+    """Windows desktop notification (IMP-14); a no-op where win10toast is missing."""
     try:
-        cv2.imwrite(path, frame)
-    except Exception as exc:  # noqa: BLE001
-        logger.error("Failed to write snapshot %s: %s", path, exc)
+        from win10toast import ToastNotifier
+    except ImportError:
+        return
+    ToastNotifier().show_toast(
+        "SENTINAL Intrusion Alert",
+        f"Movement detected in {zone_label} (ID: {track_id})",
+        icon_path=None,
+        duration=5,
+        threaded=True,
+    )
@@ -15,6 +15,9 @@ except ImportError:
 SourceType = Literal["webcam", "video"]
 Point = Tuple[int, int]
 
+REID_EMBEDDINGS = ("mobilenet", "backbone")
+EVENTS_PARTITIONINGS = ("none", "daily", "monthly")  # "none" plus Core_AI.event_partitions.GRANULARITIES
+
 
 @dataclass
 class VideoConfig:
@@ -36,6 +39,30 @@ class VideoConfig:
     frame_skip: int = field(
         default_factory=lambda: int(os.getenv("VIDEO_FRAME_SKIP", "0"))
     )
+    # Track on the frame_width x frame_height analysis frame, but cut re-ID and
+    # face crops from the full-resolution capture using scaled boxes.
+    dual_resolution: bool = field(
+        default_factory=lambda: os.getenv("VIDEO_DUAL_RESOLUTION", "False").lower() == "true"
+    )
+    capture_width: int | None = field(
+        default_factory=lambda: int(os.getenv("VIDEO_CAPTURE_WIDTH")) if os.getenv("VIDEO_CAPTURE_WIDTH") else None
+    )
+    capture_height: int | None = field(
+        default_factory=lambda: int(os.getenv("VIDEO_CAPTURE_HEIGHT")) if os.getenv("VIDEO_CAPTURE_HEIGHT") else None
+    )
+    stream_jpeg_quality: int = field(
+        default_factory=lambda: int(os.getenv("STREAM_JPEG_QUALITY", "80"))
+    )
+    stream_jpeg_subsampling: str = field(
+        default_factory=lambda: os.getenv("STREAM_JPEG_SUBSAMPLING", "420")
+    )
+    # auto | turbojpeg | simplejpeg | cv2
+    jpeg_backend: str = field(
+        default_factory=lambda: os.getenv("JPEG_BACKEND", "auto")
+    )
+    jpeg_workers: int = field(
+        default_factory=lambda: int(os.getenv("JPEG_WORKERS", "2"))
+    )
 
 
 @dataclass
@@ -43,6 +70,22 @@ class ZoneConfig:
     id: str
     label: str
     polygon: List[Point]
+    enter_frames: int = field(
+        default_factory=lambda: int(os.getenv("ZONE_ENTER_FRAMES", "3"))
+    )
+    exit_frames: int = field(
+        default_factory=lambda: int(os.getenv("ZONE_EXIT_FRAMES", "5"))
+    )
+    margin: float = field(
+        default_factory=lambda: float(os.getenv("ZONE_MARGIN_PX", "4"))
+    )
+    # "foot": bottom-centre of the box inside the polygon; "overlap": box area covered >= min_overlap
+    trigger: str = field(
+        default_factory=lambda: os.getenv("ZONE_TRIGGER", "foot")
+    )
+    min_overlap: float = field(
+        default_factory=lambda: float(os.getenv("ZONE_MIN_OVERLAP", "0.3"))
+    )
 
 
 @dataclass
@@ -74,6 +117,58 @@ class ModelConfig:
     reid_ema_alpha: float = field(
         default_factory=lambda: float(os.getenv("REID_EMA_ALPHA", "0.90"))
     )
+    reid_embedding: Literal["mobilenet", "backbone"] = field(
+        default_factory=lambda: os.getenv("REID_EMBEDDING", "mobilenet")
+    )
+    reid_backbone_layers: Tuple[int, ...] = field(
+        default_factory=lambda: tuple(int(i) for i in os.getenv("REID_BACKBONE_LAYERS", "15,18,21").split(","))
+    )
+    reid_quality_enabled: bool = field(
+        default_factory=lambda: os.getenv("REID_QUALITY_ENABLED", "True").lower() == "true"
+    )
+    reid_min_quality: float = field(
+        default_factory=lambda: float(os.getenv("REID_MIN_QUALITY", "0.35"))
+    )
+    inference_profile: str = field(
+        default_factory=lambda: os.getenv("INFERENCE_PROFILE", "eager")
+    )
+    inference_cache_dir: str = field(
+        default_factory=lambda: os.getenv("INFERENCE_CACHE_DIR", "models/cache")
+    )
+    reid_cross_camera_ttl_seconds: float = field(
+        default_factory=lambda: float(os.getenv("REID_CROSS_CAMERA_TTL_SECONDS", "60.0"))
+    )
+    reid_motion_gating: bool = field(
+        default_factory=lambda: os.getenv("REID_MOTION_GATING", "True").lower() == "true"
+    )
+    reid_max_speed: float = field(
+        default_factory=lambda: float(os.getenv("REID_MAX_SPEED", "2.0"))
+    )
+    reid_max_entries: int = field(
+        default_factory=lambda: int(os.getenv("REID_MAX_ENTRIES", "200"))
+    )
+    reid_max_active: int = field(
+        default_factory=lambda: int(os.getenv("REID_MAX_ACTIVE", "512"))
+    )
+    reid_max_names: int = field(
+        default_factory=lambda: int(os.getenv("REID_MAX_NAMES", "5000"))
+    )
+    reid_names_ttl_seconds: float = field(
+        default_factory=lambda: float(os.getenv("REID_NAMES_TTL_SECONDS", "3600"))
+    )
+    reid_max_faces: int = field(
+        default_factory=lambda: int(os.getenv("REID_MAX_FACES", "10000"))
+    )
+    reid_gallery_address: str = field(
+        default_factory=lambda: os.getenv("REID_GALLERY_ADDRESS", "")
+    )
+    reid_gallery_authkey: str = field(
+        default_factory=lambda: os.getenv("REID_GALLERY_AUTHKEY", "sentinal")
+    )
+
+    def __post_init__(self) -> None:
+        if self.reid_embedding not in REID_EMBEDDINGS:
+            raise ValueError(f"Unknown REID_EMBEDDING: {self.reid_embedding!r} (expected one of {REID_EMBEDDINGS})")
 
 
 @dataclass
@@ -93,6 +188,99 @@ class AlertConfig:
     camera_id: str = field(
         default_factory=lambda: os.getenv("CAMERA_ID", "cam_01")
     )
+    max_tracked_alert_keys: int = field(
+        default_factory=lambda: int(os.getenv("ALERT_MAX_TRACKED_KEYS", "10000"))
+    )
+    # Side-effect dispatcher: bounded queue per sink (snapshot, db, notify) and what to do when full.
+    queue_size: int = field(
+        default_factory=lambda: int(os.getenv("ALERT_QUEUE_SIZE", "256"))
+    )
+    overflow_policy: str = field(
+        default_factory=lambda: os.getenv("ALERT_OVERFLOW_POLICY", "drop_newest")
+    )
+    snapshot_workers: int = field(
+        default_factory=lambda: int(os.getenv("ALERT_SNAPSHOT_WORKERS", "2"))
+    )
+    snapshot_quality: int = field(
+        default_factory=lambda: int(os.getenv("ALERT_SNAPSHOT_QUALITY", "95"))
+    )
+    snapshot_subsampling: str = field(
+        default_factory=lambda: os.getenv("ALERT_SNAPSHOT_SUBSAMPLING", "444")
+    )
+    # Save the annotated frame instead of the raw one; it then reuses the stream's JPEG bytes.
+    snapshot_annotated: bool = field(
+        default_factory=lambda: os.getenv("ALERT_SNAPSHOT_ANNOTATED", "False").lower() == "true"
+    )
+    # Batched event persistence (see Core_AI/event_writer.py)
+    event_batch_size: int = field(
+        default_factory=lambda: int(os.getenv("EVENT_BATCH_SIZE", "500"))
+    )
+    event_flush_ms: int = field(
+        default_factory=lambda: int(os.getenv("EVENT_FLUSH_MS", "250"))
+    )
+    event_write_method: str = field(
+        default_factory=lambda: os.getenv("EVENT_WRITE_METHOD", "values")
+    )
+    event_buffer_max: int = field(
+        default_factory=lambda: int(os.getenv("EVENT_BUFFER_MAX", "50000"))
+    )
+    # Local SQLite spool every event is committed to before Postgres; empty = memory only
+    event_spool_path: str = field(
+        default_factory=lambda: os.getenv("EVENT_SPOOL_PATH", "data/event_spool.db")
+    )
+    event_spool_max_rows: int = field(
+        default_factory=lambda: int(os.getenv("EVENT_SPOOL_MAX_ROWS", "1000000"))
+    )
+    event_spool_synchronous: str = field(
+        default_factory=lambda: os.getenv("EVENT_SPOOL_SYNCHRONOUS", "NORMAL")
+    )
+    # none | daily | monthly: range-partition the events table on timestamp
+    events_partitioning: str = field(
+        default_factory=lambda: os.getenv("EVENTS_PARTITIONING", "none")
+    )
+    events_partitions_ahead: int = field(
+        default_factory=lambda: int(os.getenv("EVENTS_PARTITIONS_AHEAD", "3"))
+    )
+    # Drop partitions older than this many days (0 keeps everything)
+    events_retention_days: int = field(
+        default_factory=lambda: int(os.getenv("EVENTS_RETENTION_DAYS", "0"))
+    )
+    # How stale the in-process event_rollups mirror behind /stats may get
+    stats_cache_ttl_seconds: float = field(
+        default_factory=lambda: float(os.getenv("STATS_CACHE_TTL_SECONDS", "2"))
+    )
+    # Threads (and read-pool connections) serving the /events API
+    events_api_workers: int = field(
+        default_factory=lambda: int(os.getenv("EVENTS_API_WORKERS", "4"))
+    )
+    # /events/export: rows per server-side cursor fetch, and exports allowed at once
+    export_batch_rows: int = field(
+        default_factory=lambda: int(os.getenv("EXPORT_BATCH_ROWS", "5000"))
+    )
+    export_max_concurrent: int = field(
+        default_factory=lambda: int(os.getenv("EXPORT_MAX_CONCURRENT", "2"))
+    )
+    # Newest events kept in memory per camera to serve /events (0 disables). Scope "local" assumes
+    # this process writes every event; "camera" when other processes write to the same database.
+    events_ring_size: int = field(
+        default_factory=lambda: int(os.getenv("EVENTS_RING_SIZE", "500"))
+    )
+    events_ring_scope: str = field(
+        default_factory=lambda: os.getenv("EVENTS_RING_SCOPE", "local")
+    )
+    # HyperLogLog sketches behind the unique-people counts (2**precision bytes each)
+    sketch_precision: int = field(
+        default_factory=lambda: int(os.getenv("SKETCH_PRECISION", "12"))
+    )
+    sketch_flush_seconds: float = field(
+        default_factory=lambda: float(os.getenv("SKETCH_FLUSH_SECONDS", "30"))
+    )
+
+    def __post_init__(self) -> None:
+        if self.events_partitioning not in EVENTS_PARTITIONINGS:
+            raise ValueError(
+                f"Unknown EVENTS_PARTITIONING: {self.events_partitioning!r} (expected one of {EVENTS_PARTITIONINGS})"
+            )
 
 
 @dataclass
@@ -112,7 +300,13 @@ def _load_zones() -> List[ZoneConfig]:
             with open(zones_file, encoding="utf-8") as f:
                 data = json.load(f)
             return [
-                ZoneConfig(id=z["id"], label=z["label"], polygon=[(p[0], p[1]) for p in z["polygon"]])
+                ZoneConfig(
+                    id=z["id"],
+                    label=z["label"],
+                    polygon=[(p[0], p[1]) for p in z["polygon"]],
+                    # Per-zone hysteresis / trigger overrides; env defaults apply when absent.
+                    **{k: z[k] for k in ("enter_frames", "exit_frames", "margin", "trigger", "min_overlap") if z.get(k) is not None},
+                )
                 for z in data
             ]
         except Exception:
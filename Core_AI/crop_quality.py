@@ -0,0 +1,89 @@
+"""Vectorised crop quality scoring for re-ID and face embedding.
+
+Each tracked box gets a score in [0, 1], the product of:
+
+- size: box height relative to ``good_height_px``
+- aspect: closeness of h / w to a standing person
+- truncation: fraction of the box inside the frame, minus a penalty per touched edge
+- overlap: 1 - the largest fraction of the box covered by any other box
+- confidence: detector confidence rescaled above ``conf_floor``
+- blur: Laplacian variance of a small grey thumbnail of the crop
+
+Blur is only measured for boxes whose geometric score already clears
+``min_quality``, so rejected boxes never touch pixels.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+from Core_AI.utils.geometry import clip_boxes, ioa_matrix
+
+
+@dataclass(frozen=True)
+class QualityConfig:
+    enabled: bool = True
+    min_quality: float = 0.35
+    min_side_px: int = 10
+    good_height_px: float = 96.0
+    ideal_aspect: float = 2.5  # h / w of a standing person
+    aspect_tolerance: float = 0.6  # std-dev of log(aspect / ideal)
+    edge_margin_px: int = 2
+    edge_penalty: float = 0.15
+    conf_floor: float = 0.25
+    blur_ref: float = 100.0  # Laplacian variance treated as fully sharp
+    blur_size: Tuple[int, int] = (32, 64)  # (w, h) of the blur thumbnail
+
+
+def score_crops(
+    frame: np.ndarray, boxes: np.ndarray, confs: np.ndarray, cfg: QualityConfig
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(quality, valid)`` for (N, 4) xyxy ``boxes`` on ``frame``.
+
+    ``valid`` marks boxes with a usable crop at all (inside the frame and at
+    least ``min_side_px`` on each side); ``quality`` is 0 wherever it is False.
+    """
+    n = len(boxes)
+    if n == 0:
+        return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=bool)
+    h, w = frame.shape[:2]
+    boxes = boxes.astype(np.float32, copy=False)
+    bw = boxes[:, 2] - boxes[:, 0]
+    bh = boxes[:, 3] - boxes[:, 1]
+    raw_area = np.maximum(bw * bh, 1e-6)
+
+    clipped = clip_boxes(boxes, (h, w))
+    cw = clipped[:, 2] - clipped[:, 0]
+    ch = clipped[:, 3] - clipped[:, 1]
+    valid = (cw >= cfg.min_side_px) & (ch >= cfg.min_side_px)
+
+    size = np.clip(ch / cfg.good_height_px, 0.0, 1.0)
+
+    aspect = np.exp(-0.5 * (np.log(np.maximum(bh, 1e-6) / np.maximum(bw, 1e-6) / cfg.ideal_aspect) / cfg.aspect_tolerance) ** 2)
+
+    m = cfg.edge_margin_px
+    touching = (
+        (boxes[:, 0] <= m).astype(np.float32) + (boxes[:, 1] <= m) + (boxes[:, 2] >= w - m) + (boxes[:, 3] >= h - m)
+    )
+    truncation = np.clip(cw * ch / raw_area - cfg.edge_penalty * touching, 0.0, 1.0)
+
+    # Largest fraction of each box covered by another box (intersection over own area).
+    coverage = ioa_matrix(clipped, clipped)
+    np.fill_diagonal(coverage, 0.0)
+    overlap = 1.0 - np.clip(coverage.max(axis=1), 0.0, 1.0)
+
+    confidence = np.clip((confs - cfg.conf_floor) / (1.0 - cfg.conf_floor), 0.0, 1.0)
+
+    quality = (size * aspect * truncation * overlap * confidence).astype(np.float32)
+    quality[~valid] = 0.0
+
+    for i in np.flatnonzero(quality >= cfg.min_quality):
+        x1, y1, x2, y2 = clipped[i].astype(int)
+        thumb = cv2.resize(frame[y1:y2, x1:x2], cfg.blur_size, interpolation=cv2.INTER_AREA)
+        sharpness = cv2.Laplacian(cv2.cvtColor(thumb, cv2.COLOR_BGR2GRAY), cv2.CV_32F).var()
+        quality[i] *= min(1.0, float(sharpness) / cfg.blur_ref)
+
+    return quality, valid
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+import csv
+import io
+from contextlib import contextmanager
 from datetime import datetime
-from threading import Lock
-from typing import Optional
+from threading import BoundedSemaphore, Lock
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
 import psycopg2
 from psycopg2 import pool
+from psycopg2.extras import execute_values
 
+from Core_AI.config import load_config
+from Core_AI.event_rollups import RollupKey, fold
+from Core_AI.event_spool import EventRow
+from Core_AI.storage import StatsRows, Storage, event_filters
+from Core_AI.utils.hll import HyperLogLog
 from Core_AI.utils.logging_utils import get_logger
 
 logger = get_logger(__name__)
@@ -31,69 +40,293 @@ def _get_pool(db_url: str) -> Optional[pool.ThreadedConnectionPool]:
     return _pool
 
 
-def init_db(db_url: str) -> None:
-    """Initialize the PostgreSQL schema if it doesn't exist."""
+_read_pool: Optional[pool.ThreadedConnectionPool] = None
+_read_slots: Optional[BoundedSemaphore] = None
+
+
+def _get_read_pool(db_url: str, maxconn: int = 4) -> Optional[pool.ThreadedConnectionPool]:
+    """Lazy-init a separate pool for API reads, so dashboard traffic never starves event writes.
+
+    The first call sizes the pool. ``ThreadedConnectionPool`` raises instead
+    of waiting when exhausted, so borrow connections through ``_read_conn``,
+    which waits for a free one.
+    """
+    global _read_pool, _read_slots
+    if _read_pool is not None:
+        return _read_pool
+    with _pool_lock:
+        if _read_pool is None:
+            try:
+                _read_pool = pool.ThreadedConnectionPool(minconn=1, maxconn=maxconn, dsn=db_url)
+                _read_slots = BoundedSemaphore(maxconn)
+                logger.info("DB read pool initialized (maxconn=%d).", maxconn)
+            except Exception as exc:
+                logger.error("Failed to create DB read pool: %s", exc)
+                return None
+    return _read_pool
+
+
+@contextmanager
+def _read_conn(p: pool.ThreadedConnectionPool):
+    """Borrow a read-pool connection, waiting while all of them are in use."""
+    with _read_slots:
+        conn = p.getconn()
+        try:
+            yield conn
+        finally:
+            p.putconn(conn, close=bool(conn.closed))
+
+
+_EVENTS_PLAIN = """
+CREATE TABLE IF NOT EXISTS events (
+    id SERIAL PRIMARY KEY,
+    camera_id VARCHAR(50) NOT NULL,
+    object_id INTEGER NOT NULL,
+    zone VARCHAR(100) NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    snapshot_path TEXT
+);
+-- Idempotency key of spooled events; NULL for rows written by insert_event
+ALTER TABLE events ADD COLUMN IF NOT EXISTS event_key VARCHAR(64);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_events_event_key ON events(event_key);
+"""
+
+# Range-partitioned on timestamp; partitions are managed by Core_AI.event_partitions.
+# Unique indexes on a partitioned table must include the partition key.
+_EVENTS_PARTITIONED = """
+CREATE TABLE IF NOT EXISTS events (
+    id BIGSERIAL,
+    camera_id VARCHAR(50) NOT NULL,
+    object_id INTEGER NOT NULL,
+    zone VARCHAR(100) NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    snapshot_path TEXT,
+    event_key VARCHAR(64),
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+CREATE TABLE IF NOT EXISTS events_default PARTITION OF events DEFAULT;
+CREATE INDEX IF NOT EXISTS idx_events_timestamp_brin ON events USING BRIN (timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_camera_zone_ts ON events (camera_id, zone, timestamp);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_events_event_key ON events (event_key, timestamp);
+"""
+
+# B-tree indexes behind the events API: newest-first keyset pages on (timestamp, id),
+# optionally narrowed to a camera or a zone. Shared by both schemas; the partitioned one
+# also keeps its BRIN index, which serves range scans but cannot return rows in order.
+# init_db only creates them with a new events table; build_read_indexes adds them to an
+# existing one without blocking writes.
+_READ_INDEXES = {
+    "idx_events_ts_id": "timestamp, id",
+    "idx_events_camera_ts_id": "camera_id, timestamp, id",
+    "idx_events_zone_ts_id": "zone, timestamp, id",
+}
+_EVENTS_READ_INDEXES = "".join(
+    f"CREATE INDEX IF NOT EXISTS {name} ON events ({columns});\n" for name, columns in _READ_INDEXES.items()
+)
+
+_IDENTITIES = """
+CREATE TABLE IF NOT EXISTS identities (
+    id VARCHAR(50) PRIMARY KEY,
+    name VARCHAR(100),
+    face_encoding BYTEA NOT NULL,
+    snapshot_path TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Per-minute counters maintained by EventWriter; see Core_AI.event_rollups.
+_ROLLUPS = """
+CREATE TABLE IF NOT EXISTS event_rollups (
+    bucket TIMESTAMP NOT NULL,
+    camera_id VARCHAR(50) NOT NULL,
+    zone VARCHAR(100) NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (bucket, camera_id, zone)
+);
+CREATE INDEX IF NOT EXISTS idx_event_rollups_updated_at ON event_rollups (updated_at);
+-- Hourly HyperLogLog sketches of stable IDs / names per camera; see Core_AI.event_sketches.
+CREATE TABLE IF NOT EXISTS event_sketches (
+    bucket TIMESTAMP NOT NULL,
+    camera_id VARCHAR(50) NOT NULL,
+    kind VARCHAR(10) NOT NULL,
+    sketch BYTEA NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (bucket, camera_id, kind)
+);
+CREATE INDEX IF NOT EXISTS idx_event_sketches_updated_at ON event_sketches (updated_at);
+"""
+
+_ROLLUPS_BACKFILL = """
+INSERT INTO event_rollups (bucket, camera_id, zone, count)
+SELECT date_trunc('minute', timestamp), camera_id, zone, COUNT(*) FROM events GROUP BY 1, 2, 3
+"""
+
+
+def init_db(db_url: str, partitioning: str = "none") -> bool:
+    """Initialize the PostgreSQL schema if it doesn't exist.
+
+    ``partitioning`` is ``none`` (single table) or ``daily`` / ``monthly``
+    (range partitions on timestamp). Returns True if ``events`` ends up
+    partitioned. An existing plain ``events`` table is left as it is; migrate
+    it with ``scripts/events_maintenance.py --migrate``.
+    """
     if not db_url:
         logger.warning("No DATABASE_URL configured, skipping DB init.")
-        return
+        return False
+    from Core_AI.event_partitions import GRANULARITIES  # Imports this module
+
+    if partitioning != "none" and partitioning not in GRANULARITIES:
+        # Never guess here: a partitioned events table cannot be turned back into a plain one.
+        logger.error(
+            "Unknown EVENTS_PARTITIONING=%r (expected none or one of %s); using the plain events schema.",
+            partitioning, GRANULARITIES,
+        )
+        partitioning = "none"
 
-    schema = """
-    CREATE TABLE IF NOT EXISTS events (
-        id SERIAL PRIMARY KEY,
-        camera_id VARCHAR(50) NOT NULL,
-        object_id INTEGER NOT NULL,
-        zone VARCHAR(100) NOT NULL,
-        timestamp TIMESTAMP NOT NULL,
-        snapshot_path TEXT
-    );
-    CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp);
-
-    CREATE TABLE IF NOT EXISTS identities (
-        id VARCHAR(50) PRIMARY KEY,
-        name VARCHAR(100),
-        face_encoding BYTEA NOT NULL,
-        snapshot_path TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    );
-    """
     p = _get_pool(db_url)
     if p is None:
-        return
+        return False
     conn = None
+    partitioned = False
     try:
         conn = p.getconn()
         with conn.cursor() as cur:
-            cur.execute(schema)
+            events_ddl = _EVENTS_PLAIN
+            cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('events')")
+            row = cur.fetchone()
+            if partitioning != "none":
+                if row is not None and row[0] != "p":
+                    logger.warning(
+                        "EVENTS_PARTITIONING=%s but events is a plain table; keeping it. "
+                        "Run scripts/events_maintenance.py --migrate to convert it.",
+                        partitioning,
+                    )
+                else:
+                    events_ddl = _EVENTS_PARTITIONED
+                    partitioned = True
+            cur.execute("SELECT to_regclass('event_rollups')")
+            new_rollups = cur.fetchone()[0] is None
+            # Indexing an existing events table here would block writes for the whole build.
+            cur.execute(events_ddl + (_EVENTS_READ_INDEXES if row is None else "") + _IDENTITIES + _ROLLUPS)
+            if row is not None:
+                cur.execute("SELECT COUNT(*) FROM pg_class WHERE relname = ANY(%s)", (list(_READ_INDEXES),))
+                if cur.fetchone()[0] < len(_READ_INDEXES):
+                    logger.warning(
+                        "events lacks the /events API indexes; build them without blocking writes with "
+                        "scripts/events_maintenance.py --build-indexes."
+                    )
+            if new_rollups:
+                # One-off scan so rollups of an existing database start out complete.
+                cur.execute(_ROLLUPS_BACKFILL)
+                if cur.rowcount:
+                    logger.info("Backfilled %d event rollup buckets from existing events.", cur.rowcount)
         conn.commit()
-        logger.info("Database schema initialized successfully.")
+        logger.info("Database schema initialized successfully (events %s).", "partitioned" if partitioned else "plain")
     except Exception as exc:
         logger.error("Failed to initialize database schema: %s", exc)
+        partitioned = False
     finally:
         if conn:
             p.putconn(conn)
+    return partitioned
+
+
+def _drop_invalid_index(cur, name: str) -> None:
+    """Drop ``name`` if an interrupted ``CREATE INDEX CONCURRENTLY`` left it invalid."""
+    cur.execute("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", (name,))
+    row = cur.fetchone()
+    if row is not None and not row[0]:
+        cur.execute(f"DROP INDEX CONCURRENTLY {name}")
+
+
+def build_read_indexes(db_url: str) -> bool:
+    """Build the events API indexes on an existing table with ``CREATE INDEX CONCURRENTLY``.
+
+    A partitioned parent cannot be indexed concurrently, so its index is
+    created ``ON ONLY`` the parent and each partition's copy is built
+    concurrently and attached. On the plain schema, ``idx_events_timestamp``
+    is dropped afterwards; ``idx_events_ts_id`` covers it. Safe to re-run.
+    """
+    p = _get_pool(db_url)
+    if p is None:
+        return False
+    conn = None
+    try:
+        conn = p.getconn()
+        conn.autocommit = True  # CONCURRENTLY cannot run inside a transaction block
+        with conn.cursor() as cur:
+            cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('events')")
+            row = cur.fetchone()
+            if row is None:
+                logger.info("No events table yet; init_db creates it with its indexes.")
+                return True
+            if row[0] == "p":
+                cur.execute(
+                    "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = 'events'::regclass"
+                )
+                partitions = [r[0] for r in cur.fetchall()]
+                for name, columns in _READ_INDEXES.items():
+                    cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY events ({columns})")
+                    cur.execute(
+                        "SELECT x.indrelid::regclass::text FROM pg_inherits i JOIN pg_index x ON x.indexrelid = i.inhrelid "
+                        "WHERE i.inhparent = to_regclass(%s)",
+                        (name,),
+                    )
+                    covered = {r[0] for r in cur.fetchall()}
+                    for part in partitions:
+                        if part in covered:
+                            continue
+                        part_index = f"{part}_{name[len('idx_events_'):]}"
+                        _drop_invalid_index(cur, part_index)
+                        cur.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {part_index} ON {part} ({columns})")
+                        cur.execute(f"ALTER INDEX {name} ATTACH PARTITION {part_index}")
+            else:
+                for name, columns in _READ_INDEXES.items():
+                    _drop_invalid_index(cur, name)
+                    cur.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON events ({columns})")
+                cur.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_events_timestamp")
+        logger.info("events API indexes are in place.")
+        return True
+    except Exception as exc:
+        logger.error("Failed to build events indexes: %s", exc)
+        return False
+    finally:
+        if conn:
+            if not conn.closed:
+                conn.autocommit = False
+            p.putconn(conn, close=bool(conn.closed))
 
 
-def insert_event(db_url: str, camera_id: str, object_id: int, zone: str, ts: datetime, snapshot_path: str) -> None:
-    """Insert a single alert event, reusing a pooled connection."""
+def insert_event(db_url: str, camera_id: str, object_id: int, zone: str, ts: datetime, snapshot_path: str) -> bool:
+    """Insert a single alert event, reusing a pooled connection; returns False if it was not stored."""
     if not db_url:
-        return
+        return True
 
     query = """
     INSERT INTO events (camera_id, object_id, zone, timestamp, snapshot_path)
     VALUES (%s, %s, %s, %s, %s)
     """
+    rollup = """
+    INSERT INTO event_rollups (bucket, camera_id, zone, count) VALUES (date_trunc('minute', %s::timestamp), %s, %s, 1)
+    ON CONFLICT (bucket, camera_id, zone) DO UPDATE SET count = event_rollups.count + 1, updated_at = now()
+    """
     p = _get_pool(db_url)
     if p is None:
-        return
+        return False
     conn = None
     try:
         conn = p.getconn()
         with conn.cursor() as cur:
             cur.execute(query, (camera_id, object_id, zone, ts, snapshot_path))
+            cur.execute(rollup, (ts, camera_id, zone))
         conn.commit()
+        return True
     except Exception as exc:
         logger.error("Failed to insert event into database: %s", exc)
+        return False
     finally:
         if conn:
             p.putconn(conn)
@@ -129,6 +362,46 @@ def get_recent_events(db_url: str, limit: int = 50) -> list:
             p.putconn(conn)
 
 
+def query_events(
+    db_url: str,
+    limit: int = 50,
+    before: Optional[Tuple[datetime, int]] = None,
+    camera_id: Optional[str] = None,
+    zone: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    pool_size: int = 4,
+) -> List[dict]:
+    """Newest-first page of events from the read pool, optionally filtered.
+
+    ``before`` is the ``(timestamp, id)`` of the last row of the previous
+    page (keyset pagination: every page costs the same, however deep).
+    ``since`` is inclusive, ``until`` exclusive. Raises on database errors.
+    """
+    p = _get_read_pool(db_url, pool_size)
+    if p is None:
+        raise ConnectionError("no database read pool")
+    where, params = event_filters(camera_id, zone, since, until, before=before)
+    with _read_conn(p) as conn:
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT id, camera_id, object_id, zone, timestamp, snapshot_path FROM events "
+                    f"{where}ORDER BY timestamp DESC, id DESC LIMIT %s",
+                    (*params, limit),
+                )
+                rows = cur.fetchall()
+            conn.rollback()  # End the read-only transaction before handing the connection back
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+    return [
+        {"id": r[0], "camera_id": r[1], "object_id": r[2], "zone": r[3], "timestamp": r[4], "snapshot_path": r[5]}
+        for r in rows
+    ]
+
+
 def save_identity(db_url: str, identity_id: str, face_encoding: bytes, snapshot_path: str) -> None:
     """Save a new unknown identity with their facial embedding vector."""
     if not db_url:
@@ -208,3 +481,206 @@ def update_identity_last_seen(db_url: str, identity_id: str, ts: datetime) -> No
     finally:
         if conn: p.putconn(conn)
 
+
+
+_EVENT_COLUMNS = "camera_id, object_id, zone, timestamp, snapshot_path, event_key"
+_RETURNING = "RETURNING id, camera_id, object_id, zone, timestamp, snapshot_path"
+
+_ROLLUP_UPSERT = (
+    "INSERT INTO event_rollups (bucket, camera_id, zone, count) VALUES %s "
+    "ON CONFLICT (bucket, camera_id, zone) DO UPDATE "
+    "SET count = event_rollups.count + EXCLUDED.count, updated_at = now()"
+)
+
+
+def apply_rollups(cur, counts: Dict[RollupKey, int]) -> None:
+    """Add ``counts`` to ``event_rollups`` using the caller's cursor (and transaction)."""
+    if not counts:
+        return
+    # Sorted so concurrent writers lock rows in the same order and cannot deadlock.
+    execute_values(cur, _ROLLUP_UPSERT, [(b, c, z, n) for (b, c, z), n in sorted(counts.items())], page_size=len(counts))
+
+
+def merge_sketches(cur, sketches: Dict[Tuple[datetime, str, str], HyperLogLog]) -> None:
+    """Merge ``sketches`` into ``event_sketches`` using the caller's cursor (and transaction)."""
+    for key in sorted(sketches):  # Fixed lock order across writers
+        sketch = sketches[key]
+        for _ in range(2):
+            cur.execute(
+                "SELECT sketch FROM event_sketches WHERE bucket = %s AND camera_id = %s AND kind = %s FOR UPDATE",
+                key,
+            )
+            row = cur.fetchone()
+            if row is not None:
+                merged = HyperLogLog.from_bytes(row[0])
+                merged.merge(sketch)
+                cur.execute(
+                    "UPDATE event_sketches SET sketch = %s, updated_at = now() "
+                    "WHERE bucket = %s AND camera_id = %s AND kind = %s",
+                    (merged.to_bytes(), *key),
+                )
+                break
+            cur.execute(
+                "INSERT INTO event_sketches (bucket, camera_id, kind, sketch) VALUES (%s, %s, %s, %s) "
+                "ON CONFLICT (bucket, camera_id, kind) DO NOTHING",
+                (*key, sketch.to_bytes()),
+            )
+            if cur.rowcount:
+                break
+            # Another writer inserted the row first; merge into theirs.
+
+
+@contextmanager
+def _transaction(p: Optional[pool.ThreadedConnectionPool]):
+    """Cursor in one transaction on a pooled connection; commits, or rolls back and re-raises."""
+    if p is None:
+        raise ConnectionError("no database connection pool")
+    conn = p.getconn()
+    try:
+        with conn.cursor() as cur:
+            yield cur
+        conn.commit()
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        p.putconn(conn, close=bool(conn.closed))  # Do not hand a dead connection back out
+
+
+class PostgresStorage(Storage):
+    """``Storage`` on the write and read pools above."""
+
+    backend = "postgres"
+
+    def __init__(self, db_url: str, read_pool_size: Optional[int] = None) -> None:
+        self._db_url = db_url
+        if read_pool_size is None:
+            # From config rather than the caller: whichever component opens storage first sizes the pool.
+            read_pool_size = load_config().alert.events_api_workers
+        self._read_pool_size = max(1, read_pool_size)
+
+    def init(self, partitioning: str = "none") -> bool:
+        return init_db(self._db_url, partitioning)
+
+    def write_events(self, rows: Sequence[EventRow], method: str = "values") -> List[dict]:
+        with _transaction(_get_pool(self._db_url)) as cur:
+            if method == "copy":
+                cur.execute(
+                    "CREATE TEMP TABLE IF NOT EXISTS events_stage "
+                    "(LIKE events INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+                )
+                buf = io.StringIO()
+                writer = csv.writer(buf)
+                for row in rows:
+                    writer.writerow([
+                        row.camera_id, row.object_id, row.zone, row.timestamp.isoformat(),
+                        "" if row.snapshot_path is None else row.snapshot_path, row.event_key,
+                    ])
+                buf.seek(0)
+                cur.copy_expert(f"COPY events_stage ({_EVENT_COLUMNS}) FROM STDIN WITH (FORMAT csv, NULL '')", buf)
+                cur.execute(
+                    f"INSERT INTO events ({_EVENT_COLUMNS}) SELECT {_EVENT_COLUMNS} FROM events_stage "
+                    f"ON CONFLICT DO NOTHING {_RETURNING}"
+                )
+                inserted = cur.fetchall()
+            else:
+                inserted = execute_values(
+                    cur,
+                    f"INSERT INTO events ({_EVENT_COLUMNS}) VALUES %s ON CONFLICT DO NOTHING {_RETURNING}",
+                    rows,
+                    page_size=len(rows),
+                    fetch=True,
+                )
+            # Same transaction: rollups count exactly the rows that landed.
+            apply_rollups(cur, fold((r[1], r[3], r[4]) for r in inserted))
+        return [
+            {"id": r[0], "camera_id": r[1], "object_id": r[2], "zone": r[3], "timestamp": r[4], "snapshot_path": r[5]}
+            for r in inserted
+        ]
+
+    def query_events(
+        self,
+        limit: int = 50,
+        before: Optional[Tuple[datetime, int]] = None,
+        camera_id: Optional[str] = None,
+        zone: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[dict]:
+        return query_events(self._db_url, limit, before, camera_id, zone, since, until, pool_size=self._read_pool_size)
+
+    def iter_events(
+        self,
+        batch_rows: int,
+        camera_id: Optional[str] = None,
+        zone: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Iterator[List[tuple]]:
+        batches = self._export_batches(batch_rows, camera_id, zone, since, until)
+        next(batches)  # Connect now: failures raise here, and from here on close / GC closes the connection
+        return batches
+
+    def _export_batches(
+        self,
+        batch_rows: int,
+        camera_id: Optional[str],
+        zone: Optional[str],
+        since: Optional[datetime],
+        until: Optional[datetime],
+    ) -> Iterator[List[tuple]]:
+        # Its own connection for the whole export rather than one held out of the read pool.
+        conn = psycopg2.connect(self._db_url)
+        where, params = event_filters(camera_id, zone, since, until)
+        rows = 0
+        try:
+            conn.set_session(readonly=True)
+            yield []  # Primed by iter_events
+            with conn.cursor(name="events_export") as cur:  # Server-side: streams instead of loading every row
+                cur.itersize = batch_rows
+                cur.execute(
+                    f"SELECT id, camera_id, object_id, zone, timestamp, snapshot_path FROM events {where}"
+                    "ORDER BY timestamp, id",
+                    params,
+                )
+                while True:
+                    batch = cur.fetchmany(batch_rows)
+                    if not batch:
+                        break
+                    rows += len(batch)
+                    yield batch
+            logger.info("Exported %d events.", rows)
+        finally:
+            conn.close()  # Also ends the transaction and the server-side cursor if the client went away
+
+    def read_stats(self, since: datetime, sketches_since: datetime, changed_since: Optional[datetime] = None) -> StatsRows:
+        changed = "" if changed_since is None else " AND updated_at >= %s"
+        extra = () if changed_since is None else (changed_since,)
+        with _transaction(_get_pool(self._db_url)) as cur:
+            cur.execute("SELECT now()::timestamp")
+            db_now = cur.fetchone()[0]
+            cur.execute("SELECT bucket, camera_id, zone, count FROM event_rollups WHERE bucket >= %s" + changed, (since, *extra))
+            rows = cur.fetchall()
+            cur.execute(
+                "SELECT bucket, camera_id, kind, sketch FROM event_sketches WHERE bucket >= %s" + changed,
+                (sketches_since, *extra),
+            )
+            sketch_rows = cur.fetchall()
+        return db_now, rows, sketch_rows
+
+    def merge_sketches(self, sketches: Dict[Tuple[datetime, str, str], HyperLogLog]) -> None:
+        with _transaction(_get_pool(self._db_url)) as cur:
+            merge_sketches(cur, sketches)
+
+    def save_identity(self, identity_id: str, face_encoding: bytes, snapshot_path: str) -> None:
+        save_identity(self._db_url, identity_id, face_encoding, snapshot_path)
+
+    def load_identities(self) -> List[dict]:
+        return load_all_identities(self._db_url)
+
+    def update_identity_name(self, identity_id: str, name: str) -> None:
+        update_identity_name(self._db_url, identity_id, name)
+
+    def update_identity_last_seen(self, identity_id: str, ts: datetime) -> None:
+        update_identity_last_seen(self._db_url, identity_id, ts)
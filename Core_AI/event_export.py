@@ -0,0 +1,145 @@
+"""Streaming bulk export of events as NDJSON, CSV or Parquet, optionally gzipped.
+
+Rows are read through the storage backend's ``iter_events`` in
+``batch_rows`` batches, oldest first (a server-side cursor on Postgres),
+and each batch is encoded and handed out as bytes before the next one is
+fetched, so memory stays flat however many rows the export covers. Each
+export holds its own read-only connection for its whole duration instead
+of borrowing one from the API's read pool.
+
+Parquet needs the optional ``pyarrow`` package; each batch becomes one row
+group.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from Core_AI.storage import get_storage
+
+
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+COLUMNS = ("id", "camera_id", "object_id", "zone", "timestamp", "snapshot_path")
+
+Row = Tuple[int, str, int, str, datetime, Optional[str]]
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _ndjson(batches: Iterator[Sequence[Row]]) -> Iterator[bytes]:
+    for batch in batches:
+        yield "".join(
+            json.dumps(dict(zip(COLUMNS, (r[0], r[1], r[2], r[3], r[4].isoformat(), r[5])))) + "\n" for r in batch
+        ).encode("utf-8")
+
+
+def _csv(batches: Iterator[Sequence[Row]]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(COLUMNS)
+    for batch in batches:
+        writer.writerows((r[0], r[1], r[2], r[3], r[4].isoformat(), r[5]) for r in batch)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")  # Header of an empty export
+
+
+class _Chunks(io.RawIOBase):
+    """Write-only sink that hands written bytes back out in pieces."""
+
+    def __init__(self) -> None:
+        self._parts: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts.clear()
+        return out
+
+
+def _parquet(batches: Iterator[Sequence[Row]]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.int64()), ("camera_id", pa.string()), ("object_id", pa.int64()),
+        ("zone", pa.string()), ("timestamp", pa.timestamp("us")), ("snapshot_path", pa.string()),
+    ])
+    sink = _Chunks()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in batches:
+            columns = list(zip(*batch))
+            writer.write_table(pa.table([pa.array(c, type=f.type) for c, f in zip(columns, schema)], schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()  # Footer
+
+
+def _gzip(chunks: Iterator[bytes], level: int = 6) -> Iterator[bytes]:
+    z = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
+
+
+def export_events(
+    db_url: str,
+    fmt: str = "ndjson",
+    gzip: bool = False,
+    camera_id: Optional[str] = None,
+    zone: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    batch_rows: int = 5000,
+) -> Iterator[bytes]:
+    """Encoded export, oldest event first, as an iterator of byte chunks.
+
+    Bad arguments and connection failures raise here, before anything is
+    streamed. The connection is closed when the iterator is exhausted,
+    closed or garbage collected, whether or not it was ever iterated.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == "parquet" and not parquet_available():
+        raise ValueError("Parquet export needs pyarrow (pip install pyarrow)")
+    store = get_storage(db_url)
+    if store is None:
+        raise ConnectionError("no event storage")
+    encode = {"ndjson": _ndjson, "csv": _csv, "parquet": _parquet}[fmt]
+    chunks = encode(store.iter_events(batch_rows, camera_id, zone, since, until))
+    return _gzip(chunks) if gzip else chunks
+
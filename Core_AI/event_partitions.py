@@ -0,0 +1,250 @@
+"""Partition management for the time-partitioned ``events`` schema.
+
+With ``EVENTS_PARTITIONING=daily`` or ``monthly``, ``init_db`` creates
+``events`` as a range-partitioned table on ``timestamp`` with a DEFAULT
+partition for stray rows. This module keeps partitions for the current
+period and ``ahead`` future periods in place, and applies retention by
+dropping whole partitions (no DELETE, no vacuum debt), along with the
+``event_rollups`` / ``event_sketches`` buckets that counted them.
+
+Partitions are named ``events_pYYYYMMDD`` (daily) or ``events_pYYYYMM``
+(monthly). A new partition is created detached, back-filled with any
+matching rows from the DEFAULT partition, then attached, so creation never
+fails because the DEFAULT partition already holds rows for its range.
+"""
+from __future__ import annotations
+
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from Core_AI.db import _EVENTS_PARTITIONED, _EVENTS_READ_INDEXES, _get_pool
+from Core_AI.event_rollups import minute_bucket
+from Core_AI.event_sketches import hour_bucket
+from Core_AI.utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+
+GRANULARITIES = ("daily", "monthly")
+
+_NAME = re.compile(r"^events_p(\d{8}|\d{6})$")
+
+
+def period_start(ts: datetime, granularity: str) -> datetime:
+    if granularity == "daily":
+        return datetime(ts.year, ts.month, ts.day)
+    if granularity == "monthly":
+        return datetime(ts.year, ts.month, 1)
+    raise ValueError(f"Unknown partition granularity: {granularity}")
+
+
+def next_period(start: datetime, granularity: str) -> datetime:
+    if granularity == "daily":
+        return start + timedelta(days=1)
+    return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def partition_name(start: datetime, granularity: str) -> str:
+    return f"events_p{start:%Y%m%d}" if granularity == "daily" else f"events_p{start:%Y%m}"
+
+
+def _bounds_from_name(name: str) -> Optional[Tuple[datetime, datetime]]:
+    match = _NAME.match(name)
+    if not match:
+        return None
+    digits = match.group(1)
+    if len(digits) == 8:
+        start = datetime.strptime(digits, "%Y%m%d")
+        return start, next_period(start, "daily")
+    start = datetime.strptime(digits, "%Y%m")
+    return start, next_period(start, "monthly")
+
+
+def ensure_partitions(
+    db_url: str, granularity: str, ahead: int = 3, now: Optional[datetime] = None, since: Optional[datetime] = None
+) -> List[str]:
+    """Create missing partitions from ``since`` (default: now) through ``ahead`` periods past now.
+
+    Returns the names created.
+    """
+    p = _get_pool(db_url)
+    if p is None:
+        return []
+    now = now or datetime.utcnow()
+    start = period_start(min(since or now, now), granularity)
+    last = period_start(now, granularity)
+    for _ in range(max(0, ahead)):
+        last = next_period(last, granularity)
+    created: List[str] = []
+    conn = None
+    try:
+        conn = p.getconn()
+        with conn.cursor() as cur:
+            while start <= last:
+                end = next_period(start, granularity)
+                name = partition_name(start, granularity)
+                cur.execute("SELECT to_regclass(%s)", (name,))
+                if cur.fetchone()[0] is None:
+                    cur.execute(f"CREATE TABLE {name} (LIKE events INCLUDING DEFAULTS)")
+                    cur.execute(
+                        f"WITH moved AS (DELETE FROM events_default WHERE timestamp >= %s AND timestamp < %s RETURNING *) "
+                        f"INSERT INTO {name} SELECT * FROM moved",
+                        (start, end),
+                    )
+                    cur.execute(f"ALTER TABLE events ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)", (start, end))
+                    conn.commit()
+                    created.append(name)
+                start = end
+        if created:
+            logger.info("Created event partitions: %s", ", ".join(created))
+    except Exception as exc:
+        if conn:
+            conn.rollback()
+        logger.error("Failed to create event partitions: %s", exc)
+    finally:
+        if conn:
+            p.putconn(conn)
+    return created
+
+
+def drop_expired_partitions(db_url: str, retention_days: int, now: Optional[datetime] = None) -> List[str]:
+    """Drop partitions that end before the retention cutoff; returns the names dropped."""
+    if retention_days <= 0:
+        return []
+    p = _get_pool(db_url)
+    if p is None:
+        return []
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    dropped: List[str] = []
+    conn = None
+    try:
+        conn = p.getconn()
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'events'::regclass"
+            )
+            for (name,) in cur.fetchall():
+                bounds = _bounds_from_name(name)
+                if bounds is not None and bounds[1] <= cutoff:
+                    cur.execute(f"DROP TABLE IF EXISTS {name}")
+                    dropped.append(name)
+            # The DEFAULT partition only ever holds strays, so a DELETE there stays small.
+            cur.execute("DELETE FROM events_default WHERE timestamp < %s", (cutoff,))
+            # Stats must not outlive the events they count: drop buckets that end before the cutoff.
+            cur.execute("DELETE FROM event_rollups WHERE bucket < %s", (minute_bucket(cutoff),))
+            rollups = cur.rowcount
+            cur.execute("DELETE FROM event_sketches WHERE bucket < %s", (hour_bucket(cutoff),))
+            sketches = cur.rowcount
+        conn.commit()
+        if dropped:
+            logger.info("Retention dropped event partitions older than %s: %s", cutoff.date(), ", ".join(dropped))
+        if rollups or sketches:
+            logger.info("Retention dropped %d rollup buckets and %d sketches.", rollups, sketches)
+    except Exception as exc:
+        if conn:
+            conn.rollback()
+        logger.error("Event retention failed: %s", exc)
+    finally:
+        if conn:
+            p.putconn(conn)
+    return dropped
+
+
+def migrate_plain_events(db_url: str, granularity: str, ahead: int = 3) -> bool:
+    """Convert a plain ``events`` table into the partitioned schema, copying every row.
+
+    The old table is kept as ``events_legacy`` for the operator to drop once
+    satisfied. Stop the pipelines first; events written meanwhile stay in
+    their spools and replay afterwards.
+    """
+    p = _get_pool(db_url)
+    if p is None:
+        return False
+    conn = None
+    try:
+        conn = p.getconn()
+        with conn.cursor() as cur:
+            cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('events')")
+            row = cur.fetchone()
+            if row is None or row[0] == "p":
+                logger.info("Nothing to migrate: events is %s.", "missing" if row is None else "already partitioned")
+                return False
+            # Free the table, constraint and index names the partitioned schema reuses.
+            cur.execute("ALTER TABLE events RENAME TO events_legacy")
+            cur.execute("ALTER TABLE events_legacy RENAME CONSTRAINT events_pkey TO events_legacy_pkey")
+            cur.execute("ALTER INDEX IF EXISTS idx_events_timestamp RENAME TO idx_events_legacy_timestamp")
+            cur.execute("ALTER INDEX IF EXISTS idx_events_event_key RENAME TO idx_events_legacy_event_key")
+            for index in ("ts_id", "camera_ts_id", "zone_ts_id"):
+                cur.execute(f"ALTER INDEX IF EXISTS idx_events_{index} RENAME TO idx_events_legacy_{index}")
+            cur.execute(_EVENTS_PARTITIONED + _EVENTS_READ_INDEXES)
+            cur.execute("SELECT MIN(timestamp) FROM events_legacy")
+            oldest = cur.fetchone()[0]
+        conn.commit()
+
+        ensure_partitions(db_url, granularity, ahead, since=oldest)
+
+        with conn.cursor() as cur:
+            cur.execute(
+                "INSERT INTO events (id, camera_id, object_id, zone, timestamp, snapshot_path, event_key) "
+                "SELECT id, camera_id, object_id, zone, timestamp, snapshot_path, event_key FROM events_legacy"
+            )
+            copied = cur.rowcount
+            cur.execute(
+                "SELECT setval(pg_get_serial_sequence('events', 'id'), GREATEST((SELECT MAX(id) FROM events), 1))"
+            )
+        conn.commit()
+        logger.info("Migrated %d events into the partitioned table; old data kept in events_legacy.", copied)
+        return True
+    except Exception as exc:
+        if conn:
+            conn.rollback()
+        logger.error("Event table migration failed: %s", exc)
+        return False
+    finally:
+        if conn:
+            p.putconn(conn)
+
+
+class PartitionMaintainer:
+    """Background thread: create upcoming partitions and apply retention every ``interval_s``."""
+
+    def __init__(self, db_url: str, granularity: str, ahead: int, retention_days: int, interval_s: float = 3600.0) -> None:
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown partition granularity: {granularity}")
+        self._db_url = db_url
+        self._granularity = granularity
+        self._ahead = ahead
+        self._retention_days = retention_days
+        self._interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="EventPartitions")
+        self._thread.start()
+
+    def run_once(self) -> None:
+        ensure_partitions(self._db_url, self._granularity, self._ahead)
+        drop_expired_partitions(self._db_url, self._retention_days)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self._interval_s)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+_maintainers: Dict[str, PartitionMaintainer] = {}
+_maintainers_lock = threading.Lock()
+
+
+def start_partition_maintenance(db_url: str, granularity: str, ahead: int = 3, retention_days: int = 0) -> PartitionMaintainer:
+    """Start (once per database) the partition maintenance thread."""
+    with _maintainers_lock:
+        maintainer = _maintainers.get(db_url)
+        if maintainer is None:
+            maintainer = _maintainers[db_url] = PartitionMaintainer(db_url, granularity, ahead, retention_days)
+        return maintainer
@@ -0,0 +1,188 @@
+"""Bounded in-memory ring of the newest events per camera, for the events API.
+
+``AlertManager`` subscribes the process-wide ring to its ``EventWriter``,
+so each committed batch lands here with its database ``id`` and ring pages
+continue seamlessly into database pages under the same ``(timestamp, id)``
+cursor.
+
+A ring answers a query only when it provably holds the whole page. Per
+camera it tracks a *floor*: the key of the newest event it evicted, or the
+point it started listening (or was warmed from the database). Every event
+above the floor is in memory. A page is served when it fills up above the
+floor, or when its ``since`` bound lies above the floor; otherwise the
+caller falls through to the database.
+
+``scope="local"`` assumes this process writes every event, so unfiltered
+queries can be served. With ``scope="camera"``, for when other processes
+write to the same table, only queries for a single camera fed by this
+process are served.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+Key = Tuple[datetime, int]  # (timestamp, id): the events API sort / cursor key
+
+SCOPES = ("local", "camera")
+
+_BOTTOM: Key = (datetime.min, 0)
+
+
+def _key(row: dict) -> Key:
+    return row["timestamp"], row["id"]
+
+
+class EventRing:
+    """Per-camera bounded, sorted buffers of recently committed events."""
+
+    def __init__(self, per_camera: int = 500, scope: str = "local") -> None:
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown event ring scope: {scope}")
+        self._per_camera = max(1, per_camera)
+        self._scope = scope
+        self._lock = threading.Lock()
+        self._keys: Dict[str, List[Key]] = {}
+        self._rows: Dict[str, List[dict]] = {}
+        self._floors: Dict[str, Key] = {}
+        # Complete above this for every camera, including ones not seen yet.
+        self._floor: Key = _BOTTOM
+        self._attached = False
+        self._warmed = False
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def per_camera(self) -> int:
+        return self._per_camera
+
+    def attach(self, subscribe: Callable[[Callable[[List[dict]], None]], None]) -> None:
+        """Start receiving committed rows via ``subscribe`` (once per ring)."""
+        with self._lock:
+            if self._attached:
+                return
+            self._attached = True
+            # Rows committed before now were never delivered; memory is complete only from here.
+            self._floor = max(self._floor, (datetime.utcnow(), 0))
+        subscribe(self.extend)
+
+    def extend(self, rows: Iterable[dict]) -> None:
+        """Insert committed rows (any order); evicts the oldest beyond ``per_camera`` per camera."""
+        with self._lock:
+            for row in rows:
+                camera_id = row["camera_id"]
+                key = _key(row)
+                floor = max(self._floor, self._floors.get(camera_id, _BOTTOM))
+                if key <= floor and self._warmed:
+                    # Below the complete range (e.g. a spool replay of old events). Until warmed, keep
+                    # them: ``warm`` may lower the floor beneath them.
+                    continue
+                keys = self._keys.setdefault(camera_id, [])
+                cells = self._rows.setdefault(camera_id, [])
+                i = bisect.bisect_left(keys, key)
+                if i < len(keys) and keys[i] == key:
+                    continue
+                keys.insert(i, key)
+                cells.insert(i, row)
+                if len(keys) > self._per_camera:
+                    self._floors[camera_id] = max(floor, keys.pop(0))
+                    cells.pop(0)
+
+    def warm(self, rows: List[dict], limit: int) -> None:
+        """Seed with the newest ``limit`` events overall, queried from the database after ``attach``."""
+        with self._lock:
+            if self._warmed or not self._attached:
+                return
+            self._warmed = True
+            # Rows committed since attach were all delivered; older ones are complete above the
+            # oldest row of this page (a short page holds the whole table).
+            self._floor = _key(rows[-1]) if len(rows) >= limit else _BOTTOM
+        self.extend(rows)
+
+    @property
+    def attached(self) -> bool:
+        return self._attached
+
+    @property
+    def warmed(self) -> bool:
+        return self._warmed
+
+    def query(
+        self,
+        limit: int,
+        before: Optional[Key] = None,
+        camera_id: Optional[str] = None,
+        zone: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Optional[List[dict]]:
+        """The page the database would return, or None if the ring cannot vouch for it."""
+        with self._lock:
+            served = self._attached and (camera_id is not None or self._scope == "local")
+            if served and self._scope == "camera":
+                served = camera_id in self._keys
+            if not served:
+                self.misses += 1
+                return None
+            cameras = [camera_id] if camera_id is not None else list(self._keys)
+            floor = max([self._floor] + [self._floors.get(c, _BOTTOM) for c in cameras])
+            page: List[dict] = []
+            for cam in cameras:
+                keys = self._keys.get(cam, [])
+                cells = self._rows.get(cam, [])
+                stop = bisect.bisect_left(keys, before) if before is not None else len(keys)
+                # Walk newest-first; each camera contributes at most ``limit`` matches.
+                taken = 0
+                for i in range(stop - 1, -1, -1):
+                    row = cells[i]
+                    if since is not None and row["timestamp"] < since:
+                        break
+                    if (until is not None and row["timestamp"] >= until) or (zone is not None and row["zone"] != zone):
+                        continue
+                    page.append(row)
+                    taken += 1
+                    if taken >= limit:
+                        break
+            page.sort(key=_key, reverse=True)
+            page = page[:limit]
+            if len(page) == limit:
+                complete = _key(page[-1]) > floor
+            else:
+                # A short page is the full answer only if everything since ``since`` is above the floor.
+                complete = since is not None and floor <= (since, 0)
+            if complete:
+                self.hits += 1
+                return [dict(row) for row in page]
+            self.misses += 1
+            return None
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "cameras": len(self._keys),
+                "events": sum(len(k) for k in self._keys.values()),
+                "per_camera": self._per_camera,
+                "scope": self._scope,
+                "attached": self._attached,
+                "warmed": self._warmed,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else None,
+            }
+
+
+_ring: Optional[EventRing] = None
+_ring_lock = threading.Lock()
+
+
+def get_event_ring(per_camera: int = 500, scope: str = "local") -> EventRing:
+    """Return the process-wide ring (created on first use with these settings)."""
+    global _ring
+    with _ring_lock:
+        if _ring is None:
+            _ring = EventRing(per_camera, scope)
+        return _ring
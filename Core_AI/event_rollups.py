@@ -0,0 +1,231 @@
+"""Per-minute event rollups for the dashboard statistics.
+
+``event_rollups`` holds one row per (minute, camera, zone) with the number
+of events in it. The storage backend folds the rows each ``EventWriter``
+batch actually inserted into these counters inside the same transaction,
+so rollups always agree with ``events`` and replayed duplicates are never
+counted twice.
+
+``RollupCache`` mirrors the last ``horizon_hours`` of rollups in memory. It
+loads them once, then only pulls rows whose ``updated_at`` moved since the
+previous refresh, and keeps hourly subtotals next to the minute buckets, so
+a 1h, 24h or 7d window is summed from at most a few hundred buckets
+regardless of how many events they hold. It mirrors the hourly
+``event_sketches`` the same way, so distinct people over a window and a
+set of cameras is one HyperLogLog merge.
+"""
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from time import monotonic
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from Core_AI.event_sketches import hour_bucket
+from Core_AI.storage import get_storage, sqlite_path
+from Core_AI.utils.hll import HyperLogLog
+from Core_AI.utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+
+RollupKey = Tuple[datetime, str, str]  # (minute bucket, camera_id, zone)
+
+WINDOWS = {"1h": timedelta(hours=1), "24h": timedelta(hours=24), "7d": timedelta(days=7)}
+
+# Rows committed by a transaction that started before the previous refresh
+# carry an older updated_at; re-reading this much history catches them.
+_REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+def minute_bucket(ts: datetime) -> datetime:
+    return ts.replace(second=0, microsecond=0)
+
+
+def fold(rows: Iterable[Tuple[str, str, datetime]]) -> Dict[RollupKey, int]:
+    """Count ``(camera_id, zone, timestamp)`` rows per minute bucket."""
+    counts: Counter = Counter()
+    for camera_id, zone, ts in rows:
+        counts[(minute_bucket(ts), camera_id, zone)] += 1
+    return dict(counts)
+
+
+def rebuild_rollups(db_url: str, since: Optional[datetime] = None) -> bool:
+    """Recompute rollups from ``events`` (everything, or from ``since`` on). Stop the pipelines first."""
+    if sqlite_path(db_url) is not None:
+        logger.error("Rebuilding rollups is only supported on PostgreSQL.")
+        return False
+    from Core_AI.db import _get_pool
+
+    p = _get_pool(db_url)
+    if p is None:
+        return False
+    since = minute_bucket(since) if since else datetime.min
+    conn = None
+    try:
+        conn = p.getconn()
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM event_rollups WHERE bucket >= %s", (since,))
+            cur.execute(
+                "INSERT INTO event_rollups (bucket, camera_id, zone, count) "
+                "SELECT date_trunc('minute', timestamp), camera_id, zone, COUNT(*) FROM events "
+                "WHERE timestamp >= %s GROUP BY 1, 2, 3",
+                (since,),
+            )
+            buckets = cur.rowcount
+        conn.commit()
+        logger.info("Rebuilt %d event rollup buckets.", buckets)
+        return True
+    except Exception as exc:
+        if conn:
+            conn.rollback()
+        logger.error("Failed to rebuild event rollups: %s", exc)
+        return False
+    finally:
+        if conn:
+            p.putconn(conn)
+
+
+class RollupCache:
+    """In-process mirror of recent ``event_rollups``, refreshed incrementally."""
+
+    def __init__(self, db_url: str, ttl_s: float = 2.0, horizon_hours: int = 24 * 7, retention_days: int = 0) -> None:
+        self._db_url = db_url
+        self._ttl_s = ttl_s
+        self._horizon = timedelta(hours=horizon_hours)
+        # Buckets past event retention are deleted from the database, which incremental refreshes never see.
+        self._retention = timedelta(days=retention_days) if retention_days > 0 else None
+        self._lock = threading.Lock()
+        self._minutes: Dict[datetime, Dict[Tuple[str, str], int]] = {}
+        self._hours: Dict[datetime, Counter] = {}
+        self._sketches: Dict[Tuple[datetime, str, str], HyperLogLog] = {}  # (hour, camera_id, kind)
+        self._watermark: Optional[datetime] = None  # DB clock at the last refresh
+        self._refreshed_at = 0.0
+        self.refreshes = 0
+        self.rows_pulled = 0
+
+    def _set(self, bucket: datetime, camera_id: str, zone: str, count: int) -> None:
+        cell = self._minutes.setdefault(bucket, {})
+        delta = count - cell.get((camera_id, zone), 0)
+        if not delta:
+            return
+        cell[(camera_id, zone)] = count
+        hour = self._hours.setdefault(bucket.replace(minute=0), Counter())
+        hour[(camera_id, zone)] += delta
+
+    def _prune(self, now: datetime) -> None:
+        cutoff = minute_bucket(now - self._horizon)
+        if self._retention is not None:
+            cutoff = max(cutoff, minute_bucket(now - self._retention))
+        for bucket in [b for b in self._minutes if b < cutoff]:
+            del self._minutes[bucket]
+        for hour in [h for h in self._hours if h < cutoff.replace(minute=0)]:
+            del self._hours[hour]
+        for key in [k for k in self._sketches if k[0] < cutoff.replace(minute=0)]:
+            del self._sketches[key]
+
+    def refresh(self, force: bool = False) -> bool:
+        """Pull rollup rows changed since the last refresh (all of them the first time)."""
+        with self._lock:
+            if not force and self._watermark is not None and monotonic() - self._refreshed_at < self._ttl_s:
+                return True
+            store = get_storage(self._db_url)
+            if store is None:
+                return False
+            since = minute_bucket(datetime.utcnow() - self._horizon)
+            changed_since = None if self._watermark is None else self._watermark - _REFRESH_OVERLAP
+            try:
+                db_now, rows, sketch_rows = store.read_stats(since, hour_bucket(since), changed_since)
+            except Exception as exc:
+                logger.error("Failed to refresh event rollups: %s", exc)
+                return False
+            for bucket, camera_id, zone, count in rows:
+                self._set(bucket, camera_id, zone, count)
+            for bucket, camera_id, kind, sketch in sketch_rows:
+                try:
+                    self._sketches[(bucket, camera_id, kind)] = HyperLogLog.from_bytes(sketch)
+                except Exception as exc:  # noqa: BLE001
+                    logger.warning("Skipping unreadable sketch %s/%s/%s: %s", bucket, camera_id, kind, exc)
+            self._prune(datetime.utcnow())
+            self._watermark = db_now
+            self._refreshed_at = monotonic()
+            self.refreshes += 1
+            self.rows_pulled += len(rows) + len(sketch_rows)
+            return True
+
+    def window(
+        self, span: timedelta, cameras: Optional[Sequence[str]] = None, now: Optional[datetime] = None
+    ) -> Dict[str, object]:
+        """Event totals for the last ``span`` (at most the horizon), overall and per zone / camera."""
+        if span > self._horizon:
+            raise ValueError(f"Window {span} exceeds the rollup cache horizon {self._horizon}")
+        now = now or datetime.utcnow()
+        start = minute_bucket(now - span)
+        first_hour = start.replace(minute=0) + (timedelta(hours=1) if start.minute else timedelta())
+        last_hour = minute_bucket(now).replace(minute=0)
+        wanted = set(cameras) if cameras else None
+        cells: Counter = Counter()
+        with self._lock:
+            # Whole hours from the hourly subtotals, the partial edges from minute buckets.
+            hour = first_hour
+            while hour < last_hour:
+                cells.update(self._hours.get(hour, ()))
+                hour += timedelta(hours=1)
+            end = minute_bucket(now) + timedelta(minutes=1)
+            for lo, hi in ((start, first_hour), (max(last_hour, first_hour), end)):
+                bucket = lo
+                while bucket < hi:
+                    cells.update(self._minutes.get(bucket, {}))
+                    bucket += timedelta(minutes=1)
+        by_zone: Counter = Counter()
+        by_camera: Counter = Counter()
+        for (camera_id, zone), count in cells.items():
+            if wanted is None or camera_id in wanted:
+                by_zone[zone] += count
+                by_camera[camera_id] += count
+        return {
+            "total": sum(by_camera.values()),
+            "by_zone": {z: n for z, n in by_zone.most_common() if n},
+            "by_camera": {c: n for c, n in by_camera.most_common() if n},
+        }
+
+    def distinct(
+        self, span: timedelta, cameras: Optional[Sequence[str]] = None, kind: str = "id", now: Optional[datetime] = None
+    ) -> int:
+        """Estimated distinct stable IDs (``kind='id'``) or names seen in the hours overlapping the last ``span``."""
+        if span > self._horizon:
+            raise ValueError(f"Window {span} exceeds the rollup cache horizon {self._horizon}")
+        now = now or datetime.utcnow()
+        first = hour_bucket(now - span)
+        wanted = set(cameras) if cameras else None
+        with self._lock:
+            merged = HyperLogLog.union(
+                sketch for (hour, camera_id, k), sketch in self._sketches.items()
+                if k == kind and hour >= first and (wanted is None or camera_id in wanted)
+            )
+        return merged.count()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "minute_buckets": len(self._minutes),
+                "hour_buckets": len(self._hours),
+                "sketches": len(self._sketches),
+                "refreshes": self.refreshes,
+                "rows_pulled": self.rows_pulled,
+            }
+
+
+_caches: Dict[str, RollupCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_rollup_cache(db_url: str, ttl_s: float = 2.0, retention_days: int = 0) -> RollupCache:
+    """Return the process-wide rollup cache for ``db_url``."""
+    with _caches_lock:
+        cache = _caches.get(db_url)
+        if cache is None:
+            cache = _caches[db_url] = RollupCache(db_url, ttl_s, retention_days=retention_days)
+        return cache
@@ -0,0 +1,168 @@
+"""Hourly HyperLogLog sketches of the people behind alert events.
+
+For every (hour, camera) the pipeline keeps two sketches: stable IDs
+(``kind='id'``) and identity names (``kind='name'``), stored next to the
+rollups in ``event_sketches``. A distinct count over any set of hours and
+cameras is the count of the merged sketches, a few KiB each, instead of a
+``COUNT(DISTINCT ...)`` over raw events.
+
+``SketchWriter`` builds sketches in memory and merges them into the
+database every ``flush_s`` seconds. HyperLogLog merges are idempotent, so
+the same sketch can be flushed repeatedly, and a late event for an hour
+that was already evicted from memory simply starts a fresh sketch that
+merges in.
+Observations since the last flush are lost if the process dies.
+"""
+from __future__ import annotations
+
+import atexit
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from Core_AI.storage import get_storage, sqlite_path
+from Core_AI.utils.hll import HyperLogLog
+from Core_AI.utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+
+KINDS = ("id", "name")
+
+SketchKey = Tuple[datetime, str, str]  # (hour bucket, camera_id, kind)
+
+
+def hour_bucket(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def rebuild_sketches(db_url: str, precision: int = 12) -> bool:
+    """Rebuild the stable-ID sketches from ``events`` (names are not stored there)."""
+    if sqlite_path(db_url) is not None:
+        logger.error("Rebuilding sketches is only supported on PostgreSQL.")
+        return False
+    from Core_AI.db import _get_pool, merge_sketches
+
+    p = _get_pool(db_url)
+    if p is None:
+        return False
+    sketches: Dict[SketchKey, HyperLogLog] = {}
+    conn = None
+    try:
+        conn = p.getconn()
+        with conn.cursor(name="rebuild_sketches") as cur:  # Server-side: streams instead of loading every row
+            cur.itersize = 10_000
+            cur.execute("SELECT date_trunc('hour', timestamp), camera_id, object_id FROM events")
+            for hour, camera_id, object_id in cur:
+                key = (hour, camera_id, "id")
+                sketch = sketches.get(key)
+                if sketch is None:
+                    sketch = sketches[key] = HyperLogLog(precision)
+                sketch.add(object_id)
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM event_sketches WHERE kind = 'id'")
+            merge_sketches(cur, sketches)
+        conn.commit()
+        logger.info("Rebuilt %d event sketches.", len(sketches))
+        return True
+    except Exception as exc:
+        if conn:
+            conn.rollback()
+        logger.error("Failed to rebuild event sketches: %s", exc)
+        return False
+    finally:
+        if conn:
+            p.putconn(conn)
+
+
+class SketchWriter:
+    """Per-camera hourly sketches, flushed to the database by a background thread."""
+
+    def __init__(self, db_url: str, precision: int = 12, flush_s: float = 30.0) -> None:
+        self._db_url = db_url
+        self._precision = precision
+        self._flush_s = flush_s
+        self._lock = threading.Lock()
+        self._sketches: Dict[SketchKey, HyperLogLog] = {}
+        self._dirty: set = set()
+        self._stop = threading.Event()
+        self.flushes = 0
+        self.last_error: Optional[str] = None
+        self._thread = threading.Thread(target=self._run, daemon=True, name="EventSketches")
+        self._thread.start()
+        atexit.register(self.close)
+
+    def observe(self, camera_id: str, ts: datetime, object_id: int, name: Optional[str] = None) -> None:
+        """Count ``object_id`` (and ``name``, if known) as seen on ``camera_id`` at ``ts``."""
+        hour = hour_bucket(ts)
+        with self._lock:
+            for kind, value in (("id", object_id), ("name", name)):
+                if value is None:
+                    continue
+                key = (hour, camera_id, kind)
+                sketch = self._sketches.get(key)
+                if sketch is None:
+                    sketch = self._sketches[key] = HyperLogLog(self._precision)
+                sketch.add(value)
+                self._dirty.add(key)
+
+    def flush(self) -> bool:
+        """Merge every sketch changed since the last flush into the database."""
+        with self._lock:
+            if not self._dirty:
+                return True
+            dirty = {key: HyperLogLog.union([self._sketches[key]]) for key in self._dirty}  # Copies
+            self._dirty.clear()
+        store = get_storage(self._db_url)
+        try:
+            if store is None:
+                raise ConnectionError("no event storage")
+            store.merge_sketches(dirty)
+            self.flushes += 1
+            self.last_error = None
+            ok = True
+        except Exception as exc:  # noqa: BLE001
+            self.last_error = str(exc)
+            logger.error("Failed to persist %d event sketches: %s", len(dirty), exc)
+            ok = False
+        with self._lock:
+            if not ok:
+                self._dirty.update(dirty)  # Retry on the next round
+            # Past hours rarely change again; a straggler just starts a new sketch that merges in.
+            current = hour_bucket(datetime.utcnow()) - timedelta(hours=1)
+            for key in [k for k in self._sketches if k[0] < current and k not in self._dirty]:
+                del self._sketches[key]
+        return ok
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._flush_s):
+            self.flush()
+
+    def close(self) -> None:
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self.flush()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "sketches": len(self._sketches),
+                "dirty": len(self._dirty),
+                "flushes": self.flushes,
+                "last_error": self.last_error,
+            }
+
+
+_writers: Dict[str, SketchWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_sketch_writer(db_url: str, precision: int = 12, flush_s: float = 30.0) -> SketchWriter:
+    """Return the process-wide sketch writer for ``db_url``."""
+    with _writers_lock:
+        writer = _writers.get(db_url)
+        if writer is None or writer._stop.is_set():
+            writer = _writers[db_url] = SketchWriter(db_url, precision, flush_s)
+        return writer
@@ -0,0 +1,145 @@
+"""Local append-only spool for alert events.
+
+Every event is committed to a SQLite file in WAL mode before anything talks
+to Postgres, so an alert is safe as soon as ``append`` returns even if the
+database is down or the process dies. ``EventWriter`` replays the spool in
+order (``peek`` + ``ack``) and deletes rows only once Postgres has them.
+
+``synchronous=NORMAL`` (the default) survives process crashes; use ``FULL``
+to also survive power loss, at the cost of an fsync per append.
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, Iterable, List, NamedTuple, Optional, Tuple
+
+from Core_AI.utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class EventRow(NamedTuple):
+    camera_id: str
+    object_id: int
+    zone: str
+    timestamp: datetime
+    snapshot_path: Optional[str]
+    event_key: Optional[str] = None  # Idempotency key, unique in the events table
+
+
+Spooled = Tuple[int, EventRow]  # (sequence number, row)
+
+
+class MemorySpool:
+    """In-process stand-in for ``EventSpool`` when no spool file is configured."""
+
+    def __init__(self, max_rows: int) -> None:
+        self._rows: Deque[Spooled] = deque()
+        self._seq = 0
+        self._max_rows = max(1, max_rows)
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def append(self, rows: Iterable[EventRow]) -> None:
+        with self._lock:
+            for row in rows:
+                self._seq += 1
+                self._rows.append((self._seq, row))
+            while len(self._rows) > self._max_rows:
+                self._rows.popleft()
+                self.dropped += 1
+
+    def peek(self, limit: int) -> List[Spooled]:
+        with self._lock:
+            return [self._rows[i] for i in range(min(limit, len(self._rows)))]
+
+    def ack(self, last_seq: int) -> None:
+        with self._lock:
+            while self._rows and self._rows[0][0] <= last_seq:
+                self._rows.popleft()
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._rows)
+
+    def close(self) -> None:
+        pass
+
+
+class EventSpool:
+    """SQLite (WAL) spool; safe to share between threads."""
+
+    def __init__(self, path: Path | str, max_rows: int = 1_000_000, synchronous: str = "NORMAL") -> None:
+        if synchronous.upper() not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+            raise ValueError(f"Unknown SQLite synchronous mode: {synchronous}")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._max_rows = max(1, max_rows)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={synchronous.upper()}")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS spool (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                event_key TEXT NOT NULL UNIQUE,
+                camera_id TEXT NOT NULL,
+                object_id INTEGER NOT NULL,
+                zone TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                snapshot_path TEXT
+            )
+            """
+        )
+        self.dropped = 0
+        self._count = self._conn.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+        if self._count:
+            logger.info("Event spool %s holds %d events from a previous run; replaying.", self.path, self._count)
+
+    def append(self, rows: Iterable[EventRow]) -> None:
+        params = [
+            (r.event_key, r.camera_id, int(r.object_id), r.zone, r.timestamp.isoformat(), r.snapshot_path)
+            for r in rows
+        ]
+        with self._lock:
+            with self._conn:  # One transaction per call
+                self._conn.execute("BEGIN")
+                self._count += self._conn.executemany(
+                    "INSERT OR IGNORE INTO spool (event_key, camera_id, object_id, zone, timestamp, snapshot_path) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    params,
+                ).rowcount
+                over = self._count - self._max_rows
+                if over > 0:
+                    self._conn.execute("DELETE FROM spool WHERE seq IN (SELECT seq FROM spool ORDER BY seq LIMIT ?)", (over,))
+                    self._count -= over
+                    self.dropped += over
+        if over > 0:
+            logger.error("Event spool full (%d rows); dropped the %d oldest events.", self._max_rows, over)
+
+    def peek(self, limit: int) -> List[Spooled]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, camera_id, object_id, zone, timestamp, snapshot_path, event_key "
+                "FROM spool ORDER BY seq LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [(r[0], EventRow(r[1], r[2], r[3], datetime.fromisoformat(r[4]), r[5], r[6])) for r in rows]
+
+    def ack(self, last_seq: int) -> None:
+        with self._lock:
+            self._count -= self._conn.execute("DELETE FROM spool WHERE seq <= ?", (last_seq,)).rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
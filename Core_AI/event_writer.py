@@ -0,0 +1,229 @@
+"""Batched, spool-backed writer for alert events.
+
+``add`` first commits the event to a local spool (``EventSpool``, a SQLite
+WAL file, or an in-memory ``MemorySpool`` when no spool path is set) and
+returns; alerting never waits for the database. A background replayer drains
+the spool in order whenever ``batch_size`` rows are waiting or ``flush_ms``
+has passed since the first unflushed row. Each flush is one transaction of
+the storage backend (``Core_AI.storage``); on Postgres it uses either
+``execute_values`` (multi-row INSERT) or ``COPY FROM STDIN`` into a staging
+table.
+
+Every row carries an ``event_key`` (unique in ``events``, together with the
+timestamp in the partitioned schema) and is inserted with ``ON CONFLICT DO
+NOTHING``, so replaying a batch that reached the database but was not yet
+acked in the spool (crash, timeout) never duplicates events. The per-minute
+``event_rollups`` counters are bumped in the same transaction from the rows
+actually inserted. Failed flushes are retried with exponential backoff; rows
+stay spooled until written, including across restarts. ``close()`` drains
+what it can and is registered with ``atexit``.
+"""
+from __future__ import annotations
+
+import atexit
+import threading
+import uuid
+from dataclasses import dataclass
+from time import monotonic, sleep
+from typing import Callable, Dict, List, Optional, Union
+
+from Core_AI.event_spool import EventRow, EventSpool, MemorySpool
+from Core_AI.storage import get_storage
+from Core_AI.utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class WriterConfig:
+    batch_size: int = 500
+    flush_ms: int = 250
+    method: str = "values"  # Postgres: "values" (execute_values) or "copy"
+    max_buffer: int = 50_000  # In-memory buffer cap when there is no spool file
+    spool_path: str = ""  # SQLite spool file; empty keeps events in memory only
+    spool_max_rows: int = 1_000_000
+    spool_synchronous: str = "NORMAL"
+    max_retries: int = 5
+    retry_backoff_s: float = 0.5
+
+
+class EventWriter:
+    """Spools event rows locally and replays them to the database in batches."""
+
+    def __init__(self, db_url: str, cfg: WriterConfig = WriterConfig()) -> None:
+        if cfg.method not in ("values", "copy"):
+            raise ValueError(f"Unknown event write method: {cfg.method}")
+        self._db_url = db_url
+        self._cfg = cfg
+        self._spool: Union[EventSpool, MemorySpool] = (
+            EventSpool(cfg.spool_path, cfg.spool_max_rows, cfg.spool_synchronous)
+            if cfg.spool_path
+            else MemorySpool(cfg.max_buffer)
+        )
+        self._cond = threading.Condition()
+        # A spool left over from a previous run is due for replay straight away.
+        self._first_pending: Optional[float] = monotonic() - cfg.flush_ms / 1000.0 if self._spool.count() else None
+        self._closed = False
+        self.written = 0
+        self.duplicates = 0
+        self.batches = 0
+        self.retries = 0
+        self.spool_errors = 0
+        self.last_error: Optional[str] = None
+        self._listeners: List[Callable[[List[dict]], None]] = []
+        self._thread = threading.Thread(target=self._run, daemon=True, name="EventWriter")
+        self._thread.start()
+        atexit.register(self.close)
+
+    def subscribe(self, listener: Callable[[List[dict]], None]) -> None:
+        """Call ``listener`` with the rows of every committed batch (as API dicts, with ``id``)."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def add(self, row: EventRow) -> None:
+        """Spool one event (a local commit); never waits on the database or the writer thread."""
+        if row.event_key is None:
+            row = row._replace(event_key=uuid.uuid4().hex)
+        if self._closed:
+            logger.warning("Event writer closed; dropping event %s.", row.event_key)
+            return
+        try:
+            # Outside ``_cond``: the spool has its own lock, so a slow commit (disk, WAL
+            # checkpoint) never makes this frame thread and the writer thread wait on each other.
+            self._spool.append([row])
+        except Exception as exc:  # noqa: BLE001
+            self.spool_errors += 1
+            logger.error("Could not spool event %s: %s", row.event_key, exc)
+            return
+        with self._cond:
+            if self._first_pending is None:
+                # The idle writer waits without a timeout; wake it to start the flush_ms clock.
+                self._first_pending = monotonic()
+                self._cond.notify()
+            elif self._spool.count() >= self._cfg.batch_size:
+                self._cond.notify()
+
+    def _run(self) -> None:
+        interval = self._cfg.flush_ms / 1000.0
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if self._spool.count() >= self._cfg.batch_size:
+                        break
+                    if self._first_pending is not None:
+                        remaining = self._first_pending + interval - monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+            pending = self._spool.peek(self._cfg.batch_size)
+            if not pending:
+                with self._cond:
+                    self._first_pending = None
+                    if self._closed:
+                        return
+                continue
+            if not self._flush_with_retry([row for _seq, row in pending]):
+                if self._closed:
+                    return  # Drain gave up; the rows stay spooled for the next run
+                continue
+            self._spool.ack(pending[-1][0])
+            with self._cond:
+                self._first_pending = monotonic() if self._spool.count() else None
+
+    def _flush_with_retry(self, batch: List[EventRow]) -> bool:
+        delay = self._cfg.retry_backoff_s
+        for attempt in range(self._cfg.max_retries + 1):
+            try:
+                inserted = self._flush(batch)
+                self.written += inserted
+                self.duplicates += len(batch) - inserted
+                self.batches += 1
+                self.last_error = None
+                return True
+            except Exception as exc:  # noqa: BLE001
+                self.last_error = str(exc)
+                if attempt == self._cfg.max_retries:
+                    logger.error("Event batch of %d rows failed after %d attempts: %s", len(batch), attempt + 1, exc)
+                    break
+                self.retries += 1
+                logger.warning("Event batch of %d rows failed (attempt %d), retrying in %.1fs: %s", len(batch), attempt + 1, delay, exc)
+                sleep(delay)
+                delay = min(delay * 2, 30.0)
+        # Keep the rows and wait a full interval before the next round of attempts.
+        if not self._closed:
+            sleep(self._cfg.flush_ms / 1000.0)
+        return False
+
+    def _flush(self, batch: List[EventRow]) -> int:
+        """Write ``batch`` in one transaction; returns rows inserted (replays are skipped)."""
+        store = get_storage(self._db_url)
+        if store is None:
+            raise ConnectionError("no event storage")
+        committed = store.write_events(batch, self._cfg.method)
+        if self._listeners:
+            for listener in list(self._listeners):
+                try:
+                    listener(committed)
+                except Exception as exc:  # noqa: BLE001
+                    logger.error("Event listener %r failed: %s", listener, exc)
+        return len(committed)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wake the writer and wait until the spool is empty; returns False on timeout."""
+        deadline = monotonic() + timeout
+        with self._cond:
+            if self._spool.count():
+                self._first_pending = monotonic() - self._cfg.flush_ms / 1000.0  # Due now
+                self._cond.notify()
+        while monotonic() < deadline:
+            if not self._spool.count():
+                return True
+            sleep(0.01)
+        return False
+
+    def close(self, timeout: float = 30.0) -> None:
+        """Stop accepting events and replay everything still spooled."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        left = self._spool.count()
+        if left and isinstance(self._spool, EventSpool):
+            logger.warning("Event writer stopped with %d events spooled in %s; they replay on next start.", left, self._spool.path)
+        elif left:
+            logger.error("Event writer closed with %d unwritten events (last error: %s).", left, self.last_error)
+        else:
+            logger.info("Event writer drained: %d events in %d batches.", self.written, self.batches)
+        if not self._thread.is_alive():
+            self._spool.close()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "spooled": self._spool.count(),
+            "spool": str(self._spool.path) if isinstance(self._spool, EventSpool) else "memory",
+            "written": self.written,
+            "duplicates_skipped": self.duplicates,
+            "batches": self.batches,
+            "retries": self.retries,
+            "dropped": self._spool.dropped,
+            "spool_errors": self.spool_errors,
+            "last_error": self.last_error,
+        }
+
+
+_writers: Dict[str, EventWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_event_writer(db_url: str, cfg: WriterConfig = WriterConfig()) -> EventWriter:
+    """Return the process-wide writer for ``db_url`` so all cameras share one batch and spool."""
+    with _writers_lock:
+        writer = _writers.get(db_url)
+        if writer is None or writer._closed:
+            writer = _writers[db_url] = EventWriter(db_url, cfg)
+        return writer
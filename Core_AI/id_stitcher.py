@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+from concurrent.futures import Future
 from dataclasses import dataclass
+from functools import partial
 from time import monotonic
 from typing import Dict, Iterable, List, Optional, Tuple
 
@@ -14,7 +16,14 @@ import os
 from PIL import Image
 from facenet_pytorch import MTCNN, InceptionResnetV1
 
-from Core_AI.db import load_all_identities, save_identity, update_identity_last_seen
+from Core_AI.config import REID_EMBEDDINGS
+from Core_AI.crop_quality import QualityConfig, score_crops
+from Core_AI.inference_profile import optimize_module
+from Core_AI.jpeg_encoder import EVIDENCE, get_encoder
+from Core_AI.reid_gallery import GalleryConfig, ReIdGallery
+from Core_AI.storage import get_storage
+from Core_AI.utils.bounded import BoundedDict
+from Core_AI.utils.geometry import clip_boxes
 from Core_AI.utils.logging_utils import get_logger
 
 logger = get_logger(__name__)
@@ -23,6 +32,21 @@ logger = get_logger(__name__)
 BBox = Tuple[float, float, float, float]
 
 
+def _write_snapshot(path: str, future: "Future[bytes]") -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(future.result())
+    except Exception as exc:
+        logger.error("Failed to save face snapshot %s: %s", path, exc)
+
+
+def _scale_bbox(bbox: BBox, scale: Tuple[float, float]) -> BBox:
+    sx, sy = scale
+    x1, y1, x2, y2 = bbox
+    return x1 * sx, y1 * sy, x2 * sx, y2 * sy
+
+
 @dataclass(frozen=True)
 class StitcherConfig:
     enabled: bool = True
@@ -31,61 +55,81 @@ class StitcherConfig:
     max_lost: int = 50
     ema_alpha: float = 0.90
     database_url: str = ""
-
-
-@dataclass
-class _LostTrack:
-    stable_id: int
-    features: np.ndarray
-    last_seen: float
+    camera_id: str = "cam_01"
+    embedding: str = "mobilenet"  # "mobilenet" crops, or "backbone" features from the tracker
+    inference_profile: str = "eager"  # See Core_AI.inference_profile.VARIANTS, or "auto"
+    inference_cache_dir: str = "models/cache"
+    quality: QualityConfig = QualityConfig()
+    max_active: int = 512
+    max_names: int = 5000
+    names_ttl_seconds: float = 3600.0
 
 
 class TrackIdStitcher:
     """Best-effort ID persistence across short exits/entries.
 
-    Stitches IDs using deep feature embeddings (MobileNetV3) over a short time window
-    to robustly re-identify recurrent persons.
+    Stitches IDs using deep feature embeddings (MobileNetV3, or features pooled from
+    the YOLO backbone by ``ObjectTracker``) over a short time window to robustly
+    re-identify recurrent persons. Embeddings and known faces live in a
+    ``ReIdGallery`` that may be shared with other cameras for hand-over.
     """
 
-    def __init__(self, config: StitcherConfig) -> None:
+    def __init__(self, config: StitcherConfig, gallery: Optional[ReIdGallery] = None) -> None:
+        if config.embedding not in REID_EMBEDDINGS:
+            raise ValueError(f"Unknown re-ID embedding: {config.embedding}")
         self._cfg = config
-        self._next_stable_id = 1
-        self._active_map: Dict[int, int] = {}  # track_id -> stable_id
-        self._lost: List[_LostTrack] = []
+        self._active_map: BoundedDict[int, int] = BoundedDict(config.max_active)  # track_id -> stable_id
+        self._gallery = gallery if gallery is not None else ReIdGallery(
+            GalleryConfig(ttl_seconds=config.ttl_seconds, max_entries=config.max_lost)
+        )
         
-        self._stable_names: Dict[int, str] = {}
-        self._known_faces: List[Dict] = []
+        self._stable_names: BoundedDict[int, str] = BoundedDict(config.max_names, ttl_seconds=config.names_ttl_seconds)
+        self._mtcnn = None
+        self._store = get_storage(config.database_url)
         
-        if config.database_url:
-            self._known_faces = load_all_identities(config.database_url)
-            logger.info("Loaded %d known identities from database.", len(self._known_faces))
+        if self._store is not None and not self._gallery.faces_seeded():
+            count = self._gallery.seed_faces(self._store.load_identities())
+            logger.info("Loaded %d known identities from database.", count)
         
         if config.enabled:
-            # Initialize MobileNetV3 for feature extraction
             self._device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-            self._model = models.mobilenet_v3_small(weights=models.MobileNet_V3_Small_Weights.DEFAULT)
-            self._model.classifier = torch.nn.Identity()  # Remove classifier to get pure embeddings
-            self._model.to(self._device)
-            self._model.eval()
-            
-            self._transform = T.Compose([
-                T.ToPILImage(),
-                T.Resize((224, 224)),
-                T.ToTensor(),
-                T.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
-            ])
+            if config.embedding == "mobilenet":
+                # Initialize MobileNetV3 for feature extraction
+                self._model = models.mobilenet_v3_small(weights=models.MobileNet_V3_Small_Weights.DEFAULT)
+                self._model.classifier = torch.nn.Identity()  # Remove classifier to get pure embeddings
+                self._model.to(self._device)
+                self._model.eval()
+                self._model = optimize_module(
+                    "mobilenet_v3_small", self._model, torch.zeros(4, 3, 224, 224), self._device,
+                    config.inference_profile, config.inference_cache_dir,
+                )
+                
+                self._transform = T.Compose([
+                    T.ToPILImage(),
+                    T.Resize((224, 224)),
+                    T.ToTensor(),
+                    T.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
+                ])
             
             # Initialize FaceNet for permanent Identity Stitching
             try:
                 self._mtcnn = MTCNN(keep_all=False, device=self._device, min_face_size=40)
                 self._resnet = InceptionResnetV1(pretrained='vggface2').eval().to(self._device)
+                self._resnet = optimize_module(
+                    "inception_resnet_v1", self._resnet, torch.zeros(1, 3, 160, 160), self._device,
+                    config.inference_profile, config.inference_cache_dir,
+                )
                 logger.info("FaceNet components initialized on %s.", self._device)
             except Exception as e:
                 logger.error("Failed to load FaceNet: %s", e)
                 self._mtcnn = None
 
-    def assign(self, frame: np.ndarray, tracks: Iterable[dict]) -> List[dict]:
-        """Return tracks with an added 'stable_id' field."""
+    def assign(self, frame: np.ndarray, tracks: Iterable[dict], hires_frame: Optional[np.ndarray] = None) -> List[dict]:
+        """Return tracks with an added 'stable_id' field.
+
+        ``tracks`` boxes are in ``frame`` pixels. If ``hires_frame`` is given, re-ID
+        and face crops are cut from it with the boxes scaled up to match.
+        """
         tracks_list = [t for t in tracks if "track_id" in t and "bbox" in t]
         if not self._cfg.enabled or not tracks_list:
             for t in tracks_list:
@@ -94,18 +138,25 @@ class TrackIdStitcher:
             return tracks_list
 
         now = monotonic()
-        self._purge_expired(now)
+        self._gallery.purge(now)
 
         current_track_ids = {int(t["track_id"]) for t in tracks_list}
 
-        # Move disappeared track IDs into lost pool.
+        # Hand disappeared track IDs back to the gallery as lost identities.
         disappeared = [tid for tid in list(self._active_map.keys()) if tid not in current_track_ids]
-        for tid in disappeared:
-            stable_id = self._active_map.pop(tid)
-            self._mark_lost(stable_id, now)
+        if disappeared:
+            self._gallery.mark_lost([self._active_map.pop(tid) for tid in disappeared], now)
+
+        crop_frame, scale = frame, (1.0, 1.0)
+        if hires_frame is not None and hires_frame.shape[:2] != frame.shape[:2]:
+            crop_frame = hires_frame
+            scale = (hires_frame.shape[1] / frame.shape[1], hires_frame.shape[0] / frame.shape[0])
+
+        # Only good crops refresh the gallery; new tracks still embed any usable crop to query it.
+        publish_mask, embed_mask = self._quality_masks(frame, tracks_list)
 
         # Precompute features in a single batch to avoid extreme delay
-        track_features = self._compute_batch_features(frame, tracks_list)
+        track_features = self._compute_batch_features(crop_frame, tracks_list, embed_mask, scale)
 
         # Assign stable IDs to current tracks.
         used_stable_ids = set(self._active_map.values())
@@ -117,34 +168,43 @@ class TrackIdStitcher:
 
             features = track_features[idx]
             if features is None:
-                stable_id = self._new_stable_id(used_stable_ids, preferred=tid)
+                stable_id = self._gallery.allocate_id(used_stable_ids, now, preferred=tid)
                 self._active_map[tid] = stable_id
                 used_stable_ids.add(stable_id)
                 t["stable_id"] = stable_id
                 t["reid_score"] = 1.0
                 continue
 
-            match_id, match_score = self._best_match(features, used_stable_ids)
+            match_id, match_score = self._gallery.best_match(
+                self._cfg.camera_id, features, t["bbox"], used_stable_ids, now, self._cfg.min_similarity
+            )
             if match_id is not None:
                 stable_id = match_id
                 t["reid_score"] = match_score
             else:
-                stable_id = self._new_stable_id(used_stable_ids, preferred=tid)
+                stable_id = self._gallery.allocate_id(used_stable_ids, now, preferred=tid)
                 t["reid_score"] = 1.0
             self._active_map[tid] = stable_id
             used_stable_ids.add(stable_id)
             t["stable_id"] = stable_id
 
-        # Update features for all active tracks and keep a fresh lost copy to stitch from.
-        for idx, t in enumerate(tracks_list):
+        # Publish motion for all active tracks, and features for good crops, so any camera can stitch from them.
+        self._gallery.publish(
+            self._cfg.camera_id,
+            [
+                (int(t["stable_id"]), f if ok else None, t["bbox"])
+                for t, f, ok in zip(tracks_list, track_features, publish_mask)
+            ],
+            now,
+            self._cfg.ema_alpha,
+        )
+
+        for t, ok in zip(tracks_list, publish_mask):
             stable_id = int(t["stable_id"])
-            features = track_features[idx]
-            if features is not None:
-                self._upsert_lost(stable_id, features, now)
 
             # --- Permanent Face Recognition Logic ---
-            if stable_id not in self._stable_names and self._mtcnn is not None:
-                recognized_name = self._try_recognize_face(frame, t["bbox"], stable_id)
+            if ok and stable_id not in self._stable_names and self._mtcnn is not None:
+                recognized_name = self._try_recognize_face(crop_frame, _scale_bbox(t["bbox"], scale), stable_id)
                 if recognized_name:
                     self._stable_names[stable_id] = recognized_name
             
@@ -152,51 +212,46 @@ class TrackIdStitcher:
 
         return tracks_list
 
-    def _new_stable_id(self, used: set[int], preferred: Optional[int] = None) -> int:
-        if preferred is not None and preferred not in used:
-            return int(preferred)
-        while self._next_stable_id in used:
-            self._next_stable_id += 1
-        sid = self._next_stable_id
-        self._next_stable_id += 1
-        return sid
-
-    def _purge_expired(self, now: float) -> None:
-        ttl = self._cfg.ttl_seconds
-        self._lost = [lt for lt in self._lost if now - lt.last_seen <= ttl]
-        if len(self._lost) > self._cfg.max_lost:
-            # Keep most recent
-            self._lost.sort(key=lambda x: x.last_seen, reverse=True)
-            self._lost = self._lost[: self._cfg.max_lost]
-
-    def _best_match(self, features: np.ndarray, used_stable_ids: set[int]) -> Tuple[Optional[int], float]:
-        best_id: Optional[int] = None
-        best_score = -1.0
-        for lt in self._lost:
-            if lt.stable_id in used_stable_ids:
-                continue
-            # Cosine similarity
-            score = float(np.dot(lt.features, features) / (np.linalg.norm(lt.features) * np.linalg.norm(features) + 1e-7))
-            if score > best_score:
-                best_score = score
-                best_id = lt.stable_id
-        import logging
-        logging.getLogger("sentinal.reid").debug("Best match candidate: id=%s score=%.4f threshold=%.2f", best_id, best_score, self._cfg.min_similarity)
-        if best_id is not None and best_score >= self._cfg.min_similarity:
-            return best_id, best_score
-        return None, 0.0
-
-    def _compute_batch_features(self, frame: np.ndarray, tracks: List[dict]) -> List[Optional[np.ndarray]]:
-        h, w = frame.shape[:2]
+    def stats(self) -> Dict[str, object]:
+        """Gallery counters (including the motion-gate pruned fraction) and container sizes."""
+        return {
+            **self._gallery.stats(),
+            "active_map": self._active_map.stats(),
+            "stable_names": self._stable_names.stats(),
+        }
+
+    def _quality_masks(self, frame: np.ndarray, tracks: List[dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(publish, embed)`` masks from the crop quality gate."""
+        qcfg = self._cfg.quality
+        if not qcfg.enabled:
+            everything = np.ones(len(tracks), dtype=bool)
+            return everything, everything
+        boxes = np.array([t["bbox"] for t in tracks], dtype=np.float32)
+        confs = np.array([float(t.get("conf", 1.0)) for t in tracks], dtype=np.float32)
+        quality, valid = score_crops(frame, boxes, confs, qcfg)
+        is_new = np.array([int(t["track_id"]) not in self._active_map for t in tracks], dtype=bool)
+        for t, q in zip(tracks, quality):
+            t["quality"] = float(q)
+        publish = quality >= qcfg.min_quality
+        return publish, publish | (valid & is_new)
+
+    def _compute_batch_features(
+        self, frame: np.ndarray, tracks: List[dict], mask: np.ndarray, scale: Tuple[float, float] = (1.0, 1.0)
+    ) -> List[Optional[np.ndarray]]:
+        if self._cfg.embedding == "backbone":
+            # Already pooled from the detector's feature maps by ObjectTracker.
+            return [t.get("embedding") if ok else None for t, ok in zip(tracks, mask)]
+
+        sx, sy = scale
+        boxes = np.array([t["bbox"] for t in tracks], dtype=np.float64) * (sx, sy, sx, sy)
+        boxes = clip_boxes(boxes, frame.shape[:2]).astype(np.int64)
         tensors = []
         valid_indices = []
         
         for i, t in enumerate(tracks):
-            x1, y1, x2, y2 = t["bbox"]
-            ix1 = max(0, min(w - 1, int(x1)))
-            iy1 = max(0, min(h - 1, int(y1)))
-            ix2 = max(0, min(w, int(x2)))
-            iy2 = max(0, min(h, int(y2)))
+            if not mask[i]:
+                continue
+            ix1, iy1, ix2, iy2 = boxes[i]
             
             if ix2 <= ix1 or iy2 <= iy1:
                 continue
@@ -230,12 +285,7 @@ class TrackIdStitcher:
         return results
 
     def _try_recognize_face(self, frame: np.ndarray, bbox: Tuple[float, float, float, float], stable_id: int) -> Optional[str]:
-        x1, y1, x2, y2 = bbox
-        h, w = frame.shape[:2]
-        ix1 = max(0, int(x1))
-        iy1 = max(0, int(y1))
-        ix2 = min(w, int(x2))
-        iy2 = min(h, int(y2))
+        ix1, iy1, ix2, iy2 = clip_boxes(np.array([bbox]), frame.shape[:2]).astype(np.int64)[0]
         if ix2 <= ix1 or iy2 <= iy1: return None
         crop = frame[iy1:iy2, ix1:ix2]
         if crop.size == 0 or crop.shape[0] < 40 or crop.shape[1] < 40: return None
@@ -252,59 +302,27 @@ class TrackIdStitcher:
             norm = np.linalg.norm(emb)
             if norm > 0: emb = emb / norm
 
-            best_match_name = None
-            best_score = -1.0
-            matched_id = None
-            
-            for record in self._known_faces:
-                db_emb = np.frombuffer(record["face_encoding"], dtype=np.float32)
-                score = float(np.dot(emb, db_emb))
-                if score > best_score:
-                    best_score = score
-                    best_match_name = record["name"]
-                    matched_id = record["id"]
-                    
-            if best_match_name and best_score >= 0.85:
+            match = self._gallery.match_face(emb)
+            if match is not None:
                 # Update last seen timestamp and return the Known Name
                 from datetime import datetime
-                update_identity_last_seen(self._cfg.database_url, matched_id, datetime.utcnow())
-                return best_match_name
+                if self._store is not None:
+                    self._store.update_identity_last_seen(match["id"], datetime.utcnow())
+                return match["name"]
                 
             # Face not found in DB! Save it as a new Unknown identity
             uid = str(uuid.uuid4())
             new_name = f"Unknown_{stable_id}"
-            os.makedirs("snapshots", exist_ok=True)
             snap_path = f"snapshots/{uid}.jpg"
-            cv2.imwrite(snap_path, cv2.cvtColor(crop_rgb, cv2.COLOR_RGB2BGR))
+            # Encoded and written on the JPEG pool; the crop is a view into a frame buffer that gets reused.
+            get_encoder().submit(crop.copy(), EVIDENCE).add_done_callback(partial(_write_snapshot, snap_path))
             
             # Save the raw bytes
-            save_identity(self._cfg.database_url, uid, emb.tobytes(), snap_path)
-            self._known_faces.append({"id": uid, "name": new_name, "face_encoding": emb.tobytes()})
+            if self._store is not None:
+                self._store.save_identity(uid, emb.tobytes(), snap_path)
+            self._gallery.add_face({"id": uid, "name": new_name, "face_encoding": emb.tobytes()})
             return new_name
             
         except Exception as e:
             logger.debug("Face recognition error: %s", e)
             return None
-
-    def _upsert_lost(self, stable_id: int, features: np.ndarray, now: float) -> None:
-        for lt in self._lost:
-            if lt.stable_id == stable_id:
-                alpha = self._cfg.ema_alpha
-                updated_features = alpha * lt.features + (1.0 - alpha) * features
-                norm = np.linalg.norm(updated_features)
-                if norm > 0:
-                    updated_features /= norm
-                lt.features = updated_features
-                lt.last_seen = now
-                return
-
-        norm = np.linalg.norm(features)
-        if norm > 0:
-            features = features / norm
-        self._lost.append(_LostTrack(stable_id=stable_id, features=features, last_seen=now))
-
-    def _mark_lost(self, stable_id: int, now: float) -> None:
-        for lt in self._lost:
-            if lt.stable_id == stable_id:
-                lt.last_seen = now
-                return
@@ -0,0 +1,234 @@
+"""Selectable inference profiles for the stitcher's embedding networks.
+
+A profile wraps an eval-mode ``nn.Module`` in a runner that takes a float32
+NCHW batch and returns float32 outputs. Available variants:
+
+- ``eager``: the module as-is (previous behaviour).
+- ``channels_last``: NHWC memory format, which oneDNN convolutions prefer.
+- ``bf16``: ``channels_last`` plus bfloat16 autocast, only where the CPU supports it.
+- ``torchscript``: traced, frozen and cached under ``cache_dir``.
+- ``compile``: ``torch.compile`` (not cached across runs).
+- ``onnx``: exported to ONNX, cached under ``cache_dir``, run with onnxruntime on CPU.
+
+``auto`` builds every available variant, times it on a sample batch, and keeps
+the fastest whose output matches eager. The choice is cached per machine in
+``cache_dir/profile_choice.json``; delete the file to re-run the benchmark.
+"""
+from __future__ import annotations
+
+import copy
+import json
+import os
+import platform
+import statistics
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, Optional
+
+import torch
+
+from Core_AI.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+Runner = Callable[[torch.Tensor], torch.Tensor]
+
+VARIANTS = ("eager", "channels_last", "bf16", "torchscript", "compile", "onnx")
+
+_MIN_COSINE = 0.99  # Variants whose output drifts further than this from eager are rejected
+_BENCH_ITERS = 10
+
+
+def bf16_supported(device: torch.device) -> bool:
+    """Return True if bfloat16 autocast runs natively on ``device``."""
+    if device.type == "cuda":
+        return torch.cuda.is_bf16_supported()
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except Exception:  # noqa: BLE001
+        return False
+
+
+def optimize_module(
+    name: str,
+    module: torch.nn.Module,
+    example: torch.Tensor,
+    device: torch.device,
+    profile: str = "eager",
+    cache_dir: Path | str = "models/cache",
+) -> Runner:
+    """Return a runner for ``module`` using ``profile`` (a variant name or ``auto``)."""
+    if profile == "eager":
+        return module
+
+    cache = Path(cache_dir)
+    cache.mkdir(parents=True, exist_ok=True)
+    example = example.to(device)
+
+    if profile != "auto":
+        runner = _build(profile, name, module, example, device, cache)
+        if runner is None:
+            logger.warning("Inference profile %r unavailable for %s; using eager.", profile, name)
+            return module
+        logger.info("Inference profile for %s: %s", name, profile)
+        return runner
+
+    key = _machine_key(name, device, example)
+    choices = _load_choices(cache)
+    cached = choices.get(key)
+    if cached:
+        runner = _build(cached, name, module, example, device, cache)
+        if runner is not None:
+            logger.info("Inference profile for %s: %s (cached choice)", name, cached)
+            return runner
+
+    chosen, runner = _self_benchmark(name, module, example, device, cache)
+    choices[key] = chosen
+    _save_choices(cache, choices)
+    return runner
+
+
+def _self_benchmark(
+    name: str, module: torch.nn.Module, example: torch.Tensor, device: torch.device, cache: Path
+) -> tuple[str, Runner]:
+    with torch.inference_mode():
+        reference = module(example).float().flatten(1)
+
+    timings: Dict[str, float] = {}
+    runners: Dict[str, Runner] = {}
+    for variant in VARIANTS:
+        runner = _build(variant, name, module, example, device, cache)
+        if runner is None:
+            continue
+        try:
+            with torch.inference_mode():
+                out = runner(example).float().flatten(1)  # Also warms up / compiles
+                cosine = torch.nn.functional.cosine_similarity(out, reference, dim=1).min().item()
+                if cosine < _MIN_COSINE:
+                    logger.info("Inference profile %s/%s rejected: cosine %.4f vs eager.", name, variant, cosine)
+                    continue
+                samples = []
+                for _ in range(_BENCH_ITERS):
+                    t0 = perf_counter()
+                    runner(example)
+                    samples.append(perf_counter() - t0)
+        except Exception as exc:  # noqa: BLE001
+            logger.info("Inference profile %s/%s failed: %s", name, variant, exc)
+            continue
+        timings[variant] = statistics.median(samples)
+        runners[variant] = runner
+
+    chosen = min(timings, key=timings.get)
+    table = ", ".join(f"{v}={t * 1000:.1f}ms" for v, t in sorted(timings.items(), key=lambda kv: kv[1]))
+    logger.info("Inference self-benchmark for %s on %s: %s -> %s", name, device, table, chosen)
+    return chosen, runners[chosen]
+
+
+def _build(
+    variant: str, name: str, module: torch.nn.Module, example: torch.Tensor, device: torch.device, cache: Path
+) -> Optional[Runner]:
+    try:
+        if variant == "eager":
+            return module
+        if variant == "channels_last":
+            return _channels_last(module, autocast=None, device=device)
+        if variant == "bf16":
+            if not bf16_supported(device):
+                return None
+            return _channels_last(module, autocast=torch.bfloat16, device=device)
+        if variant == "torchscript":
+            return _torchscript(name, module, example, device, cache)
+        if variant == "compile":
+            if not hasattr(torch, "compile"):
+                return None
+            return torch.compile(module)
+        if variant == "onnx":
+            if device.type != "cpu":
+                return None
+            return _onnx(name, module, example, cache)
+    except Exception as exc:  # noqa: BLE001
+        logger.info("Could not build inference profile %s/%s: %s", name, variant, exc)
+        return None
+    raise ValueError(f"Unknown inference profile: {variant}")
+
+
+def _channels_last(module: torch.nn.Module, autocast: Optional[torch.dtype], device: torch.device) -> Runner:
+    nhwc = copy.deepcopy(module).to(memory_format=torch.channels_last)
+
+    def _run(batch: torch.Tensor) -> torch.Tensor:
+        batch = batch.contiguous(memory_format=torch.channels_last)
+        if autocast is None:
+            return nhwc(batch)
+        with torch.autocast(device_type=device.type, dtype=autocast):
+            return nhwc(batch).float()
+
+    return _run
+
+
+def _torchscript(name: str, module: torch.nn.Module, example: torch.Tensor, device: torch.device, cache: Path) -> Runner:
+    path = cache / f"{name}-torch{torch.__version__}-{device.type}.ts"
+    if path.exists():
+        return torch.jit.load(str(path), map_location=device)
+    with torch.no_grad():
+        scripted = torch.jit.freeze(torch.jit.trace(module, example))
+        try:
+            scripted = torch.jit.optimize_for_inference(scripted)
+        except Exception:  # noqa: BLE001
+            pass
+    torch.jit.save(scripted, str(path))
+    return scripted
+
+
+def _onnx(name: str, module: torch.nn.Module, example: torch.Tensor, cache: Path) -> Optional[Runner]:
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        return None
+    path = cache / f"{name}-torch{torch.__version__}.onnx"
+    if not path.exists():
+        with torch.no_grad():
+            torch.onnx.export(
+                module, example, str(path),
+                input_names=["input"], output_names=["output"],
+                dynamic_axes={"input": {0: "batch"}, "output": {0: "batch"}},
+                opset_version=17,
+            )
+    opts = ort.SessionOptions()
+    opts.intra_op_num_threads = torch.get_num_threads()
+    session = ort.InferenceSession(str(path), opts, providers=["CPUExecutionProvider"])
+
+    def _run(batch: torch.Tensor) -> torch.Tensor:
+        return torch.from_numpy(session.run(None, {"input": batch.cpu().numpy()})[0])
+
+    return _run
+
+
+def _machine_key(name: str, device: torch.device, example: torch.Tensor) -> str:
+    return "|".join([
+        name,
+        device.type,
+        f"torch{torch.__version__}",
+        platform.machine(),
+        platform.processor() or "unknown-cpu",
+        f"threads{torch.get_num_threads()}",
+        "x".join(str(d) for d in example.shape),
+    ])
+
+
+def _load_choices(cache: Path) -> Dict[str, str]:
+    try:
+        with open(cache / "profile_choice.json", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:  # noqa: BLE001
+        return {}
+
+
+def _save_choices(cache: Path, choices: Dict[str, str]) -> None:
+    tmp = cache / "profile_choice.json.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(choices, f, indent=2)
+        os.replace(tmp, cache / "profile_choice.json")
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Could not cache inference profile choice: %s", exc)
@@ -0,0 +1,183 @@
+"""Shared JPEG encoding service for the live stream and evidence snapshots.
+
+Backends, picked in this order by ``auto`` (each is optional):
+
+- ``turbojpeg``: PyTurboJPEG bindings to libjpeg-turbo (``pip install PyTurboJPEG``,
+  needs the libturbojpeg shared library).
+- ``simplejpeg``: self-contained libjpeg-turbo wheels (``pip install simplejpeg``).
+- ``cv2``: OpenCV's bundled encoder, always available.
+
+Each use gets its own ``JpegProfile`` (quality + chroma subsampling): the
+stream favours speed and size (4:2:0), evidence keeps full chroma (4:4:4).
+Encodes run on a small thread pool; every backend releases the GIL while
+compressing, so the frame loop does not wait for them.
+"""
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Callable, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from Core_AI.utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+
+BACKENDS = ("turbojpeg", "simplejpeg", "cv2")
+SUBSAMPLING = ("444", "422", "420", "gray")
+
+
+@dataclass(frozen=True)
+class JpegProfile:
+    quality: int = 90
+    subsampling: str = "420"
+
+    def __post_init__(self) -> None:
+        if self.subsampling not in SUBSAMPLING:
+            raise ValueError(f"Unknown chroma subsampling {self.subsampling!r}; expected one of {SUBSAMPLING}")
+
+
+STREAM = JpegProfile(quality=80, subsampling="420")
+EVIDENCE = JpegProfile(quality=95, subsampling="444")
+
+Encode = Callable[[np.ndarray, JpegProfile], bytes]
+
+
+def _turbojpeg() -> Encode:
+    from turbojpeg import TJPF_BGR, TJSAMP_420, TJSAMP_422, TJSAMP_444, TJSAMP_GRAY, TurboJPEG
+
+    jpeg = TurboJPEG()
+    samp = {"444": TJSAMP_444, "422": TJSAMP_422, "420": TJSAMP_420, "gray": TJSAMP_GRAY}
+
+    def _encode(image: np.ndarray, profile: JpegProfile) -> bytes:
+        return jpeg.encode(image, quality=profile.quality, pixel_format=TJPF_BGR, jpeg_subsample=samp[profile.subsampling])
+
+    return _encode
+
+
+def _simplejpeg() -> Encode:
+    import simplejpeg
+
+    def _encode(image: np.ndarray, profile: JpegProfile) -> bytes:
+        return simplejpeg.encode_jpeg(
+            np.ascontiguousarray(image),
+            quality=profile.quality,
+            colorspace="BGR",
+            colorsubsampling="Gray" if profile.subsampling == "gray" else profile.subsampling,
+        )
+
+    return _encode
+
+
+def _cv2() -> Encode:
+    # Older OpenCV builds lack the sampling-factor flag; they always write 4:2:0.
+    factor = getattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR", None)
+    samp = {
+        "444": getattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR_444", None),
+        "422": getattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR_422", None),
+        "420": getattr(cv2, "IMWRITE_JPEG_SAMPLING_FACTOR_420", None),
+    }
+
+    def _encode(image: np.ndarray, profile: JpegProfile) -> bytes:
+        params = [cv2.IMWRITE_JPEG_QUALITY, profile.quality]
+        if profile.subsampling == "gray":
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        elif factor is not None and samp[profile.subsampling] is not None:
+            params += [factor, samp[profile.subsampling]]
+        ok, buf = cv2.imencode(".jpg", image, params)
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        return buf.tobytes()
+
+    return _encode
+
+
+_LOADERS: Dict[str, Callable[[], Encode]] = {"turbojpeg": _turbojpeg, "simplejpeg": _simplejpeg, "cv2": _cv2}
+
+
+def available_backends() -> Tuple[str, ...]:
+    """Names of the backends importable in this environment."""
+    found = []
+    for name in BACKENDS:
+        try:
+            _LOADERS[name]()
+            found.append(name)
+        except Exception:  # noqa: BLE001
+            pass
+    return tuple(found)
+
+
+def load_backend(name: str = "auto") -> Tuple[str, Encode]:
+    """Return ``(backend name, encode function)``; ``auto`` takes the first importable backend."""
+    candidates = BACKENDS if name == "auto" else (name,)
+    for candidate in candidates:
+        if candidate not in _LOADERS:
+            raise ValueError(f"Unknown JPEG backend: {candidate}")
+        try:
+            return candidate, _LOADERS[candidate]()
+        except Exception as exc:  # noqa: BLE001
+            logger.info("JPEG backend %s unavailable: %s", candidate, exc)
+    logger.warning("JPEG backend %r unavailable; using cv2.", name)
+    return "cv2", _cv2()
+
+
+class JpegEncoder:
+    """Thread pool of JPEG encoders with per-call profiles and simple counters."""
+
+    def __init__(self, backend: str = "auto", workers: int = 2) -> None:
+        self.backend, self._encode = load_backend(backend)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="Jpeg")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._encoded = 0
+        self._seconds = 0.0
+        logger.info("JPEG encoder: %s backend, %d workers.", self.backend, max(1, workers))
+
+    def encode(self, image: np.ndarray, profile: JpegProfile = EVIDENCE) -> bytes:
+        """Encode on the calling thread."""
+        t0 = perf_counter()
+        data = self._encode(image, profile)
+        with self._lock:
+            self._encoded += 1
+            self._seconds += perf_counter() - t0
+        return data
+
+    def submit(self, image: np.ndarray, profile: JpegProfile = EVIDENCE) -> "Future[bytes]":
+        """Encode on the pool; the caller must not modify ``image`` until the future is done."""
+        with self._lock:
+            self._pending += 1
+        future = self._pool.submit(self.encode, image, profile)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, _future: "Future[bytes]") -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "encoded": self._encoded,
+                "pending": self._pending,
+                "mean_ms": 1000.0 * self._seconds / self._encoded if self._encoded else None,
+            }
+
+
+_shared: Optional[JpegEncoder] = None
+_shared_lock = threading.Lock()
+
+
+def get_encoder(backend: str = "auto", workers: int = 2) -> JpegEncoder:
+    """Return the process-wide encoder, created on first use; later arguments are ignored."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = JpegEncoder(backend, workers)
+        return _shared
@@ -7,11 +7,16 @@ import numpy as np
 
 from Core_AI.config import AlertConfig, AppConfig, ModelConfig, VideoConfig
 from Core_AI.alerts import AlertEvent, AlertManager
+from Core_AI.crop_quality import QualityConfig
 from Core_AI.id_stitcher import StitcherConfig, TrackIdStitcher
+from Core_AI.jpeg_encoder import JpegProfile, get_encoder
+from Core_AI.reid_gallery import GalleryConfig, get_gallery
+from Core_AI.storage import get_storage
 from Core_AI.tracker import ObjectTracker
 from Core_AI.video_source import Frame, VideoSource
 from Core_AI.zones import ZoneEvent, ZoneManager
 from Core_AI.utils.drawing import draw_overlays
+from Core_AI.utils.encoded_frame import EncodedFrame
 from Core_AI.utils.logging_utils import get_logger
 
 
@@ -28,6 +33,18 @@ class SurveillancePipeline:
 
         self._source = VideoSource(self._video_cfg)
         self._tracker = ObjectTracker(self._model_cfg)
+        gallery = get_gallery(
+            self._model_cfg.reid_gallery_address,
+            self._model_cfg.reid_gallery_authkey.encode(),
+            GalleryConfig(
+                ttl_seconds=float(self._model_cfg.reid_ttl_seconds),
+                cross_camera_ttl_seconds=float(self._model_cfg.reid_cross_camera_ttl_seconds),
+                motion_gating=self._model_cfg.reid_motion_gating,
+                max_speed=float(self._model_cfg.reid_max_speed),
+                max_entries=self._model_cfg.reid_max_entries,
+                max_faces=self._model_cfg.reid_max_faces,
+            ),
+        )
         self._stitcher = TrackIdStitcher(
             StitcherConfig(
                 enabled=getattr(self._model_cfg, "reid_stitch_enabled", True),
@@ -35,14 +52,51 @@ class SurveillancePipeline:
                 min_similarity=float(getattr(self._model_cfg, "reid_min_similarity", 0.60)),
                 ema_alpha=float(getattr(self._model_cfg, "reid_ema_alpha", 0.90)),
                 database_url=self._alert_cfg.database_url,
-            )
+                camera_id=self._alert_cfg.camera_id,
+                embedding=self._model_cfg.reid_embedding,
+                inference_profile=self._model_cfg.inference_profile,
+                inference_cache_dir=self._model_cfg.inference_cache_dir,
+                quality=QualityConfig(
+                    enabled=self._model_cfg.reid_quality_enabled,
+                    min_quality=self._model_cfg.reid_min_quality,
+                ),
+                max_active=self._model_cfg.reid_max_active,
+                max_names=self._model_cfg.reid_max_names,
+                names_ttl_seconds=self._model_cfg.reid_names_ttl_seconds,
+            ),
+            gallery=gallery,
         )
         self._zones = ZoneManager(config.zones)
         self._alerts = AlertManager(self._alert_cfg)
         self._frame_skip = max(0, self._video_cfg.frame_skip)
+        self._jpeg = get_encoder(self._video_cfg.jpeg_backend, self._video_cfg.jpeg_workers)
+        self._stream_profile = JpegProfile(self._video_cfg.stream_jpeg_quality, self._video_cfg.stream_jpeg_subsampling)
+        self._evidence_profile = JpegProfile(self._alert_cfg.snapshot_quality, self._alert_cfg.snapshot_subsampling)
         
-        from Core_AI.db import init_db
-        init_db(self._alert_cfg.database_url)
+        store = get_storage(self._alert_cfg.database_url)
+        if store is None:
+            logger.warning("No usable DATABASE_URL configured, skipping DB init.")
+        elif store.init(self._alert_cfg.events_partitioning):
+            from Core_AI.event_partitions import start_partition_maintenance
+            start_partition_maintenance(
+                self._alert_cfg.database_url,
+                self._alert_cfg.events_partitioning,
+                ahead=self._alert_cfg.events_partitions_ahead,
+                retention_days=self._alert_cfg.events_retention_days,
+            )
+
+    def stats(self) -> dict:
+        """Sizes and eviction counters of the long-lived in-memory state, plus zone debounce counts."""
+        return {
+            "stitcher": self._stitcher.stats(),
+            "alerts": self._alerts.stats(),
+            "zones": self._zones.stats(),
+            "jpeg": self._jpeg.stats(),
+        }
+
+    def close(self) -> None:
+        """Drain queued alert side effects (snapshots, DB rows, notifications)."""
+        self._alerts.close()
 
     def frames(self) -> Generator[Tuple[Frame, List[dict], List[ZoneEvent]], None, None]:
         """Generator yielding processed frames, tracks, and new zone events."""
@@ -50,8 +104,20 @@ class SurveillancePipeline:
         frame_index = 0
         target_w = self._video_cfg.frame_width
         target_h = self._video_cfg.frame_height
+        dual_resolution = self._video_cfg.dual_resolution
         t_last = time.monotonic()
         smooth_fps = 0.0
+        try:
+            from backend.services.video_service import push_frame
+        except ImportError:
+            push_frame = None  # Running standalone without backend
+        stream_job = None
+
+        def _push(job) -> None:
+            try:
+                push_frame(job.result())
+            except Exception as exc:  # noqa: BLE001
+                logger.debug("Could not push stream frame: %s", exc)
         _ALPHA = 0.1  # EMA smoothing factor
 
         with self._source:
@@ -65,13 +131,37 @@ class SurveillancePipeline:
                     frame_index += 1
                     continue
 
+                full_frame = frame
                 if target_w is not None and target_h is not None:
                     if frame.shape[1] != target_w or frame.shape[0] != target_h:
                         frame = cv2.resize(frame, (target_w, target_h), interpolation=cv2.INTER_LINEAR)
 
                 tracks = self._tracker.track(frame)
-                tracks = self._stitcher.assign(frame, tracks)
-                events = self._zones.update(tracks)
+                tracks = self._stitcher.assign(frame, tracks, hires_frame=full_frame if dual_resolution else None)
+                zone_update = self._zones.update(tracks, frame.shape[:2])
+                events = zone_update.events
+                # Share membership with the overlay and API consumers instead of recomputing it.
+                for t in tracks:
+                    t["zones"] = sorted(zone_update.zones_of(int(t.get("stable_id", t["track_id"]))))
+
+                t_now = time.monotonic()
+                instant_fps = 1.0 / max(1e-5, t_now - t_last)
+                t_last = t_now
+                # Exponential Moving Average for smooth FPS display
+                smooth_fps = _ALPHA * instant_fps + (1.0 - _ALPHA) * smooth_fps if smooth_fps > 0 else instant_fps
+
+                display_frame = draw_overlays(frame.copy(), tracks, self._zones, fps=smooth_fps)
+                # Each image is JPEG-encoded at most once; snapshots and the stream share the bytes.
+                raw = EncodedFrame(frame, self._evidence_profile, self._jpeg)
+                annotated = EncodedFrame(display_frame, self._stream_profile, self._jpeg)
+
+                # Push encoded frame to shared MJPEG buffer (backend stream). Encoding runs on
+                # the JPEG pool; while the previous stream frame is still encoding, skip this one.
+                if push_frame is not None and (stream_job is None or stream_job.done()):
+                    stream_job = annotated.start()
+                    stream_job.add_done_callback(_push)
+
+                names = {int(t.get("stable_id", t["track_id"])): t.get("name") for t in tracks} if events else {}
                 self._alerts.handle_alerts(
                     [
                         AlertEvent(
@@ -79,29 +169,13 @@ class SurveillancePipeline:
                             track_id=e.track_id,
                             zone_id=e.zone_id,
                             zone_label=e.zone_label,
+                            name=names.get(e.track_id),
                         )
                         for e in events
                     ],
-                    frame,
+                    annotated if self._alert_cfg.snapshot_annotated else raw,
                 )
 
-                t_now = time.monotonic()
-                instant_fps = 1.0 / max(1e-5, t_now - t_last)
-                t_last = t_now
-                # Exponential Moving Average for smooth FPS display
-                smooth_fps = _ALPHA * instant_fps + (1.0 - _ALPHA) * smooth_fps if smooth_fps > 0 else instant_fps
-
-                display_frame = draw_overlays(frame.copy(), tracks, self._zones, fps=smooth_fps)
-
-                # Push encoded frame to shared MJPEG buffer (backend stream)
-                try:
-                    from backend.services.video_service import push_frame
-                    ret, buf = cv2.imencode(".jpg", display_frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
-                    if ret:
-                        push_frame(buf.tobytes())
-                except Exception:  # noqa: BLE001
-                    pass  # Running standalone without backend — skip silently
-
                 yield display_frame, tracks, events
                 frame_index += 1
 
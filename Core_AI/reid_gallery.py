@@ -0,0 +1,362 @@
+"""Host-wide re-ID gallery shared by every camera's TrackIdStitcher.
+
+All pipelines in one process share a single in-memory gallery. Pipelines in
+other processes on the same host can reach it over a local
+``multiprocessing.managers`` socket (see ``serve_gallery`` / ``connect_gallery``).
+"""
+from __future__ import annotations
+
+import math
+import threading
+from dataclasses import dataclass
+from multiprocessing.managers import BaseManager
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from Core_AI.utils.bounded import BoundedDict
+from Core_AI.utils.geometry import bbox_bottom_center
+from Core_AI.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+BBox = Tuple[float, float, float, float]
+
+
+@dataclass(frozen=True)
+class GalleryConfig:
+    ttl_seconds: float = 8.0  # Re-entry window on the same camera
+    cross_camera_ttl_seconds: float = 60.0  # Hand-over window between cameras
+    max_entries: int = 200
+    face_match_threshold: float = 0.85
+    max_faces: int = 10000  # Unlabelled faces are evicted first, least recently matched
+    # Same-camera motion gate, in units of the person's box height.
+    motion_gating: bool = True
+    max_speed: float = 2.0  # Box heights per second
+    gate_margin: float = 0.5  # Box heights of slack around the predicted foot point
+    motion_horizon_seconds: float = 2.0  # Stop extrapolating velocity after this long
+    max_scale_ratio: float = 2.0  # Largest allowed change in box height
+    velocity_alpha: float = 0.5
+
+
+@dataclass
+class GalleryEntry:
+    stable_id: int
+    camera_id: str
+    features: np.ndarray
+    last_seen: float
+    position: Tuple[float, float] = (0.0, 0.0)  # Foot point in camera pixels
+    velocity: Tuple[float, float] = (0.0, 0.0)  # Pixels per second
+    height: float = 0.0  # Box height in pixels
+    active: bool = True
+
+
+class ReIdGallery:
+    """Thread-safe store of appearance embeddings and known faces.
+
+    Stitchers publish EMA-smoothed embeddings for their active tracks and query
+    the gallery when a new track appears. Candidates from the same camera are
+    gated by ``ttl_seconds``; candidates from other cameras must be lost (not
+    currently tracked elsewhere) and within ``cross_camera_ttl_seconds``.
+    Same-camera candidates are also pruned by a constant-velocity motion model.
+    Stable IDs are allocated here so they stay unique across cameras.
+    """
+
+    def __init__(self, config: Optional[GalleryConfig] = None) -> None:
+        self._cfg = config or GalleryConfig()
+        self._lock = threading.Lock()
+        self._entries: Dict[int, GalleryEntry] = {}
+        self._claimed: Dict[int, float] = {}  # allocated, not yet published -> claim time
+        self._next_id = 1
+        self._faces: BoundedDict[str, dict] = BoundedDict(self._cfg.max_faces, evictable=_is_unlabelled)
+        self._face_ids: List[str] = []  # Row order of _face_matrix
+        self._face_matrix: Optional[np.ndarray] = None
+        self._faces_seeded = False
+        self._gate_considered = 0
+        self._gate_pruned = 0
+
+    # ------------------------------------------------------------------ #
+    # Appearance embeddings
+    # ------------------------------------------------------------------ #
+    def allocate_id(self, used: Set[int], now: float, preferred: Optional[int] = None) -> int:
+        """Claim a stable ID not held by any camera, preferring ``preferred``."""
+        with self._lock:
+            taken = set(used) | self._entries.keys() | self._claimed.keys()
+            if preferred is not None and int(preferred) not in taken:
+                sid = int(preferred)
+            else:
+                while self._next_id in taken:
+                    self._next_id += 1
+                sid = self._next_id
+                self._next_id += 1
+            self._claimed[sid] = now
+            return sid
+
+    def publish(
+        self,
+        camera_id: str,
+        updates: Iterable[Tuple[int, Optional[np.ndarray], BBox]],
+        now: float,
+        ema_alpha: float,
+    ) -> None:
+        """Update tracks currently visible on ``camera_id``.
+
+        Each update is ``(stable_id, features, bbox)``. Position, velocity and
+        scale are refreshed for every track; embeddings are EMA-merged only when
+        ``features`` is not None. A track with no embedding yet keeps its
+        stable ID claimed for as long as it is visible.
+        """
+        with self._lock:
+            for stable_id, features, bbox in updates:
+                position, height = bbox_bottom_center(bbox), float(bbox[3] - bbox[1])
+                entry = self._entries.get(stable_id)
+                if entry is None:
+                    if features is None:
+                        self._claimed[stable_id] = now
+                        continue
+                    self._claimed.pop(stable_id, None)
+                    norm = np.linalg.norm(features)
+                    if norm > 0:
+                        features = features / norm
+                    self._entries[stable_id] = GalleryEntry(
+                        stable_id=stable_id, camera_id=camera_id, features=features, last_seen=now,
+                        position=position, height=height,
+                    )
+                    continue
+                if features is not None:
+                    updated = ema_alpha * entry.features + (1.0 - ema_alpha) * features
+                    norm = np.linalg.norm(updated)
+                    if norm > 0:
+                        updated /= norm
+                    entry.features = updated
+                dt = now - entry.last_seen
+                if entry.active and entry.camera_id == camera_id and dt > 0:
+                    a = self._cfg.velocity_alpha
+                    vx = (position[0] - entry.position[0]) / dt
+                    vy = (position[1] - entry.position[1]) / dt
+                    entry.velocity = (a * vx + (1 - a) * entry.velocity[0], a * vy + (1 - a) * entry.velocity[1])
+                else:
+                    entry.velocity = (0.0, 0.0)  # Re-acquired or handed over: old motion is meaningless
+                entry.position = position
+                entry.height = height
+                entry.camera_id = camera_id
+                entry.last_seen = now
+                entry.active = True
+
+    def mark_lost(self, stable_ids: Iterable[int], now: float) -> None:
+        """Flag identities that just left their camera as available for hand-over."""
+        with self._lock:
+            for stable_id in stable_ids:
+                entry = self._entries.get(stable_id)
+                if entry is not None:
+                    entry.last_seen = now
+                    entry.active = False
+
+    def best_match(
+        self,
+        camera_id: str,
+        features: np.ndarray,
+        bbox: BBox,
+        exclude: Set[int],
+        now: float,
+        min_similarity: float,
+    ) -> Tuple[Optional[int], float]:
+        """Return ``(stable_id, score)`` of the closest admissible entry, or ``(None, 0.0)``."""
+        with self._lock:
+            candidates = [e for e in self._entries.values() if self._admissible(e, camera_id, exclude, now)]
+            if self._cfg.motion_gating:
+                same_camera = sum(1 for e in candidates if e.camera_id == camera_id)
+                candidates = [
+                    e for e in candidates if e.camera_id != camera_id or self._reachable(e, bbox, now)
+                ]
+                self._gate_considered += same_camera
+                self._gate_pruned += same_camera - sum(1 for e in candidates if e.camera_id == camera_id)
+            if not candidates:
+                return None, 0.0
+            gallery = np.stack([e.features for e in candidates])
+        scores = gallery @ features / (np.linalg.norm(features) + 1e-7)
+        best = int(np.argmax(scores))
+        best_score = float(scores[best])
+        logger.debug(
+            "Best match candidate: id=%s score=%.4f threshold=%.2f",
+            candidates[best].stable_id, best_score, min_similarity,
+        )
+        if best_score >= min_similarity:
+            return candidates[best].stable_id, best_score
+        return None, 0.0
+
+    def _admissible(self, entry: GalleryEntry, camera_id: str, exclude: Set[int], now: float) -> bool:
+        if entry.stable_id in exclude:
+            return False
+        age = now - entry.last_seen
+        if entry.camera_id == camera_id:
+            return age <= self._cfg.ttl_seconds
+        return not entry.active and age <= self._cfg.cross_camera_ttl_seconds
+
+    def _reachable(self, entry: GalleryEntry, bbox: BBox, now: float) -> bool:
+        """Whether ``entry`` could have moved to ``bbox`` since it was last seen."""
+        height = float(bbox[3] - bbox[1])
+        lo, hi = sorted((max(height, 1.0), max(entry.height, 1.0)))
+        if hi / lo > self._cfg.max_scale_ratio:
+            return False
+        dt = max(0.0, now - entry.last_seen)
+        horizon = min(dt, self._cfg.motion_horizon_seconds)
+        px = entry.position[0] + entry.velocity[0] * horizon
+        py = entry.position[1] + entry.velocity[1] * horizon
+        fx, fy = bbox_bottom_center(bbox)
+        radius = hi * (self._cfg.gate_margin + self._cfg.max_speed * dt)
+        return math.hypot(fx - px, fy - py) <= radius
+
+    def purge(self, now: float) -> None:
+        """Drop entries past every gating window and cap the gallery size.
+
+        The cap evicts the oldest lost entries only: evicting an active one
+        would free its stable ID while the track is still live.
+        """
+        horizon = max(self._cfg.ttl_seconds, self._cfg.cross_camera_ttl_seconds)
+        with self._lock:
+            self._entries = {
+                sid: e for sid, e in self._entries.items() if e.active or now - e.last_seen <= horizon
+            }
+            excess = len(self._entries) - self._cfg.max_entries
+            if excess > 0:
+                lost = sorted((e for e in self._entries.values() if not e.active), key=lambda e: e.last_seen)
+                for entry in lost[:excess]:
+                    del self._entries[entry.stable_id]
+            self._claimed = {sid: t for sid, t in self._claimed.items() if now - t <= horizon}
+
+    # ------------------------------------------------------------------ #
+    # Face identities
+    # ------------------------------------------------------------------ #
+    def faces_seeded(self) -> bool:
+        with self._lock:
+            return self._faces_seeded
+
+    def seed_faces(self, records: Iterable[dict]) -> int:
+        """Load identities from the database once per gallery; returns the count held."""
+        with self._lock:
+            if not self._faces_seeded:
+                for record in records:
+                    self._faces[record["id"]] = record
+                self._face_matrix = None
+                self._faces_seeded = True
+            return len(self._faces)
+
+    def add_face(self, record: dict) -> None:
+        with self._lock:
+            self._faces[record["id"]] = record
+            self._face_matrix = None
+
+    def match_face(self, embedding: np.ndarray) -> Optional[dict]:
+        """Return ``{"id", "name", "score"}`` for the best known face above threshold."""
+        with self._lock:
+            if not self._faces:
+                return None
+            if self._face_matrix is None:
+                self._face_ids = list(self._faces)
+                self._face_matrix = np.stack(
+                    [np.frombuffer(self._faces[fid]["face_encoding"], dtype=np.float32) for fid in self._face_ids]
+                )
+            scores = self._face_matrix @ embedding
+            best = int(np.argmax(scores))
+            record = self._faces[self._face_ids[best]]  # Read refreshes its LRU position
+        score = float(scores[best])
+        if record.get("name") and score >= self._cfg.face_match_threshold:
+            return {"id": record["id"], "name": record["name"], "score": score}
+        return None
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "active": sum(1 for e in self._entries.values() if e.active),
+                "faces": self._faces.stats(),
+                "motion_gate_considered": self._gate_considered,
+                "motion_gate_pruned": self._gate_pruned,
+                "motion_gate_pruned_fraction": self._gate_pruned / self._gate_considered if self._gate_considered else 0.0,
+            }
+
+
+
+def _is_unlabelled(_face_id: str, record: dict) -> bool:
+    name = record.get("name")
+    return not name or str(name).startswith("Unknown_")
+
+
+# ---------------------------------------------------------------------- #
+# Process-wide instance and local IPC
+# ---------------------------------------------------------------------- #
+_shared_gallery: Optional[ReIdGallery] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_gallery(config: Optional[GalleryConfig] = None) -> ReIdGallery:
+    """Return the in-process gallery, creating it with ``config`` on first use."""
+    global _shared_gallery
+    with _shared_lock:
+        if _shared_gallery is None:
+            _shared_gallery = ReIdGallery(config)
+        return _shared_gallery
+
+
+class _GalleryServer(BaseManager):
+    pass
+
+
+class _GalleryClient(BaseManager):
+    pass
+
+
+_GalleryClient.register("get_gallery")
+
+
+def _parse_address(address: str) -> Tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def serve_gallery(address: str, authkey: bytes, config: Optional[GalleryConfig] = None) -> None:
+    """Serve the in-process gallery to other processes on ``host:port`` (blocks)."""
+    gallery = get_shared_gallery(config)
+    _GalleryServer.register("get_gallery", callable=lambda: gallery)
+    server = _GalleryServer(address=_parse_address(address), authkey=authkey).get_server()
+    logger.info("Re-ID gallery serving on %s.", address)
+    server.serve_forever()
+
+
+def connect_gallery(address: str, authkey: bytes) -> ReIdGallery:
+    """Return a proxy to a gallery served by ``serve_gallery`` on this host."""
+    client = _GalleryClient(address=_parse_address(address), authkey=authkey)
+    client.connect()
+    return client.get_gallery()  # type: ignore[attr-defined]
+
+
+def get_gallery(address: str = "", authkey: bytes = b"", config: Optional[GalleryConfig] = None) -> ReIdGallery:
+    """Connect to the host gallery at ``address`` or fall back to the in-process one."""
+    if address:
+        try:
+            gallery = connect_gallery(address, authkey)
+            logger.info("Connected to shared re-ID gallery at %s.", address)
+            return gallery
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Re-ID gallery at %s unreachable (%s); using in-process gallery.", address, exc)
+    return get_shared_gallery(config)
+
+
+if __name__ == "__main__":
+    from Core_AI.config import load_config
+
+    cfg = load_config()
+    serve_gallery(
+        cfg.model.reid_gallery_address or "127.0.0.1:50555",
+        cfg.model.reid_gallery_authkey.encode(),
+        GalleryConfig(
+            ttl_seconds=cfg.model.reid_ttl_seconds,
+            cross_camera_ttl_seconds=cfg.model.reid_cross_camera_ttl_seconds,
+            motion_gating=cfg.model.reid_motion_gating,
+            max_speed=cfg.model.reid_max_speed,
+            max_entries=cfg.model.reid_max_entries,
+            max_faces=cfg.model.reid_max_faces,
+        ),
+    )
@@ -0,0 +1,324 @@
+"""SQLite storage backend for single-box and edge deployments.
+
+Selected with ``DATABASE_URL=sqlite:///data/sentinal.db``. Same tables as
+the Postgres schema (``events``, ``identities``, ``event_rollups``,
+``event_sketches``) in one WAL-mode file, so the pipeline persists locally
+with no server and no network round trips.
+
+Writes go through a single connection under a lock, one ``BEGIN IMMEDIATE``
+transaction per call: an ``EventWriter`` batch, its rollups and nothing
+else commit together, exactly like on Postgres. Reads use one connection
+per thread, which WAL lets run alongside the writer. Timestamps are stored
+as fixed-width ISO-8601 text (naive UTC, microseconds), so text order is
+time order and the ``(timestamp, id)`` indexes serve the events API.
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from Core_AI.event_rollups import fold
+from Core_AI.event_spool import EventRow
+from Core_AI.storage import StatsRows, Storage, event_filters
+from Core_AI.utils.hll import HyperLogLog
+from Core_AI.utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    camera_id TEXT NOT NULL,
+    object_id INTEGER NOT NULL,
+    zone TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    snapshot_path TEXT,
+    event_key TEXT UNIQUE
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts_id ON events (timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_events_camera_ts_id ON events (camera_id, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_events_zone_ts_id ON events (zone, timestamp, id);
+CREATE TABLE IF NOT EXISTS identities (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    face_encoding BLOB NOT NULL,
+    snapshot_path TEXT,
+    created_at TEXT,
+    last_seen TEXT
+);
+CREATE TABLE IF NOT EXISTS event_rollups (
+    bucket TEXT NOT NULL,
+    camera_id TEXT NOT NULL,
+    zone TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (bucket, camera_id, zone)
+);
+CREATE INDEX IF NOT EXISTS idx_event_rollups_updated_at ON event_rollups (updated_at);
+CREATE TABLE IF NOT EXISTS event_sketches (
+    bucket TEXT NOT NULL,
+    camera_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    sketch BLOB NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (bucket, camera_id, kind)
+);
+CREATE INDEX IF NOT EXISTS idx_event_sketches_updated_at ON event_sketches (updated_at);
+"""
+
+_COLUMNS = "id, camera_id, object_id, zone, timestamp, snapshot_path"
+
+_UPSERT_ROLLUP = (
+    "INSERT INTO event_rollups (bucket, camera_id, zone, count, updated_at) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT (bucket, camera_id, zone) DO UPDATE "
+    "SET count = count + excluded.count, updated_at = excluded.updated_at"
+)
+
+
+def _ts(ts: datetime) -> str:
+    return ts.isoformat(timespec="microseconds")
+
+
+def _row(r: tuple) -> dict:
+    return {"id": r[0], "camera_id": r[1], "object_id": r[2], "zone": r[3],
+            "timestamp": datetime.fromisoformat(r[4]), "snapshot_path": r[5]}
+
+
+class SqliteStorage(Storage):
+    """Events, identities and stats in a local SQLite (WAL) file."""
+
+    backend = "sqlite"
+
+    def __init__(self, path: Path | str, synchronous: str = "NORMAL", busy_timeout_ms: int = 5000) -> None:
+        if not str(path):
+            raise ValueError("SQLite storage needs a file path (sqlite:///path/to/file.db)")
+        if synchronous.upper() not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+            raise ValueError(f"Unknown SQLite synchronous mode: {synchronous}")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._synchronous = synchronous.upper()
+        self._busy_timeout_ms = busy_timeout_ms
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._conn = self._connect()
+        with self._lock:
+            new_rollups = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'event_rollups'"
+            ).fetchone() is None
+            self._conn.executescript(_SCHEMA)
+            if new_rollups:
+                # Rollups of an existing events table start out complete, as on Postgres.
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute(
+                    "INSERT INTO event_rollups (bucket, camera_id, zone, count, updated_at) "
+                    "SELECT substr(timestamp, 1, 17) || '00.000000', camera_id, zone, COUNT(*), ? "
+                    "FROM events GROUP BY 1, 2, 3",
+                    (_ts(datetime.utcnow()),),
+                )
+                self._conn.execute("COMMIT")
+        logger.info("SQLite storage ready at %s.", self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self._synchronous}")
+        conn.execute(f"PRAGMA busy_timeout={int(self._busy_timeout_ms)}")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            conn.execute("PRAGMA query_only=ON")
+            with self._lock:
+                self._readers.append(conn)
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """One write transaction on the shared writer connection."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def init(self, partitioning: str = "none") -> bool:
+        if partitioning != "none":
+            logger.warning("EVENTS_PARTITIONING=%s is ignored with SQLite storage.", partitioning)
+        return False
+
+    def write_events(self, rows: Sequence[EventRow], method: str = "values") -> List[dict]:
+        inserted: List[dict] = []
+        with self._transaction() as conn:
+            for row in rows:
+                cur = conn.execute(
+                    "INSERT INTO events (camera_id, object_id, zone, timestamp, snapshot_path, event_key) "
+                    "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (event_key) DO NOTHING",
+                    (row.camera_id, int(row.object_id), row.zone, _ts(row.timestamp), row.snapshot_path, row.event_key),
+                )
+                if cur.rowcount:
+                    inserted.append({"id": cur.lastrowid, "camera_id": row.camera_id, "object_id": int(row.object_id),
+                                     "zone": row.zone, "timestamp": row.timestamp, "snapshot_path": row.snapshot_path})
+            now = _ts(datetime.utcnow())
+            counts = fold((r["camera_id"], r["zone"], r["timestamp"]) for r in inserted)
+            conn.executemany(_UPSERT_ROLLUP, [(_ts(b), c, z, n, now) for (b, c, z), n in counts.items()])
+        return inserted
+
+    def query_events(
+        self,
+        limit: int = 50,
+        before: Optional[Tuple[datetime, int]] = None,
+        camera_id: Optional[str] = None,
+        zone: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[dict]:
+        where, params = event_filters(
+            camera_id, zone,
+            _ts(since) if since is not None else None,
+            _ts(until) if until is not None else None,
+            before=(_ts(before[0]), before[1]) if before is not None else None,
+            placeholder="?",
+        )
+        rows = self._reader().execute(
+            f"SELECT {_COLUMNS} FROM events {where}ORDER BY timestamp DESC, id DESC LIMIT ?", (*params, limit)
+        ).fetchall()
+        return [_row(r) for r in rows]
+
+    def iter_events(
+        self,
+        batch_rows: int,
+        camera_id: Optional[str] = None,
+        zone: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Iterator[List[tuple]]:
+        batches = self._export_batches(batch_rows, camera_id, zone, since, until)
+        next(batches)  # Connect now: failures raise here, and from here on close / GC closes the connection
+        return batches
+
+    def _export_batches(
+        self,
+        batch_rows: int,
+        camera_id: Optional[str],
+        zone: Optional[str],
+        since: Optional[datetime],
+        until: Optional[datetime],
+    ) -> Iterator[List[tuple]]:
+        where, params = event_filters(
+            camera_id, zone,
+            _ts(since) if since is not None else None,
+            _ts(until) if until is not None else None,
+            placeholder="?",
+        )
+        conn = self._connect()  # Its own connection: the export may be consumed from any thread
+        rows = 0
+        try:
+            conn.execute("PRAGMA query_only=ON")
+            yield []  # Primed by iter_events
+            # A single statement reads one WAL snapshot, however long the client takes.
+            cur = conn.execute(f"SELECT {_COLUMNS} FROM events {where}ORDER BY timestamp, id", params)
+            while True:
+                batch = cur.fetchmany(batch_rows)
+                if not batch:
+                    break
+                rows += len(batch)
+                yield [(r[0], r[1], r[2], r[3], datetime.fromisoformat(r[4]), r[5]) for r in batch]
+            logger.info("Exported %d events.", rows)
+        finally:
+            conn.close()
+
+    def read_stats(self, since: datetime, sketches_since: datetime, changed_since: Optional[datetime] = None) -> StatsRows:
+        conn = self._reader()
+        now = datetime.utcnow()
+        changed = "" if changed_since is None else " AND updated_at >= ?"
+        extra = () if changed_since is None else (_ts(changed_since),)
+        conn.execute("BEGIN")
+        try:
+            rows = conn.execute(
+                "SELECT bucket, camera_id, zone, count FROM event_rollups WHERE bucket >= ?" + changed,
+                (_ts(since), *extra),
+            ).fetchall()
+            sketch_rows = conn.execute(
+                "SELECT bucket, camera_id, kind, sketch FROM event_sketches WHERE bucket >= ?" + changed,
+                (_ts(sketches_since), *extra),
+            ).fetchall()
+        finally:
+            conn.execute("COMMIT")
+        return (
+            now,
+            [(datetime.fromisoformat(b), c, z, n) for b, c, z, n in rows],
+            [(datetime.fromisoformat(b), c, k, s) for b, c, k, s in sketch_rows],
+        )
+
+    def merge_sketches(self, sketches: Dict[Tuple[datetime, str, str], HyperLogLog]) -> None:
+        if not sketches:
+            return
+        now = _ts(datetime.utcnow())
+        with self._transaction() as conn:
+            for (bucket, camera_id, kind), sketch in sorted(sketches.items()):
+                key = (_ts(bucket), camera_id, kind)
+                row = conn.execute(
+                    "SELECT sketch FROM event_sketches WHERE bucket = ? AND camera_id = ? AND kind = ?", key
+                ).fetchone()
+                if row is not None:
+                    merged = HyperLogLog.from_bytes(row[0])
+                    merged.merge(sketch)
+                    sketch = merged
+                conn.execute(
+                    "INSERT OR REPLACE INTO event_sketches (bucket, camera_id, kind, sketch, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (*key, sketch.to_bytes(), now),
+                )
+
+    def save_identity(self, identity_id: str, face_encoding: bytes, snapshot_path: str) -> None:
+        now = _ts(datetime.utcnow())
+        try:
+            with self._transaction() as conn:
+                conn.execute(
+                    "INSERT INTO identities (id, face_encoding, snapshot_path, created_at, last_seen) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT (id) DO NOTHING",
+                    (identity_id, face_encoding, snapshot_path, now, now),
+                )
+        except Exception as exc:
+            logger.error("Failed to save identity to db: %s", exc)
+
+    def load_identities(self) -> List[dict]:
+        try:
+            rows = self._reader().execute("SELECT id, name, face_encoding FROM identities").fetchall()
+            return [{"id": r[0], "name": r[1], "face_encoding": r[2]} for r in rows]
+        except Exception as exc:
+            logger.error("Failed to load identities: %s", exc)
+            return []
+
+    def update_identity_name(self, identity_id: str, name: str) -> None:
+        try:
+            with self._transaction() as conn:
+                conn.execute("UPDATE identities SET name = ? WHERE id = ?", (name, identity_id))
+        except Exception as exc:
+            logger.error("Failed to update identity name: %s", exc)
+
+    def update_identity_last_seen(self, identity_id: str, ts: datetime) -> None:
+        try:
+            with self._transaction() as conn:
+                conn.execute("UPDATE identities SET last_seen = ? WHERE id = ?", (_ts(ts), identity_id))
+        except Exception as exc:
+            logger.error("Failed to update identity last_seen: %s", exc)
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers.clear()
+            self._conn.close()
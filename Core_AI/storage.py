@@ -0,0 +1,166 @@
+"""Storage backends for events, identities and the stats rollups / sketches.
+
+``get_storage(db_url)`` picks the backend from ``DATABASE_URL``:
+``sqlite:///data/sentinal.db`` (``sqlite:////abs/path.db`` for an absolute
+path) keeps everything in one local SQLite file in WAL mode
+(``Core_AI.sqlite_storage``), for single-box and edge deployments with no
+database server; anything else is a PostgreSQL DSN (``PostgresStorage`` in
+``Core_AI.db``). The event writer, stitcher, stats cache, events API and
+export only talk to the ``Storage`` methods below, so they work unchanged on
+either. Postgres-only extras (partitioning, ``COPY``, the maintenance
+script) do not apply to SQLite.
+"""
+from __future__ import annotations
+
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from Core_AI.event_spool import EventRow
+from Core_AI.utils.hll import HyperLogLog
+from Core_AI.utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+
+_SQLITE_PREFIX = "sqlite:///"
+
+StatsRows = Tuple[datetime, List[tuple], List[tuple]]  # (store clock, rollup rows, sketch rows)
+
+
+def sqlite_path(db_url: str) -> Optional[str]:
+    """Database file of a ``sqlite:///`` URL, or None for anything else."""
+    return db_url[len(_SQLITE_PREFIX):] if db_url.startswith(_SQLITE_PREFIX) else None
+
+
+def event_filters(
+    camera_id: Optional[str] = None,
+    zone: Optional[str] = None,
+    since: Optional[object] = None,
+    until: Optional[object] = None,
+    before: Optional[Tuple[object, int]] = None,
+    placeholder: str = "%s",
+) -> Tuple[str, List[object]]:
+    """``WHERE`` clause (with trailing space, or empty) and parameters for the events API filters."""
+    clauses: List[str] = []
+    params: List[object] = []
+    if before is not None:
+        clauses.append(f"(timestamp, id) < ({placeholder}, {placeholder})")
+        params.extend(before)
+    for column, value in (("camera_id =", camera_id), ("zone =", zone), ("timestamp >=", since), ("timestamp <", until)):
+        if value is not None:
+            clauses.append(f"{column} {placeholder}")
+            params.append(value)
+    return (f"WHERE {' AND '.join(clauses)} " if clauses else ""), params
+
+
+class Storage(ABC):
+    """What the rest of the system needs from a database; implementations are thread-safe.
+
+    Event, stats and export methods raise on database errors (their callers
+    retry or report them); identity methods log and carry on, like the
+    pipeline always has.
+    """
+
+    backend = ""
+
+    @abstractmethod
+    def init(self, partitioning: str = "none") -> bool:
+        """Create the schema if needed; returns True if ``events`` is partitioned."""
+
+    @abstractmethod
+    def write_events(self, rows: Sequence[EventRow], method: str = "values") -> List[dict]:
+        """Insert ``rows`` and bump their rollups in one transaction, skipping ``event_key``s already stored.
+
+        Returns the rows that landed as API dicts (with ``id``).
+        """
+
+    @abstractmethod
+    def query_events(
+        self,
+        limit: int = 50,
+        before: Optional[Tuple[datetime, int]] = None,
+        camera_id: Optional[str] = None,
+        zone: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[dict]:
+        """Newest-first keyset page of events; ``since`` inclusive, ``until`` exclusive."""
+
+    @abstractmethod
+    def iter_events(
+        self,
+        batch_rows: int,
+        camera_id: Optional[str] = None,
+        zone: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Iterator[List[tuple]]:
+        """Oldest-first batches of ``(id, camera_id, object_id, zone, timestamp, snapshot_path)``.
+
+        Connects before returning; the connection is closed when the iterator
+        is exhausted, closed or garbage collected, even if never iterated.
+        """
+
+    @abstractmethod
+    def read_stats(self, since: datetime, sketches_since: datetime, changed_since: Optional[datetime] = None) -> StatsRows:
+        """Rollup rows from ``since`` and sketch rows from ``sketches_since`` on, in one snapshot.
+
+        With ``changed_since``, only rows updated at or after it. Returns the
+        store's clock at the start of the read, for the next ``changed_since``.
+        """
+
+    @abstractmethod
+    def merge_sketches(self, sketches: Dict[Tuple[datetime, str, str], HyperLogLog]) -> None:
+        """Merge ``(hour, camera_id, kind)`` sketches into ``event_sketches`` in one transaction."""
+
+    @abstractmethod
+    def save_identity(self, identity_id: str, face_encoding: bytes, snapshot_path: str) -> None:
+        ...
+
+    @abstractmethod
+    def load_identities(self) -> List[dict]:
+        ...
+
+    @abstractmethod
+    def update_identity_name(self, identity_id: str, name: str) -> None:
+        ...
+
+    @abstractmethod
+    def update_identity_last_seen(self, identity_id: str, ts: datetime) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+_stores: Dict[str, Storage] = {}
+_stores_lock = threading.Lock()
+
+
+def get_storage(db_url: str, read_pool_size: Optional[int] = None) -> Optional[Storage]:
+    """Return the process-wide backend for ``db_url``; None if it is empty or cannot be opened.
+
+    ``read_pool_size`` sizes the Postgres read pool behind ``query_events``
+    (default ``EVENTS_API_WORKERS``) and only applies to the first call.
+    """
+    if not db_url:
+        return None
+    with _stores_lock:
+        store = _stores.get(db_url)
+        if store is None:
+            path = sqlite_path(db_url)
+            try:
+                if path is not None:
+                    from Core_AI.sqlite_storage import SqliteStorage
+                    store = SqliteStorage(path)
+                else:
+                    from Core_AI.db import PostgresStorage  # psycopg2 is only needed for Postgres
+                    store = PostgresStorage(db_url, read_pool_size)
+            except Exception as exc:
+                logger.error("Failed to open %s storage: %s", "SQLite" if path is not None else "PostgreSQL", exc)
+                return None
+            _stores[db_url] = store
+        return store
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
+import torch
+from torchvision.ops import roi_align
 from ultralytics import YOLO
 
 from Core_AI.config import ModelConfig
@@ -18,6 +20,68 @@ class TrackerError(Exception):
     message: str
 
 
+class _FeatureTap:
+    """Forward hooks that keep the detector's latest feature maps for ROI pooling.
+
+    Pooling appearance features from maps YOLO already computed lets the
+    stitcher skip a second CNN forward pass per crop.
+    """
+
+    # Horizontal stripes (head / torso / legs) keep coarse vertical layout.
+    _OUTPUT_SIZE = (3, 1)
+
+    def __init__(self, model: torch.nn.Module, layers: Sequence[int]) -> None:
+        self._layers = list(layers)
+        self._input_hw: Optional[Tuple[int, int]] = None
+        self._maps: Dict[int, torch.Tensor] = {}
+        self._handles = [model.register_forward_pre_hook(self._on_input)]
+        for idx in self._layers:
+            self._handles.append(model.model[idx].register_forward_hook(self._make_hook(idx)))
+
+    def _on_input(self, _module, args) -> None:
+        self._input_hw = tuple(args[0].shape[-2:])
+
+    def _make_hook(self, idx: int):
+        def _hook(_module, _inputs, output) -> None:
+            self._maps[idx] = output
+        return _hook
+
+    def pool(self, boxes: np.ndarray, frame_hw: Tuple[int, int]) -> Optional[np.ndarray]:
+        """Return one L2-normalised embedding per (x1, y1, x2, y2) box in frame pixels."""
+        if self._input_hw is None or len(self._maps) != len(self._layers) or len(boxes) == 0:
+            return None
+        in_h, in_w = self._input_hw
+        h0, w0 = frame_hw
+        # Undo ultralytics' centred letterbox: frame -> network input coordinates.
+        gain = min(in_h / h0, in_w / w0)
+        pad_x = (in_w - w0 * gain) / 2.0
+        pad_y = (in_h - h0 * gain) / 2.0
+        rois = torch.as_tensor(boxes, dtype=torch.float32) * gain
+        rois[:, [0, 2]] += pad_x
+        rois[:, [1, 3]] += pad_y
+
+        parts = []
+        with torch.inference_mode():
+            for idx in self._layers:
+                fmap = self._maps[idx][:1].float()
+                pooled = roi_align(
+                    fmap,
+                    [rois.to(fmap.device)],
+                    output_size=self._OUTPUT_SIZE,
+                    spatial_scale=fmap.shape[-1] / in_w,
+                    sampling_ratio=2,
+                    aligned=True,
+                ).flatten(1)
+                parts.append(torch.nn.functional.normalize(pooled, dim=1))
+            feats = torch.nn.functional.normalize(torch.cat(parts, dim=1), dim=1)
+        return feats.cpu().numpy()
+
+    def remove(self) -> None:
+        for handle in self._handles:
+            handle.remove()
+        self._handles = []
+
+
 class ObjectTracker:
     """ByteTrack-based multi-object tracker using ultralytics YOLO tracking."""
 
@@ -32,7 +96,6 @@ class ObjectTracker:
         self._imgsz = int(getattr(config, "imgsz", 640))
 
         # Auto-detect hardware acceleration
-        import torch
         self._device_str = "cuda" if torch.cuda.is_available() else "cpu"
 
         # Fuse layers for faster CPU inference when supported.
@@ -41,6 +104,14 @@ class ObjectTracker:
         except Exception:  # noqa: BLE001
             pass
 
+        # Optional re-ID embeddings pooled from the detector's own feature maps.
+        self._tap: Optional[_FeatureTap] = None
+        if getattr(config, "reid_embedding", "mobilenet") == "backbone":
+            try:
+                self._tap = _FeatureTap(self._model.model, config.reid_backbone_layers)
+            except Exception as exc:  # noqa: BLE001
+                raise TrackerError(f"Failed to hook YOLO layers {config.reid_backbone_layers}: {exc}") from exc
+
         # Warmup: run a dummy frame to trigger JIT so the first real frame isn't slow
         try:
             dummy = np.zeros((360, 640, 3), dtype=np.uint8)
@@ -84,5 +155,12 @@ class ObjectTracker:
                     "conf": conf,
                 }
             )
+
+        if self._tap is not None and tracks:
+            boxes = np.array([t["bbox"] for t in tracks], dtype=np.float32)
+            embeddings = self._tap.pool(boxes, frame.shape[:2])
+            if embeddings is not None:
+                for t, emb in zip(tracks, embeddings):
+                    t["embedding"] = emb
         return tracks
 
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from time import monotonic
+from typing import Callable, Dict, Generic, Iterator, MutableMapping, Optional, Tuple, TypeVar
+
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class BoundedDict(MutableMapping[K, V], Generic[K, V]):
+    """Dict with an LRU size cap and optional time-to-live, for 24/7 processes.
+
+    Entries older than ``ttl_seconds`` (since last write, or last read when
+    ``refresh_on_read``) are dropped lazily. When ``max_items`` is exceeded the
+    least recently used entry is evicted, skipping entries for which
+    ``evictable(key, value)`` is False unless nothing else is left.
+    Not thread-safe; callers hold their own lock.
+    """
+
+    def __init__(
+        self,
+        max_items: int,
+        ttl_seconds: Optional[float] = None,
+        refresh_on_read: bool = True,
+        evictable: Optional[Callable[[K, V], bool]] = None,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self._max_items = max(1, int(max_items))
+        self._ttl = ttl_seconds
+        self._refresh_on_read = refresh_on_read
+        self._evictable = evictable
+        self._clock = clock
+        self._data: "OrderedDict[K, Tuple[V, float]]" = OrderedDict()
+        self.evicted_lru = 0
+        self.evicted_ttl = 0
+
+    def __getitem__(self, key: K) -> V:
+        value, stamp = self._data[key]
+        now = self._clock()
+        if self._ttl is not None and now - stamp > self._ttl:
+            del self._data[key]
+            self.evicted_ttl += 1
+            raise KeyError(key)
+        if self._refresh_on_read:
+            self._data[key] = (value, now)
+            self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        now = self._clock()
+        self._data[key] = (value, now)
+        self._data.move_to_end(key)
+        self.expire(now)
+        while len(self._data) > self._max_items:
+            self._evict_one()
+
+    def __delitem__(self, key: K) -> None:
+        del self._data[key]
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(list(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drop every entry past its TTL; returns how many were dropped."""
+        if self._ttl is None:
+            return 0
+        now = self._clock() if now is None else now
+        dropped = 0
+        # Entries are kept in stamp order, so expired ones sit at the front.
+        while self._data:
+            key, (_value, stamp) = next(iter(self._data.items()))
+            if now - stamp <= self._ttl:
+                break
+            del self._data[key]
+            dropped += 1
+        self.evicted_ttl += dropped
+        return dropped
+
+    def _evict_one(self) -> None:
+        victim = next(iter(self._data))
+        if self._evictable is not None:
+            for key, (value, _stamp) in self._data.items():
+                if self._evictable(key, value):
+                    victim = key
+                    break
+        del self._data[victim]
+        self.evicted_lru += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "capacity": self._max_items,
+            "evicted_lru": self.evicted_lru,
+            "evicted_ttl": self.evicted_ttl,
+        }
@@ -5,7 +5,7 @@ from typing import Iterable, List, Tuple
 import cv2
 import numpy as np
 
-from Core_AI.utils.geometry import bbox_bottom_center, point_in_polygon
+from Core_AI.utils.geometry import bboxes_bottom_center
 from Core_AI.zones import Zone, ZoneManager
 
 
@@ -22,7 +22,11 @@ def _track_color(track_id: int) -> Color:
 
 
 def draw_overlays(frame: np.ndarray, tracks: Iterable[dict], zone_manager: ZoneManager, fps: float = 0.0) -> np.ndarray:
-    """Draw bounding boxes, track IDs, and zones onto the frame."""
+    """Draw bounding boxes, track IDs, and zones onto the frame.
+
+    Intruders are coloured from each track's ``zones`` list, attached by the
+    pipeline from ``ZoneManager.update``; no geometry is recomputed here.
+    """
     if fps > 0:
         text = f"FPS: {fps:.1f}"
         font = cv2.FONT_HERSHEY_SIMPLEX
@@ -34,18 +38,15 @@ def draw_overlays(frame: np.ndarray, tracks: Iterable[dict], zone_manager: ZoneM
 
     zones: List[Zone] = getattr(zone_manager, "_zones", [])
 
-    for track in tracks:
-        if "bbox" not in track or "track_id" not in track:
-            continue
+    drawable = [t for t in tracks if "bbox" in t and "track_id" in t]
+    # Foot points for all tracks in one batch
+    feet = bboxes_bottom_center(np.array([t["bbox"] for t in drawable])).astype(int)
+
+    for track, (nx, ny) in zip(drawable, feet.tolist()):
         x1, y1, x2, y2 = (int(v) for v in track["bbox"])
         track_id = int(track.get("stable_id", track["track_id"]))
 
-        # Compute foot point once
-        nx, ny = bbox_bottom_center(track["bbox"])
-        nx, ny = int(nx), int(ny)
-
-        # Compute zone membership once (not per-zone check repeated in loop)
-        is_in_zone = any(point_in_polygon((nx, ny), z.polygon) for z in zones)
+        is_in_zone = bool(track.get("zones"))
 
         score = track.get("reid_score", 1.0)
         color = _INTRUDER_COLOR if is_in_zone else _track_color(track_id)
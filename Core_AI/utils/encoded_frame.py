@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+import numpy as np
+
+from Core_AI.jpeg_encoder import EVIDENCE, JpegEncoder, JpegProfile, get_encoder
+
+
+class EncodedFrame:
+    """An image plus its JPEG bytes, encoded at most once and shared by every consumer.
+
+    All alert snapshots of a frame and the MJPEG stream use the same instance,
+    so the frame is encoded once however many use it. ``start()`` queues the
+    encode on the shared ``JpegEncoder`` pool; ``jpeg()`` waits for it. Safe to
+    call from worker threads. Call ``own()`` before handing it to another
+    thread if the caller may reuse the image buffer.
+    """
+
+    def __init__(
+        self, image: np.ndarray, profile: JpegProfile = EVIDENCE, encoder: Optional[JpegEncoder] = None
+    ) -> None:
+        self.image = image
+        self.profile = profile
+        self._encoder = encoder
+        self._owned = False
+        self._future: Optional["Future[bytes]"] = None
+        self._lock = threading.Lock()
+
+    def own(self) -> "EncodedFrame":
+        """Take a private copy of the image (once) unless its encode has already started."""
+        with self._lock:
+            if not self._owned and self._future is None:
+                self.image = self.image.copy()
+            self._owned = True
+        return self
+
+    @property
+    def encoded(self) -> bool:
+        return self._future is not None and self._future.done()
+
+    def start(self) -> "Future[bytes]":
+        """Queue the encode if nobody has yet; returns its future."""
+        with self._lock:
+            if self._future is None:
+                encoder = self._encoder or get_encoder()
+                self._future = encoder.submit(self.image, self.profile)
+            return self._future
+
+    def jpeg(self) -> bytes:
+        return self.start().result()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import zlib
+from typing import Iterable, Optional
+
+import numpy as np
+
+
+class HyperLogLog:
+    """Mergeable distinct-count sketch (HyperLogLog with small-range correction).
+
+    ``2**precision`` one-byte registers; the standard error is about
+    ``1.04 / sqrt(2**precision)`` (1.6% at the default 12, a 4 KiB sketch).
+    Values are hashed with BLAKE2b, so sketches built in different processes
+    merge correctly. Merging is a register-wise max: idempotent, commutative,
+    and safe to repeat. Not thread-safe; callers hold their own lock.
+    """
+
+    def __init__(self, precision: int = 12, registers: Optional[np.ndarray] = None) -> None:
+        if not 4 <= precision <= 18:
+            raise ValueError(f"HyperLogLog precision must be in 4..18, got {precision}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+
+    def add(self, value: object) -> None:
+        h = int.from_bytes(hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest(), "big")
+        rest_bits = 64 - self.precision
+        idx = h >> rest_bits
+        rank = rest_bits - (h & ((1 << rest_bits) - 1)).bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def update(self, values: Iterable[object]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Fold ``other`` into this sketch; mixed precisions merge at the lower one."""
+        if other.precision > self.precision:
+            other = other.reduced(self.precision)
+        elif other.precision < self.precision:
+            reduced = self.reduced(other.precision)
+            self.precision, self.registers = reduced.precision, reduced.registers
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def reduced(self, precision: int) -> "HyperLogLog":
+        """The exact sketch a lower ``precision`` would have built from the same values."""
+        shift = self.precision - precision
+        if shift < 0:
+            raise ValueError("Cannot increase HyperLogLog precision")
+        regs = self.registers.reshape(-1, 1 << shift).astype(np.int32)
+        # The dropped index bits become the leading bits of the rank.
+        low = np.arange(1 << shift)
+        lead = shift - np.floor(np.log2(np.maximum(low, 1))).astype(np.int32)
+        ranks = np.where(regs > 0, np.where(low == 0, regs + shift, lead), 0)
+        return HyperLogLog(precision, ranks.max(axis=1).astype(np.uint8))
+
+    @classmethod
+    def union(cls, sketches: Iterable["HyperLogLog"], precision: int = 12) -> "HyperLogLog":
+        out: Optional[HyperLogLog] = None
+        for sketch in sketches:
+            if out is None:
+                out = cls(sketch.precision, sketch.registers.copy())
+            else:
+                out.merge(sketch)
+        return out if out is not None else cls(precision)
+
+    def count(self) -> int:
+        m = self.registers.size
+        alpha = 0.7213 / (1.0 + 1.079 / m)
+        estimate = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int32))))
+        zeros = int(m - np.count_nonzero(self.registers))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # Linear counting for small cardinalities
+        return int(round(estimate))
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def to_bytes(self) -> bytes:
+        # Mostly-empty sketches (a quiet hour) compress to a few dozen bytes.
+        return bytes([self.precision]) + zlib.compress(self.registers.tobytes(), 1)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        precision = data[0]
+        registers = np.frombuffer(zlib.decompress(bytes(data[1:])), dtype=np.uint8).copy()
+        if registers.size != 1 << precision:
+            raise ValueError("Corrupt HyperLogLog sketch")
+        return cls(precision, registers)
@@ -57,10 +57,16 @@ class VideoSource:
             self.stop()
             raise VideoSourceError("Failed to open video source.")
 
-        if self._config.frame_width is not None:
-            self._capture.set(cv2.CAP_PROP_FRAME_WIDTH, self._config.frame_width)
-        if self._config.frame_height is not None:
-            self._capture.set(cv2.CAP_PROP_FRAME_HEIGHT, self._config.frame_height)
+        # In dual-resolution mode keep the device's native size unless told otherwise.
+        capture_width = self._config.capture_width
+        capture_height = self._config.capture_height
+        if not self._config.dual_resolution:
+            capture_width = capture_width or self._config.frame_width
+            capture_height = capture_height or self._config.frame_height
+        if capture_width is not None:
+            self._capture.set(cv2.CAP_PROP_FRAME_WIDTH, capture_width)
+        if capture_height is not None:
+            self._capture.set(cv2.CAP_PROP_FRAME_HEIGHT, capture_height)
         # Minimize internal OpenCV buffer to reduce latency
         self._capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
 
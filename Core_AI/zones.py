@@ -1,23 +1,49 @@
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Iterable, List, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import cv2
+import numpy as np
 
 from Core_AI.config import ZoneConfig
-from Core_AI.utils.geometry import bbox_bottom_center, point_in_polygon
+from Core_AI.utils.geometry import bboxes_bottom_center, clip_boxes, points_in_polygons
+from Core_AI.utils.logging_utils import get_logger
+
+
+logger = get_logger(__name__)
 
 
 Point = Tuple[float, float]
 Track = Dict[str, object]
 
+_MAX_RASTER_ZONES = 64
+
 
 @dataclass
 class Zone:
     id: str
     label: str
     polygon: List[Point]
+    enter_frames: int = 1  # Consecutive frames inside the inner band to confirm an entry
+    exit_frames: int = 1  # Consecutive frames outside the outer band to confirm an exit
+    margin: float = 0.0  # Pixels the inner band shrinks / outer band grows the polygon
+    trigger: str = "foot"  # "foot" (bottom-centre point) or "overlap" (box area fraction)
+    min_overlap: float = 0.3  # Fraction of the box inside the zone that counts as inside, for "overlap"
     active_ids: Set[int] = field(default_factory=set)
+    enter_counts: Dict[int, int] = field(default_factory=dict)
+    exit_counts: Dict[int, int] = field(default_factory=dict)
+    events: int = 0
+    suppressed: int = 0
+
+    def carry_state_from(self, old: "Zone") -> None:
+        self.active_ids = set(old.active_ids)
+        self.enter_counts = dict(old.enter_counts)
+        self.exit_counts = dict(old.exit_counts)
+        self.events = old.events
+        self.suppressed = old.suppressed
 
 
 @dataclass
@@ -28,50 +54,332 @@ class ZoneEvent:
     timestamp: datetime
 
 
+@dataclass
+class ZoneUpdate:
+    """Result of one ``ZoneManager.update``: new entry events and current occupancy."""
+    events: List[ZoneEvent]
+    membership: Dict[int, Set[str]]  # stable/track ID -> IDs of zones it is confirmed inside
+    suppressed: int = 0  # Unconfirmed entries and absorbed exits this frame
+
+    def zones_of(self, track_id: int) -> Set[str]:
+        return self.membership.get(track_id, set())
+
+
+class ZoneIndex:
+    """Frame-sized label raster with one bit per zone for O(1) point lookups.
+
+    Each pixel holds a bitmask (uint8..uint64, the smallest that fits) of the
+    zones covering it, so membership of N points in all zones is one gather.
+    Zones with a ``margin`` get separate inner (eroded) and outer (dilated)
+    rasters for entry/exit hysteresis. Zones beyond the 64th fall back to ray
+    casting without margins.
+
+    Zones with ``trigger == "overlap"`` also get a summed-area table of their
+    inner and outer masks, so the fraction of any box inside the zone costs
+    four lookups regardless of box size. Everything is rebuilt whenever the
+    frame resolution changes.
+    """
+
+    def __init__(self, zones: List[Zone]) -> None:
+        self.zones = zones
+        self._inner: Optional[np.ndarray] = None
+        self._outer: Optional[np.ndarray] = None
+        self._sat: Dict[Tuple[int, str], np.ndarray] = {}  # (zone index, "inner"/"outer") -> (H+1, W+1) int32
+        self._shape: Optional[Tuple[int, int]] = None
+        n = min(len(zones), _MAX_RASTER_ZONES)
+        self._dtype = next(dt for dt in (np.uint8, np.uint16, np.uint32, np.uint64) if np.iinfo(dt).bits >= max(n, 1))
+        self._bits = np.array([1 << i for i in range(n)], dtype=self._dtype)
+        self._overlap = [j for j, z in enumerate(zones) if z.trigger == "overlap"]
+        if len(zones) > _MAX_RASTER_ZONES:
+            logger.warning(
+                "%d zones configured; zones after the first %d use per-point ray casting.",
+                len(zones), _MAX_RASTER_ZONES,
+            )
+
+    def build(self, shape: Tuple[int, int]) -> None:
+        """Rasterise the zones for frames of ``(height, width)``."""
+        h, w = shape
+        inner = np.zeros((h, w), dtype=self._dtype)
+        banded = any(z.margin > 0 for z in self.zones[:_MAX_RASTER_ZONES])
+        outer = np.zeros((h, w), dtype=self._dtype) if banded else inner
+        for i, zone in enumerate(self.zones[:_MAX_RASTER_ZONES]):
+            bands = self._bands(zone, (h, w))
+            if bands is None:
+                continue
+            inner[bands[0].astype(bool)] |= self._bits[i]
+            if banded:
+                outer[bands[1].astype(bool)] |= self._bits[i]
+
+        sat: Dict[Tuple[int, str], np.ndarray] = {}
+        for j in self._overlap:
+            bands = self._bands(self.zones[j], (h, w))
+            if bands is None:
+                continue
+            sat[(j, "inner")] = cv2.integral(bands[0], sdepth=cv2.CV_32S)
+            sat[(j, "outer")] = (
+                sat[(j, "inner")] if bands[1] is bands[0] else cv2.integral(bands[1], sdepth=cv2.CV_32S)
+            )
+        self._inner, self._outer, self._sat = inner, outer, sat
+        self._shape = (h, w)
+
+    @staticmethod
+    def _bands(zone: Zone, shape: Tuple[int, int]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Return uint8 (inner, outer) masks of ``zone``; the same array when it has no margin."""
+        if len(zone.polygon) < 3:
+            return None
+        mask = np.zeros(shape, dtype=np.uint8)
+        cv2.fillPoly(mask, [np.round(np.array(zone.polygon)).astype(np.int32)], 1)
+        if zone.margin <= 0:
+            return mask, mask
+        k = 2 * int(round(zone.margin)) + 1
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (k, k))
+        return cv2.erode(mask, kernel), cv2.dilate(mask, kernel)
+
+    def _ensure(self, shape: Optional[Tuple[int, int]]) -> None:
+        if shape is None:
+            shape = self._shape or _polygon_extent(self.zones)
+        if self._inner is None or self._shape != tuple(shape):
+            self.build(tuple(shape))
+
+    def coverage(
+        self, boxes: np.ndarray, shape: Optional[Tuple[int, int]] = None, band: str = "inner"
+    ) -> np.ndarray:
+        """Return (N, Z) fraction of each xyxy box's in-frame area inside each overlap-mode zone.
+
+        Columns of ``"foot"`` zones are left at 0.
+        """
+        result = np.zeros((len(boxes), len(self.zones)), dtype=np.float32)
+        if len(boxes) == 0 or not self._overlap:
+            return result
+        self._ensure(shape)
+        h, w = self._shape
+        x1, y1, x2, y2 = np.round(clip_boxes(np.asarray(boxes, dtype=np.float32), (h, w))).astype(np.int64).T
+        area = (x2 - x1) * (y2 - y1)
+        safe = np.maximum(area, 1)
+        for j in self._overlap:
+            table = self._sat.get((j, band))
+            if table is None:
+                continue
+            inside = table[y2, x2] - table[y1, x2] - table[y2, x1] + table[y1, x1]
+            result[:, j] = np.where(area > 0, inside / safe, 0.0)
+        return result
+
+    def membership(
+        self, boxes: np.ndarray, shape: Optional[Tuple[int, int]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (N, Z) bool matrices: box triggers each zone's inner band, and its outer band.
+
+        ``"foot"`` zones test the bottom-centre point of each box; ``"overlap"``
+        zones test the covered fraction of the box against ``min_overlap``.
+        """
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        n_points, n_zones = len(boxes), len(self.zones)
+        inner = np.zeros((n_points, n_zones), dtype=bool)
+        if n_points == 0 or n_zones == 0:
+            return inner, inner.copy()
+        self._ensure(shape)
+
+        h, w = self._shape
+        points = bboxes_bottom_center(boxes)
+        xs, ys = points[:, 0], points[:, 1]
+        # Foot points on the far frame edge still count as inside the frame.
+        valid = (xs >= 0) & (xs <= w) & (ys >= 0) & (ys <= h)
+        xi = np.clip(xs.astype(np.int64), 0, w - 1)
+        yi = np.clip(ys.astype(np.int64), 0, h - 1)
+        n_raster = len(self._bits)
+        labels = np.where(valid, self._inner[yi, xi], 0).astype(self._dtype)
+        inner[:, :n_raster] = (labels[:, None] & self._bits[None, :]) != 0
+        if self._outer is self._inner:
+            outer = inner.copy()
+        else:
+            outer = np.zeros_like(inner)
+            labels = np.where(valid, self._outer[yi, xi], 0).astype(self._dtype)
+            outer[:, :n_raster] = (labels[:, None] & self._bits[None, :]) != 0
+
+        if n_zones > _MAX_RASTER_ZONES:
+            rest = points_in_polygons(points, [z.polygon for z in self.zones[_MAX_RASTER_ZONES:]])
+            inner[:, _MAX_RASTER_ZONES:] = rest
+            outer[:, _MAX_RASTER_ZONES:] = rest
+
+        if self._overlap:
+            cols = self._overlap
+            thresholds = np.array([self.zones[j].min_overlap for j in cols], dtype=np.float32)
+            inner[:, cols] = self.coverage(boxes, band="inner")[:, cols] >= thresholds
+            outer[:, cols] = self.coverage(boxes, band="outer")[:, cols] >= thresholds
+        return inner, outer
+
+
+def _trigger_mode(trigger: str, zone_id: str) -> str:
+    mode = (trigger or "foot").strip().lower()
+    if mode not in ("foot", "overlap"):
+        logger.warning("Zone %s: unknown trigger %r, using foot-point.", zone_id, trigger)
+        return "foot"
+    return mode
+
+
+def _polygon_extent(zones: List[Zone]) -> Tuple[int, int]:
+    xs = [x for z in zones for x, _ in z.polygon] or [0.0]
+    ys = [y for z in zones for _, y in z.polygon] or [0.0]
+    return int(max(ys)) + 2, int(max(xs)) + 2
+
+
 class ZoneManager:
-    """Manage multiple polygon zones and raise entry events per track ID."""
+    """Manage multiple polygon zones and raise entry events per track ID.
+
+    Entries are debounced: a track must stay inside a zone's inner band for
+    ``enter_frames`` consecutive frames before an event fires, and must stay
+    outside its outer band (or be missing) for ``exit_frames`` frames before it
+    counts as gone. Box jitter at the edge therefore does not re-trigger alerts.
+    "Inside" means the foot point for ``trigger="foot"`` zones and at least
+    ``min_overlap`` of the box area for ``trigger="overlap"`` zones.
+    """
 
     def __init__(self, configs: Iterable[ZoneConfig]) -> None:
-        self.set_zones(configs)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._frame_shape: Optional[Tuple[int, int]] = None
+        self._zones: List[Zone] = []
+        self._install(self._compile(configs, None), 0)
 
     def set_zones(self, configs: Iterable[ZoneConfig]) -> None:
-        """Update active tracking zones at runtime without restarting the pipeline."""
-        self._zones = [
+        """Update active tracking zones at runtime without restarting the pipeline.
+
+        The new zone set, including its raster for the current resolution, is
+        compiled on the calling thread and then swapped in atomically. Zones whose
+        id survives the reload keep their occupants, so nobody already inside
+        re-triggers an entry alert. If reloads overlap, only the newest is kept.
+        """
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            shape = self._frame_shape
+        self._install(self._compile(configs, shape), generation)
+
+    def reload_async(self, configs: Iterable[ZoneConfig]) -> threading.Thread:
+        """Run ``set_zones`` on a background thread so neither the caller nor the frame loop stalls."""
+        thread = threading.Thread(target=self.set_zones, args=(list(configs),), daemon=True, name="ZoneReload")
+        thread.start()
+        return thread
+
+    @staticmethod
+    def _compile(configs: Iterable[ZoneConfig], shape: Optional[Tuple[int, int]]) -> ZoneIndex:
+        zones = [
             Zone(
                 id=cfg.id,
                 label=cfg.label,
                 polygon=[(float(x), float(y)) for x, y in cfg.polygon],
+                enter_frames=max(1, int(cfg.enter_frames)),
+                exit_frames=max(1, int(cfg.exit_frames)),
+                margin=max(0.0, float(cfg.margin)),
+                trigger=_trigger_mode(cfg.trigger, cfg.id),
+                min_overlap=min(1.0, max(0.0, float(cfg.min_overlap))),
             )
             for cfg in configs
         ]
+        index = ZoneIndex(zones)
+        if shape is not None:
+            index.build(shape)
+        return index
+
+    def _install(self, index: ZoneIndex, generation: int) -> bool:
+        with self._lock:
+            if generation != self._generation:
+                return False  # Superseded by a newer reload
+            previous = {z.id: z for z in self._zones}
+            carried = 0
+            for zone in index.zones:
+                old = previous.get(zone.id)
+                if old is not None:
+                    zone.carry_state_from(old)
+                    carried += len(zone.active_ids)
+            # Zones and their index are swapped together so update() never mixes them.
+            self._index = index
+            self._zones = index.zones
+        if previous:
+            logger.info("Zones reloaded: %d zones, %d occupants carried over.", len(index.zones), carried)
+        return True
 
-    def update(self, tracks: Iterable[Track]) -> List[ZoneEvent]:
+    def update(self, tracks: Iterable[Track], frame_shape: Optional[Tuple[int, int]] = None) -> ZoneUpdate:
+        """Compute zone membership for this frame and the entry events it implies."""
+        with self._lock:
+            if frame_shape is not None:
+                self._frame_shape = tuple(frame_shape)
+            return self._update_locked(self._index, tracks, frame_shape)
+
+    def stats(self) -> Dict[str, object]:
+        """Per-zone occupancy, confirmed events and suppressed (debounced) transitions."""
+        with self._lock:
+            zones = {
+                z.id: {"occupants": len(z.active_ids), "events": z.events, "suppressed": z.suppressed}
+                for z in self._zones
+            }
+        return {"zones": zones, "suppressed_total": sum(z["suppressed"] for z in zones.values())}
+
+    def _update_locked(
+        self, index: ZoneIndex, tracks: Iterable[Track], frame_shape: Optional[Tuple[int, int]]
+    ) -> ZoneUpdate:
         events: List[ZoneEvent] = []
+        membership: Dict[int, Set[str]] = {}
         now = datetime.utcnow()
         
-        # Iterate tracks list once, building (track_id, point) pairs
-        track_points: List[Tuple[int, Tuple[float, float]]] = []
+        # Iterate tracks list once, building track_ids and boxes
+        track_ids: List[int] = []
+        boxes: List[Tuple[float, float, float, float]] = []
         for t in tracks:
             if "track_id" not in t or "bbox" not in t:
                 continue
-            track_id = int(t.get("stable_id", t["track_id"]))  # type: ignore[arg-type]
-            cx, cy = bbox_bottom_center(t["bbox"])  # type: ignore[arg-type]
-            track_points.append((track_id, (cx, cy)))
-
-        for zone in self._zones:
-            current_ids_in_zone: Set[int] = set()
-            for track_id, point in track_points:
-                if point_in_polygon(point, zone.polygon):
-                    current_ids_in_zone.add(track_id)
-                    if track_id not in zone.active_ids:
-                        events.append(
-                            ZoneEvent(
-                                zone_id=zone.id,
-                                zone_label=zone.label,
-                                track_id=track_id,
-                                timestamp=now,
-                            )
-                        )
-            zone.active_ids = current_ids_in_zone
-
-        return events
+            track_ids.append(int(t.get("stable_id", t["track_id"])))  # type: ignore[arg-type]
+            boxes.append(t["bbox"])  # type: ignore[arg-type]
+
+        inner, outer = index.membership(np.array(boxes), frame_shape)
+        ids = np.asarray(track_ids, dtype=np.int64)
+        suppressed = 0
+
+        for j, zone in enumerate(index.zones):
+            in_inner: List[int] = ids[inner[:, j]].tolist()
+            in_outer = set(ids[outer[:, j]].tolist())
+
+            # Confirmed occupants leave only after exit_frames frames outside the outer band.
+            for track_id in list(zone.active_ids):
+                if track_id in in_outer:
+                    if zone.exit_counts.pop(track_id, 0):
+                        zone.suppressed += 1  # Brief exit absorbed; old logic would re-alert
+                        suppressed += 1
+                    continue
+                misses = zone.exit_counts.get(track_id, 0) + 1
+                if misses >= zone.exit_frames:
+                    zone.active_ids.discard(track_id)
+                    zone.exit_counts.pop(track_id, None)
+                else:
+                    zone.exit_counts[track_id] = misses
+
+            # Candidates enter only after enter_frames consecutive frames in the inner band.
+            inner_set = set(in_inner)
+            for track_id in list(zone.enter_counts):
+                if track_id not in inner_set:
+                    del zone.enter_counts[track_id]
+                    zone.suppressed += 1  # Entry never confirmed
+                    suppressed += 1
+            for track_id in in_inner:
+                if track_id in zone.active_ids:
+                    continue
+                hits = zone.enter_counts.get(track_id, 0) + 1
+                if hits < zone.enter_frames:
+                    zone.enter_counts[track_id] = hits
+                    continue
+                zone.enter_counts.pop(track_id, None)
+                zone.active_ids.add(track_id)
+                zone.events += 1
+                events.append(
+                    ZoneEvent(
+                        zone_id=zone.id,
+                        zone_label=zone.label,
+                        track_id=track_id,
+                        timestamp=now,
+                    )
+                )
+
+            for track_id in zone.active_ids:
+                membership.setdefault(track_id, set()).add(zone.id)
+
+        return ZoneUpdate(events=events, membership=membership, suppressed=suppressed)
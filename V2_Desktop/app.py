@@ -40,6 +40,8 @@ class VideoThread(QtCore.QThread):
                 self.frame_ready.emit(qt_image)
         except Exception as exc:  # noqa: BLE001
             logger.error("Error in video thread: %s", exc)
+        finally:
+            self._pipeline.close()
 
     def stop(self) -> None:
         self._running = False
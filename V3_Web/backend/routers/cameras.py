@@ -1,4 +1,4 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from typing import List, Dict, Any
 
 from services.video_service import video_manager
@@ -11,6 +11,15 @@ async def list_cameras() -> List[Dict[str, Any]]:
     return [{"id": cam_id, "status": "active"} for cam_id in video_manager.pipelines.keys()]
 
 
+@router.get("/cameras/{camera_id}/stats")
+async def camera_stats(camera_id: str) -> Dict[str, Any]:
+    """Return in-memory state sizes and eviction counters for a running pipeline."""
+    pipeline = video_manager.pipelines.get(camera_id)
+    if pipeline is None:
+        raise HTTPException(status_code=404, detail="Camera not running")
+    return pipeline.stats()
+
+
 @router.post("/cameras/{camera_id}/start")
 async def start_camera(camera_id: str, video_path: str = None) -> Dict[str, str]:
     """Start a headless surveillance pipeline for a given camera ID."""
@@ -1,12 +1,89 @@
-from fastapi import APIRouter
-from typing import List
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Any, Dict, List, Literal, Optional
+
+from Core_AI.event_export import FORMATS
 
 from models.event import EventResponse
-from services.db_service import get_recent_events
+from services.db_service import close_export, decode_cursor, encode_cursor, event_ring, get_events, open_export
 
 router = APIRouter()
 
+MAX_PAGE = 500  # Larger ?limit= values are clamped rather than rejected
+
 @router.get("/events", response_model=List[EventResponse])
-async def list_events(limit: int = 50):
-    """Return the most recent intrusion events from PostgreSQL."""
-    return get_recent_events(limit=limit)
+async def list_events(
+    response: Response,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    camera_id: Optional[str] = None,
+    zone: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """Return intrusion events from the database, newest first.
+
+    Filters: ``camera_id``, ``zone`` and the ``[since, until)`` time range.
+    When more events may follow, the ``X-Next-Cursor`` header holds the
+    ``cursor`` value for the next page. ``limit`` is capped at ``MAX_PAGE``.
+    """
+    limit = min(limit, MAX_PAGE)
+    if limit < 1:
+        return []
+    try:
+        before = decode_cursor(cursor) if cursor else None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    rows = await get_events(limit, before, camera_id, zone, since, until)
+    if rows is None:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    if len(rows) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1])
+    return rows
+
+
+@router.get("/events/cache")
+async def events_cache_stats() -> Dict[str, Any]:
+    """Size and hit rate of the in-memory ring of recent events."""
+    ring = event_ring()
+    return ring.stats() if ring is not None else {"enabled": False}
+
+
+@router.get("/events/export")
+def export_events(
+    format: Literal["ndjson", "csv", "parquet"] = "ndjson",
+    gzip: bool = False,
+    camera_id: Optional[str] = None,
+    zone: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """Stream every matching event, oldest first, as a file download.
+
+    Rows are fetched from the database in fixed-size batches, so exports of
+    any size run in constant memory.
+    """
+    try:
+        chunks = open_export(format, gzip, camera_id, zone, since, until)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except Exception as exc:
+        raise HTTPException(status_code=503, detail=f"Database unavailable: {exc}")
+    if chunks is None:
+        raise HTTPException(status_code=429, detail="Too many exports running; try again later")
+    try:
+        media_type, ext = FORMATS[format]
+        filename = f"events.{ext}.gz" if gzip else f"events.{ext}"
+        # The background task also runs after a client disconnect, freeing the slot
+        # and connection even if streaming never started.
+        return StreamingResponse(
+            chunks,
+            media_type="application/gzip" if gzip else media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+            background=BackgroundTask(close_export, chunks),
+        )
+    except BaseException:
+        close_export(chunks)
+        raise
@@ -1,9 +1,9 @@
-from datetime import datetime, timedelta
-from fastapi import APIRouter
-from typing import Dict, Any
+from datetime import datetime
+from fastapi import APIRouter, Query
+from typing import Dict, Any, List, Literal, Optional
 
 from Core_AI.config import load_config
-from Core_AI.db import _get_pool
+from Core_AI.event_rollups import WINDOWS, get_rollup_cache
 from Core_AI.utils.logging_utils import get_logger
 
 logger = get_logger(__name__)
@@ -11,8 +11,16 @@ router = APIRouter()
 
 
 @router.get("/stats")
-async def get_dashboard_stats() -> Dict[str, Any]:
-    """Return aggregate statistics for the dashboard panel (IMP-13)."""
+def get_dashboard_stats(
+    window: Literal["1h", "24h", "7d"] = "24h",
+    camera_id: Optional[List[str]] = Query(None),
+) -> Dict[str, Any]:
+    """Return aggregate statistics for the dashboard panel (IMP-13).
+
+    Event counts come from the in-memory mirror of the per-minute rollups and
+    distinct people from merged hourly HyperLogLog sketches (estimates, over
+    the window rounded out to whole hours), so polling never scans ``events``.
+    """
     cfg = load_config()
     db_url = cfg.alert.database_url
     if not db_url:
@@ -22,43 +30,27 @@ async def get_dashboard_stats() -> Dict[str, Any]:
             "top_zone": "N/A"
         }
 
-    pool = _get_pool(db_url)
-    if not pool:
+    # Retention (partitioned schema only) also deletes the rollups of dropped events.
+    retention = cfg.alert.events_retention_days if cfg.alert.events_partitioning != "none" else 0
+    cache = get_rollup_cache(db_url, cfg.alert.stats_cache_ttl_seconds, retention)
+    if not cache.refresh():
         return {
             "error": "Database not connected"
         }
 
-    conn = None
-    try:
-        conn = pool.getconn()
-        with conn.cursor() as cur:
-            # Stats for last 24h
-            yesterday = datetime.utcnow() - timedelta(hours=24)
-
-            # Total Intrusions
-            cur.execute("SELECT COUNT(*) FROM events WHERE timestamp >= %s", (yesterday,))
-            total_intrusions = cur.fetchone()[0]
-
-            # Unique People (distinct object_id)
-            cur.execute("SELECT COUNT(DISTINCT object_id) FROM events WHERE timestamp >= %s", (yesterday,))
-            unique_people = cur.fetchone()[0]
-
-            # Top Zone
-            cur.execute(
-                "SELECT zone, COUNT(*) as c FROM events WHERE timestamp >= %s GROUP BY zone ORDER BY c DESC LIMIT 1",
-                (yesterday,)
-            )
-            top_zone_row = cur.fetchone()
-            top_zone = top_zone_row[0] if top_zone_row else "None"
-
-        return {
-            "intrusions_24h": total_intrusions,
-            "unique_people_24h": unique_people,
-            "top_zone": top_zone
-        }
-    except Exception as exc:
-        logger.error("Failed to fetch stats: %s", exc)
-        return {"error": str(exc)}
-    finally:
-        if conn:
-            pool.putconn(conn)
+    span = WINDOWS[window]
+    now = datetime.utcnow()
+    counts = cache.window(span, camera_id, now=now)
+    unique_people = cache.distinct(span, camera_id, "id", now=now)
+    stats = {
+        "window": window,
+        "intrusions": counts["total"],
+        "unique_people": unique_people,
+        "unique_identities": cache.distinct(span, camera_id, "name", now=now),
+        "top_zone": next(iter(counts["by_zone"]), "None"),
+        "by_zone": counts["by_zone"],
+        "by_camera": counts["by_camera"],
+    }
+    if window == "24h":
+        stats.update(intrusions_24h=counts["total"], unique_people_24h=unique_people)
+    return stats
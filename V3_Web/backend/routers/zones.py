@@ -1,8 +1,8 @@
 import json
 from pathlib import Path
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Tuple
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional, Tuple
 
 from Core_AI.config import load_config, ZoneConfig
 from services.video_service import video_manager
@@ -13,24 +13,36 @@ class ZonePayload(BaseModel):
     id: str
     label: str
     polygon: List[Tuple[float, float]]
+    enter_frames: Optional[int] = None
+    exit_frames: Optional[int] = None
+    margin: Optional[float] = None
+    trigger: Optional[Literal["foot", "overlap"]] = None
+    min_overlap: Optional[float] = Field(default=None, ge=0.0, le=1.0)
 
 @router.get("/zones")
 async def list_zones() -> List[dict]:
     """Return configured active zones."""
     cfg = load_config()
-    return [{"id": z.id, "label": z.label, "polygon": z.polygon} for z in cfg.zones]
+    return [
+        {
+            "id": z.id, "label": z.label, "polygon": z.polygon,
+            "enter_frames": z.enter_frames, "exit_frames": z.exit_frames, "margin": z.margin,
+            "trigger": z.trigger, "min_overlap": z.min_overlap,
+        }
+        for z in cfg.zones
+    ]
 
 @router.post("/zones")
 async def update_zones(payload: List[ZonePayload]) -> dict:
     """Overwrite zones.json and hot-reload running pipelines."""
     try:
         zones_file = Path("zones.json").resolve()
-        data = [z.model_dump() for z in payload]
+        data = [z.model_dump(exclude_none=True) for z in payload]
         with open(zones_file, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2)
         
         # Convert to config objects and push to running pipelines
-        configs = [ZoneConfig(id=z.id, label=z.label, polygon=z.polygon) for z in payload]
+        configs = [ZoneConfig(**z.model_dump(exclude_none=True)) for z in payload]
         video_manager.hot_reload_zones(configs)
         
         return {"status": "success", "message": "Zones updated and hot-reloaded"}
@@ -1,28 +1,163 @@
-from typing import List, Dict, Any
-import psycopg2
-from psycopg2.extras import RealDictCursor
+"""
+Event reads for the API. Pages the in-memory ring of recent events can vouch
+for are answered from memory; the rest run on a small dedicated thread pool,
+one thread per connection of the read pool (or per SQLite reader), so they
+never block the event loop and concurrent requests queue for a connection
+instead of exhausting it.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
 from Core_AI.config import load_config
+from Core_AI.event_export import export_events
+from Core_AI.event_ring import EventRing, get_event_ring
+from Core_AI.storage import get_storage
+from Core_AI.utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
 
 cfg = load_config()
+_executor = ThreadPoolExecutor(max_workers=max(1, cfg.alert.events_api_workers), thread_name_prefix="EventsAPI")
+_exports = threading.BoundedSemaphore(max(1, cfg.alert.export_max_concurrent))
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Opaque cursor pointing just past ``row`` (the last event of a page)."""
+    raw = f"{row['timestamp'].isoformat()}|{row['id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of ``encode_cursor``; raises ValueError on a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, event_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(event_id)
+    except Exception as exc:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from exc
+
+
+def _naive_utc(ts: Optional[datetime]) -> Optional[datetime]:
+    """Event timestamps are stored as naive UTC; convert aware query bounds to match."""
+    if ts is None or ts.tzinfo is None:
+        return ts
+    return ts.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _query_events(
+    limit: int,
+    before: Optional[Tuple[datetime, int]] = None,
+    camera_id: Optional[str] = None,
+    zone: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    store = get_storage(cfg.alert.database_url)
+    if store is None:
+        raise ConnectionError("no event storage")
+    return store.query_events(limit, before, camera_id, zone, since, until)
+
+
+def event_ring() -> Optional[EventRing]:
+    if cfg.alert.events_ring_size <= 0:
+        return None
+    return get_event_ring(cfg.alert.events_ring_size, cfg.alert.events_ring_scope)
+
+
+async def get_events(
+    limit: int = 50,
+    before: Optional[Tuple[datetime, int]] = None,
+    camera_id: Optional[str] = None,
+    zone: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Optional[List[Dict[str, Any]]]:
+    """One page of events, newest first; None if the database is unavailable."""
+    if not cfg.alert.database_url:
+        return []
+    since, until = _naive_utc(since), _naive_utc(until)
+    loop = asyncio.get_running_loop()
+    ring = event_ring()
+    try:
+        if ring is not None:
+            if ring.attached and not ring.warmed:
+                # Seed once with the newest events so hits start right after a restart.
+                newest = await loop.run_in_executor(_executor, partial(_query_events, ring.per_camera))
+                ring.warm(newest, ring.per_camera)
+            rows = ring.query(limit, before, camera_id, zone, since, until)
+            if rows is not None:
+                return rows
+        query = partial(_query_events, limit, before, camera_id, zone, since, until)
+        return await loop.run_in_executor(_executor, query)
+    except Exception as exc:
+        logger.error("Failed to fetch events: %s", exc)
+        return None
+
 
 def get_recent_events(limit: int = 50) -> List[Dict[str, Any]]:
-    db_url = cfg.alert.database_url
-    if not db_url:
+    """Blocking helper for non-async callers: the latest ``limit`` events."""
+    if not cfg.alert.database_url:
         return []
-        
-    query = """
-    SELECT id, camera_id, object_id, zone, timestamp, snapshot_path 
-    FROM events 
-    ORDER BY timestamp DESC 
-    LIMIT %s
-    """
     try:
-        conn = psycopg2.connect(db_url)
-        with conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(query, (limit,))
-                rows = cur.fetchall()
-        return [dict(row) for row in rows]
+        return _query_events(limit)
     except Exception as exc:
-        print(f"Failed to fetch events: {exc}")
+        logger.error("Failed to fetch events: %s", exc)
         return []
+
+
+def open_export(
+    fmt: str,
+    gzip: bool = False,
+    camera_id: Optional[str] = None,
+    zone: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Optional[Iterator[bytes]]:
+    """Start a streaming export; None when EXPORT_MAX_CONCURRENT exports are already running.
+
+    Raises ValueError for unsupported formats and on connection failures.
+    The export slot and its connection are freed when the returned iterator
+    is exhausted, closed (see ``close_export``) or garbage collected, even
+    if the response never starts streaming it.
+    """
+    if not _exports.acquire(blocking=False):
+        return None
+    try:
+        chunks = export_events(
+            cfg.alert.database_url, fmt, gzip, camera_id, zone, _naive_utc(since), _naive_utc(until),
+            batch_rows=cfg.alert.export_batch_rows,
+        )
+    except BaseException:
+        _exports.release()
+        raise
+    stream = _release_when_done(chunks)
+    next(stream)  # Enter the try block now, so closing an unstarted stream still runs its finally
+    return stream
+
+
+def _release_when_done(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    try:
+        yield b""  # Primed by open_export
+        yield from chunks
+    finally:
+        _exports.release()
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def close_export(stream: Iterator[bytes]) -> None:
+    """Free an export's slot and connection; safe to call more than once."""
+    try:
+        stream.close()
+    except ValueError:
+        # Still running in the threadpool after a disconnect; it is freed when that
+        # last chunk returns and the stream is dropped.
+        logger.debug("Export stream still running; it will be released when dropped.")
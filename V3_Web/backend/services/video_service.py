@@ -92,6 +92,7 @@ class VideoStreamManager:
             except Exception as exc:
                 logger.error(f"Pipeline crashed for {camera_id}: {exc}")
             finally:
+                pipeline.close()
                 logger.info(f"Stopped headless pipeline for {camera_id}")
 
         t = threading.Thread(target=_run_pipeline, daemon=True, name=f"Pipeline-{camera_id}")
@@ -123,10 +124,14 @@ class VideoStreamManager:
             time.sleep(0.03)
 
     def hot_reload_zones(self, configs: list) -> None:
-        """Update zones safely in all running pipelines."""
+        """Update zones safely in all running pipelines.
+
+        Each pipeline compiles the new zones on a background thread and swaps
+        them in atomically, so the request returns immediately.
+        """
         for pipeline in self.pipelines.values():
             if hasattr(pipeline, "_zones"):
-                pipeline._zones.set_zones(configs)
+                pipeline._zones.reload_async(configs)
 
 
 video_manager = VideoStreamManager()
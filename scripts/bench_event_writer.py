@@ -0,0 +1,100 @@
+"""Event write throughput: one INSERT per event vs the batched EventWriter.
+
+Needs a reachable Postgres in DATABASE_URL (a local one is best). Rows are
+written under a throwaway camera_id and deleted afterwards.
+
+    python scripts/bench_event_writer.py [--rows 20000] [--batch 500]
+"""
+import argparse
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from Core_AI.config import load_config
+from Core_AI.db import _get_pool, init_db, insert_event
+from Core_AI.event_spool import EventRow
+from Core_AI.event_writer import EventWriter, WriterConfig
+
+
+def _rows(camera_id: str, n: int) -> list:
+    t0 = datetime.utcnow()
+    return [EventRow(camera_id, i % 50, f"zone_{i % 4}", t0 + timedelta(milliseconds=i), None) for i in range(n)]
+
+
+def _cleanup(db_url: str, camera_id: str) -> None:
+    p = _get_pool(db_url)
+    conn = p.getconn()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM events WHERE camera_id = %s", (camera_id,))
+        conn.commit()
+    finally:
+        p.putconn(conn)
+
+
+def bench_single(db_url: str, n: int) -> float:
+    camera_id = f"bench_{uuid.uuid4().hex[:8]}"
+    rows = _rows(camera_id, n)
+    t0 = time.perf_counter()
+    for r in rows:
+        insert_event(db_url, r.camera_id, r.object_id, r.zone, r.timestamp, r.snapshot_path)
+    elapsed = time.perf_counter() - t0
+    _cleanup(db_url, camera_id)
+    return n / elapsed
+
+
+def bench_writer(db_url: str, n: int, method: str, batch: int, spool_path: str = "") -> float:
+    camera_id = f"bench_{uuid.uuid4().hex[:8]}"
+    rows = _rows(camera_id, n)
+    writer = EventWriter(
+        db_url, WriterConfig(batch_size=batch, flush_ms=50, method=method, max_buffer=n, spool_path=spool_path)
+    )
+    t0 = time.perf_counter()
+    for r in rows:
+        writer.add(r)
+    writer.close(timeout=300)
+    elapsed = time.perf_counter() - t0
+    stats = writer.stats()
+    _cleanup(db_url, camera_id)
+    if stats["written"] != n:
+        print(f"  warning: {method} wrote {stats['written']}/{n} rows ({stats['last_error']})")
+    return stats["written"] / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--single-rows", type=int, default=2000, help="Rows for the slow per-event baseline")
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    db_url = load_config().alert.database_url
+    if not db_url:
+        sys.exit("Set DATABASE_URL to a Postgres instance to benchmark against.")
+    init_db(db_url)
+
+    results = [
+        ("insert_event (1 row / commit)", args.single_rows, bench_single(db_url, args.single_rows)),
+        (f"EventWriter values (batch {args.batch})", args.rows, bench_writer(db_url, args.rows, "values", args.batch)),
+        (f"EventWriter copy (batch {args.batch})", args.rows, bench_writer(db_url, args.rows, "copy", args.batch)),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        spool = str(Path(tmp) / "spool.db")
+        results.append(
+            (f"EventWriter values + SQLite spool (batch {args.batch})", args.rows,
+             bench_writer(db_url, args.rows, "values", args.batch, spool))
+        )
+    lines = ["| Method | Rows | Rows/s |", "|---|---|---|"]
+    for label, n, rate in results:
+        lines.append(f"| {label} | {n} | {rate:,.0f} |")
+    print("\n".join(lines))
+
+
+if __name__ == "__main__":
+    main()
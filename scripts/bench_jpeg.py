@@ -0,0 +1,86 @@
+"""Benchmark JPEG encode time per backend at 360p, 720p and 1080p.
+
+Uses the first frame of the benchmark clip (downloaded if missing) resized to
+each resolution, or a synthetic frame with --synthetic. Backends that are not
+installed are skipped.
+
+    python scripts/bench_jpeg.py [--synthetic] [--iters 50]
+"""
+import argparse
+import statistics
+import sys
+import time
+from concurrent.futures import wait
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import cv2
+import numpy as np
+
+from Core_AI.jpeg_encoder import JpegEncoder, JpegProfile, available_backends
+
+
+RESOLUTIONS = {"360p": (640, 360), "720p": (1280, 720), "1080p": (1920, 1080)}
+PROFILES = {"stream q80 4:2:0": JpegProfile(80, "420"), "evidence q95 4:4:4": JpegProfile(95, "444")}
+
+
+def _source_frame(synthetic: bool) -> np.ndarray:
+    if not synthetic:
+        from benchmark import VIDEO_PATH, download_video  # Pulls in the full pipeline stack
+
+        download_video()
+        cap = cv2.VideoCapture(VIDEO_PATH)
+        ok, frame = cap.read()
+        cap.release()
+        if ok:
+            return frame
+        print("Could not read the benchmark clip; using a synthetic frame.")
+    rng = np.random.default_rng(0)
+    h, w = 1080, 1920
+    ramp = np.linspace(0, 255, w, dtype=np.float32)[None, :, None]
+    frame = np.broadcast_to(ramp, (h, w, 3)) + rng.normal(0, 12, (h, w, 3))
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--synthetic", action="store_true", help="Use a generated frame instead of the clip")
+    parser.add_argument("--iters", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=2, help="Pool size for the throughput column")
+    args = parser.parse_args()
+
+    source = _source_frame(args.synthetic)
+    backends = available_backends()
+
+    lines = [
+        f"| Backend | Profile | Resolution | Median ms | p95 ms | KiB | Pool ({args.workers}w) fps |",
+        "|" + "---|" * 7,
+    ]
+    for backend in backends:
+        encoder = JpegEncoder(backend, workers=args.workers)
+        for label, profile in PROFILES.items():
+            for res, size in RESOLUTIONS.items():
+                frame = cv2.resize(source, size, interpolation=cv2.INTER_AREA)
+                encoder.encode(frame, profile)  # Warm-up
+                samples = []
+                for _ in range(args.iters):
+                    t0 = time.perf_counter()
+                    data = encoder.encode(frame, profile)
+                    samples.append(time.perf_counter() - t0)
+                samples.sort()
+
+                t0 = time.perf_counter()
+                wait([encoder.submit(frame, profile) for _ in range(args.iters)])
+                pool_fps = args.iters / (time.perf_counter() - t0)
+
+                lines.append(
+                    f"| {backend} | {label} | {res} | {1000 * statistics.median(samples):.2f} | "
+                    f"{1000 * samples[int(0.95 * (len(samples) - 1))]:.2f} | {len(data) / 1024:.0f} | {pool_fps:.0f} |"
+                )
+    print("\n".join(lines))
+
+
+if __name__ == "__main__":
+    main()
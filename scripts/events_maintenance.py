@@ -0,0 +1,65 @@
+"""One-shot maintenance for the partitioned events table.
+
+Uses DATABASE_URL, EVENTS_PARTITIONING, EVENTS_PARTITIONS_AHEAD and
+EVENTS_RETENTION_DAYS from the environment / .env.
+
+    python scripts/events_maintenance.py --migrate    # convert a plain events table (stop pipelines first)
+    python scripts/events_maintenance.py --ensure     # create upcoming partitions
+    python scripts/events_maintenance.py --retention  # drop partitions past retention
+    python scripts/events_maintenance.py --rebuild-rollups  # recompute event_rollups / event_sketches from events
+    python scripts/events_maintenance.py --build-indexes    # add the /events API indexes without blocking writes
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from Core_AI.config import load_config
+from Core_AI.db import build_read_indexes, init_db
+from Core_AI.event_partitions import GRANULARITIES, drop_expired_partitions, ensure_partitions, migrate_plain_events
+from Core_AI.event_rollups import rebuild_rollups
+from Core_AI.event_sketches import rebuild_sketches
+from Core_AI.storage import sqlite_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--migrate", action="store_true", help="Move a plain events table into partitions")
+    parser.add_argument("--ensure", action="store_true", help="Create the current and upcoming partitions")
+    parser.add_argument("--retention", action="store_true", help="Drop partitions older than EVENTS_RETENTION_DAYS")
+    parser.add_argument("--rebuild-rollups", action="store_true", help="Recompute the stats rollups and sketches")
+    parser.add_argument("--build-indexes", action="store_true", help="CREATE INDEX CONCURRENTLY the /events API indexes")
+    args = parser.parse_args()
+
+    cfg = load_config().alert
+    if not cfg.database_url:
+        sys.exit("DATABASE_URL is not set.")
+    if sqlite_path(cfg.database_url) is not None:
+        sys.exit("Partitions and rollup rebuilds are PostgreSQL-only; DATABASE_URL points at SQLite.")
+    if args.build_indexes:
+        sys.exit(0 if build_read_indexes(cfg.database_url) else 1)
+    if args.rebuild_rollups:
+        init_db(cfg.database_url, cfg.events_partitioning)
+        ok = rebuild_rollups(cfg.database_url)
+        ok = rebuild_sketches(cfg.database_url, cfg.sketch_precision) and ok
+        sys.exit(0 if ok else 1)
+    if cfg.events_partitioning not in GRANULARITIES:
+        sys.exit(f"Set EVENTS_PARTITIONING to one of {GRANULARITIES} (got {cfg.events_partitioning!r}).")
+
+    if args.migrate:
+        if migrate_plain_events(cfg.database_url, cfg.events_partitioning, cfg.events_partitions_ahead):
+            print("Migrated. Check the data, then: DROP TABLE events_legacy;")
+    else:
+        init_db(cfg.database_url, cfg.events_partitioning)
+    if args.ensure:
+        created = ensure_partitions(cfg.database_url, cfg.events_partitioning, cfg.events_partitions_ahead)
+        print(f"Created {len(created)} partitions: {', '.join(created) or '-'}")
+    if args.retention:
+        dropped = drop_expired_partitions(cfg.database_url, cfg.events_retention_days)
+        print(f"Dropped {len(dropped)} partitions: {', '.join(dropped) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Export events straight from the database to a file, in constant memory.
+
+Same code path as GET /events/export; uses DATABASE_URL from the environment / .env.
+
+    python scripts/export_events.py events.ndjson.gz --format ndjson --gzip --since 2026-01-01
+    python scripts/export_events.py march.parquet --format parquet --since 2026-03-01 --until 2026-04-01
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from Core_AI.config import load_config
+from Core_AI.event_export import FORMATS, export_events
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--format", choices=sorted(FORMATS), default="ndjson")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--camera", default=None)
+    parser.add_argument("--zone", default=None)
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None, help="UTC, inclusive")
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None, help="UTC, exclusive")
+    parser.add_argument("--batch", type=int, default=None, help="Rows per fetch (default EXPORT_BATCH_ROWS)")
+    args = parser.parse_args()
+
+    cfg = load_config().alert
+    if not cfg.database_url:
+        sys.exit("DATABASE_URL is not set.")
+    t0 = time.perf_counter()
+    try:
+        chunks = export_events(
+            cfg.database_url, args.format, args.gzip, args.camera, args.zone, args.since, args.until,
+            batch_rows=args.batch or cfg.export_batch_rows,
+        )
+    except ValueError as exc:
+        sys.exit(str(exc))
+    size = 0
+    with open(args.output, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+            size += len(chunk)
+    print(f"Wrote {size / 1e6:.1f} MB to {args.output} in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Load test for the /events API: N concurrent clients polling for a fixed time.
+
+Start the backend first (``python V3_Web/backend/main.py``). Each client
+loops over GET /events; with ``--pages`` > 1 it follows ``X-Next-Cursor``
+that many pages deep before starting over, like a user scrolling back.
+
+    python scripts/load_test_events.py [--url http://localhost:8000] [--clients 200] [--seconds 30]
+                                       [--pages 3] [--camera cam_01] [--zone "Zone A"]
+"""
+import argparse
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Dict, List, Optional
+
+
+def _client(base: str, params: Dict[str, str], pages: int, deadline: float,
+            latencies: List[float], errors: Dict[str, int], lock: threading.Lock) -> None:
+    cursor: Optional[str] = None
+    page = 0
+    while time.monotonic() < deadline:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        url = f"{base}/events?{urllib.parse.urlencode(query)}"
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(url, timeout=30) as resp:
+                resp.read()
+                cursor = resp.headers.get("X-Next-Cursor")
+            elapsed = time.perf_counter() - t0
+            with lock:
+                latencies.append(elapsed)
+        except urllib.error.HTTPError as exc:
+            cursor = None
+            with lock:
+                errors[str(exc.code)] = errors.get(str(exc.code), 0) + 1
+        except Exception as exc:  # noqa: BLE001
+            cursor = None
+            with lock:
+                errors[type(exc).__name__] = errors.get(type(exc).__name__, 0) + 1
+        page += 1
+        if cursor is None or page >= pages:
+            cursor, page = None, 0
+
+
+def _pct(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=1, help="Pages to follow per client before restarting")
+    parser.add_argument("--camera", default=None)
+    parser.add_argument("--zone", default=None)
+    args = parser.parse_args()
+
+    params = {"limit": str(args.limit)}
+    if args.camera:
+        params["camera_id"] = args.camera
+    if args.zone:
+        params["zone"] = args.zone
+
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.seconds
+    threads = [
+        threading.Thread(
+            target=_client,
+            args=(args.url.rstrip("/"), params, max(1, args.pages), deadline, latencies, errors, lock),
+            daemon=True,
+        )
+        for _ in range(args.clients)
+    ]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    lat = sorted(latencies)
+    print("| Clients | Requests | Errors | Req/s | p50 ms | p95 ms | p99 ms | max ms |")
+    print("|---|---|---|---|---|---|---|---|")
+    print(
+        f"| {args.clients} | {len(lat)} | {sum(errors.values())} | {len(lat) / elapsed:,.0f} "
+        f"| {_pct(lat, 0.50) * 1000:.1f} | {_pct(lat, 0.95) * 1000:.1f} | {_pct(lat, 0.99) * 1000:.1f} "
+        f"| {(lat[-1] if lat else 0) * 1000:.1f} |"
+    )
+    if errors:
+        print("Errors:", ", ".join(f"{k}={v}" for k, v in sorted(errors.items())))
+
+
+if __name__ == "__main__":
+    main()
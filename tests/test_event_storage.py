@@ -0,0 +1,211 @@
+"""SQLite storage, HyperLogLog sketches and the in-memory event ring.
+
+Runs without PostgreSQL: everything here goes through ``SqliteStorage``.
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from Core_AI import storage as storage_module
+from Core_AI.event_ring import EventRing
+from Core_AI.event_rollups import RollupCache
+from Core_AI.event_spool import EventRow
+from Core_AI.sqlite_storage import SqliteStorage
+from Core_AI.storage import Storage, get_storage
+from Core_AI.utils.hll import HyperLogLog
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'sentinal.db'}"
+    yield url
+    store = storage_module._stores.pop(url, None)
+    if store is not None:
+        store.close()
+
+
+@pytest.fixture
+def store(db_url):
+    return get_storage(db_url)
+
+
+def _rows(n, start, cameras=("cam1", "cam2"), zones=("door", "hall")):
+    # Every third event shares its predecessor's timestamp, so paging has to break ties on id.
+    rows = []
+    ts = start
+    for i in range(n):
+        if i % 3:
+            ts += timedelta(seconds=7)
+        rows.append(EventRow(cameras[i % len(cameras)], i, zones[i % len(zones)], ts, None, f"key-{i}"))
+    return rows
+
+
+def test_storage_is_abstract():
+    with pytest.raises(TypeError):
+        Storage()
+
+
+def test_get_storage_picks_sqlite(store):
+    assert isinstance(store, SqliteStorage)
+    assert store.backend == "sqlite"
+
+
+def test_write_events_replay_is_idempotent(store):
+    rows = _rows(10, datetime(2026, 1, 1, 12, 0))
+    assert len(store.write_events(rows[:6])) == 6
+    # A spool replay after a crash resends a committed batch together with new rows.
+    inserted = store.write_events(rows)
+    assert [r["object_id"] for r in inserted] == list(range(6, 10))
+    assert store.write_events(rows) == []
+
+    events = store.query_events(limit=100)
+    assert len(events) == 10
+    _, rollups, _ = store.read_stats(datetime(2026, 1, 1), datetime(2026, 1, 1))
+    assert sum(count for _, _, _, count in rollups) == 10
+
+
+def test_query_events_keyset_pages(store):
+    store.write_events(_rows(47, datetime(2026, 1, 1, 12, 0)))
+    everything = store.query_events(limit=1000)
+    assert [(r["timestamp"], r["id"]) for r in everything] == sorted(
+        ((r["timestamp"], r["id"]) for r in everything), reverse=True
+    )
+
+    for filters in ({}, {"camera_id": "cam1"}, {"zone": "hall", "since": datetime(2026, 1, 1, 12, 1)}):
+        expected = store.query_events(limit=1000, **filters)
+        paged, before = [], None
+        while True:
+            page = store.query_events(limit=10, before=before, **filters)
+            if not page:
+                break
+            paged.extend(page)
+            before = (page[-1]["timestamp"], page[-1]["id"])
+        assert paged == expected
+
+
+def test_iter_events_oldest_first(store):
+    store.write_events(_rows(12, datetime(2026, 1, 1, 12, 0)))
+    batches = list(store.iter_events(5))
+    assert [len(b) for b in batches] == [5, 5, 2]
+    keys = [(r[4], r[0]) for batch in batches for r in batch]
+    assert keys == sorted(keys)
+
+
+def test_read_stats_changed_since(store):
+    start = datetime(2026, 1, 1, 12, 0)
+    store.write_events(_rows(4, start))
+    clock, rollups, _ = store.read_stats(start, start)
+    assert rollups
+    _, unchanged, _ = store.read_stats(start, start, changed_since=clock + timedelta(seconds=1))
+    assert unchanged == []
+
+
+def test_rollup_cache_window(db_url, store):
+    now = datetime.utcnow().replace(microsecond=0)
+    store.write_events([
+        EventRow("cam1", 1, "door", now - timedelta(minutes=5), None, "a"),
+        EventRow("cam1", 2, "hall", now - timedelta(minutes=5), None, "b"),
+        EventRow("cam2", 3, "door", now - timedelta(hours=3), None, "c"),
+        EventRow("cam2", 4, "door", now - timedelta(days=2), None, "d"),
+    ])
+    cache = RollupCache(db_url)
+    assert cache.refresh(force=True)
+    assert cache.window(timedelta(hours=1), now=now)["total"] == 2
+    day = cache.window(timedelta(hours=24), now=now)
+    assert day["total"] == 3
+    assert day["by_zone"] == {"door": 2, "hall": 1}
+    assert cache.window(timedelta(days=7), cameras=["cam2"], now=now)["by_camera"] == {"cam2": 2}
+
+    # Incremental refresh picks up new rows, and replays do not double count.
+    store.write_events([EventRow("cam1", 5, "door", now - timedelta(minutes=1), None, "e")])
+    store.write_events([EventRow("cam1", 1, "door", now - timedelta(minutes=5), None, "a")])
+    assert cache.refresh(force=True)
+    assert cache.window(timedelta(hours=1), now=now)["total"] == 3
+
+
+def test_sketches_merge_into_distinct_counts(db_url, store):
+    hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    first, second = HyperLogLog(), HyperLogLog()
+    first.update(range(0, 300))
+    second.update(range(200, 500))
+    store.merge_sketches({(hour, "cam1", "id"): first})
+    store.merge_sketches({(hour, "cam1", "id"): second})
+    cache = RollupCache(db_url)
+    assert cache.refresh(force=True)
+    assert cache.distinct(timedelta(hours=1)) == pytest.approx(500, rel=0.05)
+
+
+@pytest.mark.parametrize("high, low", [(12, 10), (14, 4), (8, 7)])
+def test_hll_reduced_matches_direct_build(high, low):
+    values = [f"person-{i}" for i in range(3000)]
+    sketch, direct = HyperLogLog(high), HyperLogLog(low)
+    sketch.update(values)
+    direct.update(values)
+    assert (sketch.reduced(low).registers == direct.registers).all()
+
+
+def test_hll_merge():
+    a, b = HyperLogLog(12), HyperLogLog(10)
+    a.update(range(0, 2000))
+    b.update(range(1000, 3000))
+    merged = HyperLogLog(12, a.registers.copy())
+    merged.merge(b)
+    assert merged.precision == 10  # Mixed precisions merge at the lower one
+    direct = HyperLogLog(10)
+    direct.update(range(0, 3000))
+    assert (merged.registers == direct.registers).all()
+    assert merged.count() == pytest.approx(3000, rel=0.1)
+
+    again = HyperLogLog(10, merged.registers.copy())
+    again.merge(b)
+    assert (again.registers == merged.registers).all()  # Idempotent
+    assert HyperLogLog.from_bytes(merged.to_bytes()).registers.tolist() == merged.registers.tolist()
+
+
+def _reference_page(events, limit, before=None, camera_id=None, zone=None, since=None, until=None):
+    matches = [
+        e for e in events
+        if (before is None or (e["timestamp"], e["id"]) < before)
+        and (camera_id is None or e["camera_id"] == camera_id)
+        and (zone is None or e["zone"] == zone)
+        and (since is None or e["timestamp"] >= since)
+        and (until is None or e["timestamp"] < until)
+    ]
+    matches.sort(key=lambda e: (e["timestamp"], e["id"]), reverse=True)
+    return matches[:limit]
+
+
+@pytest.mark.parametrize("scope", ["local", "camera"])
+def test_event_ring_matches_reference(scope):
+    rng = random.Random(7)
+    ring = EventRing(per_camera=40, scope=scope)
+    ring.attach(lambda listener: None)
+    start = datetime.utcnow() + timedelta(seconds=1)
+    events = []
+    for i in range(1, 401):
+        ts = start + timedelta(seconds=rng.randrange(0, 600))  # Out of order, with ties
+        events.append({"id": i, "camera_id": rng.choice(["cam1", "cam2", "cam3"]), "object_id": i,
+                       "zone": rng.choice(["door", "hall"]), "timestamp": ts, "snapshot_path": None})
+    for i in range(0, len(events), 25):
+        ring.extend(events[i:i + 25])
+
+    hits = 0
+    for _ in range(500):
+        query = {
+            "limit": rng.choice([1, 5, 20, 60]),
+            "camera_id": rng.choice([None, "cam1", "cam2", "cam4"]),
+            "zone": rng.choice([None, None, "door"]),
+        }
+        if rng.random() < 0.4:
+            query["since"] = start + timedelta(seconds=rng.randrange(0, 600))
+        if rng.random() < 0.3:
+            query["until"] = start + timedelta(seconds=rng.randrange(0, 600))
+        if rng.random() < 0.4:
+            anchor = rng.choice(events)
+            query["before"] = (anchor["timestamp"], anchor["id"])
+        page = ring.query(**query)
+        if page is not None:
+            hits += 1
+            assert page == _reference_page(events, **query)
+    assert hits
@@ -0,0 +1,105 @@
+"""The /events read path on PostgreSQL, against an in-process stand-in for the connection pool."""
+import asyncio
+import importlib
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+psycopg2_pool = pytest.importorskip("psycopg2.pool")
+
+from Core_AI import db  # noqa: E402
+from Core_AI import storage as storage_module  # noqa: E402
+from Core_AI.storage import get_storage  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "V3_Web" / "backend"))
+
+DB_URL = "postgresql://sentinal@localhost/sentinal_test"
+
+
+class _Cursor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        time.sleep(0.05)  # Hold the connection long enough for requests to overlap
+
+    def fetchall(self):
+        return []
+
+
+class _Conn:
+    closed = False
+
+    def cursor(self):
+        return _Cursor()
+
+    def rollback(self):
+        pass
+
+
+class _Pool:
+    """Behaves like ThreadedConnectionPool: raises instead of waiting when exhausted."""
+
+    def __init__(self, minconn, maxconn, dsn):
+        self.maxconn = maxconn
+        self.in_use = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def getconn(self):
+        with self._lock:
+            if self.in_use >= self.maxconn:
+                raise psycopg2_pool.PoolError("connection pool exhausted")
+            self.in_use += 1
+            self.peak = max(self.peak, self.in_use)
+        return _Conn()
+
+    def putconn(self, conn, close=False):
+        with self._lock:
+            self.in_use -= 1
+
+
+@pytest.fixture
+def db_service(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", DB_URL)
+    monkeypatch.setenv("EVENTS_API_WORKERS", "8")
+    monkeypatch.setenv("EVENTS_RING_SIZE", "0")
+    monkeypatch.setattr(db.pool, "ThreadedConnectionPool", _Pool)
+    monkeypatch.setattr(db, "_read_pool", None)
+    monkeypatch.setattr(db, "_read_slots", None)
+    storage_module._stores.pop(DB_URL, None)
+    from services import db_service
+    yield importlib.reload(db_service)
+    db_service._executor.shutdown(wait=True)
+    storage_module._stores.pop(DB_URL, None)
+
+
+def test_read_pool_sized_from_config_whatever_opens_storage_first(db_service):
+    # The pipeline and stitcher open storage with no pool size before the first /events request.
+    get_storage(DB_URL)
+
+    async def burst():
+        return await asyncio.gather(*(db_service.get_events(10) for _ in range(24)))
+
+    pages = asyncio.run(burst())
+    assert all(page == [] for page in pages)  # None would be a 503
+    read_pool = db._read_pool
+    assert read_pool.maxconn == 8
+    assert read_pool.peak > 4
+
+
+def test_read_pool_waits_instead_of_raising(db_service):
+    db._get_read_pool(DB_URL, maxconn=2)  # Sized smaller than the API's worker threads
+    get_storage(DB_URL)
+
+    async def burst():
+        return await asyncio.gather(*(db_service.get_events(10) for _ in range(16)))
+
+    assert all(page == [] for page in asyncio.run(burst()))
+    assert db._read_pool.peak == 2
@@ -0,0 +1,53 @@
+"""Stable-ID allocation and gallery caps of the shared re-ID gallery."""
+import numpy as np
+
+from Core_AI.reid_gallery import GalleryConfig, ReIdGallery
+
+
+BOX = (100.0, 100.0, 140.0, 220.0)
+
+
+def _features(seed):
+    return np.random.default_rng(seed).standard_normal(64).astype(np.float32)
+
+
+def test_visible_track_without_features_keeps_its_id_past_horizon():
+    cfg = GalleryConfig(ttl_seconds=8.0, cross_camera_ttl_seconds=60.0)
+    gallery = ReIdGallery(cfg)
+    horizon = max(cfg.ttl_seconds, cfg.cross_camera_ttl_seconds)
+
+    # cam1's track never passes the quality gate, so it only ever publishes motion.
+    sid = gallery.allocate_id(set(), 0.0, preferred=1)
+    now = 0.0
+    while now <= horizon * 2:
+        gallery.purge(now)
+        gallery.publish("cam1", [(sid, None, BOX)], now, 0.9)
+        now += 1.0
+
+    # A new track on cam2 asking for the same track number must get a different stable ID.
+    gallery.purge(now)
+    other = gallery.allocate_id(set(), now, preferred=1)
+    assert other != sid
+
+
+def test_claim_of_a_track_that_left_expires():
+    gallery = ReIdGallery(GalleryConfig(ttl_seconds=8.0, cross_camera_ttl_seconds=60.0))
+    sid = gallery.allocate_id(set(), 0.0, preferred=1)
+    gallery.publish("cam1", [(sid, None, BOX)], 0.0, 0.9)
+    gallery.purge(61.0)
+    assert gallery.allocate_id(set(), 61.0, preferred=1) == sid
+
+
+def test_cap_evicts_lost_entries_only():
+    gallery = ReIdGallery(GalleryConfig(max_entries=3))
+    gallery.publish("cam1", [(sid, _features(sid), BOX) for sid in range(1, 4)], 0.0, 0.9)
+    gallery.mark_lost([1, 2], 1.0)
+    # A burst of new tracks pushes the gallery over its cap.
+    gallery.publish("cam2", [(sid, _features(sid), BOX) for sid in range(10, 15)], 2.0, 0.9)
+    gallery.purge(2.0)
+
+    stats = gallery.stats()
+    assert stats["active"] == 6  # Over the cap rather than freeing live IDs
+    assert stats["entries"] == 6
+    assert gallery.allocate_id(set(), 2.0, preferred=1) == 1  # Evicted, so free again
+    assert gallery.allocate_id(set(), 2.0, preferred=3) != 3